@@ -22,6 +22,7 @@ static WiFiUDP udp;
 static const char *udpTargetIP = nullptr;
 static int udpTargetPort = 9999;
 static httpd_handle_t stream_httpd = NULL;
+static httpd_handle_t control_httpd = NULL;
 
 // UDP packet size limit (safe value for local WiFi)
 static const int UDP_MAX_PACKET = 1400;
@@ -61,6 +62,79 @@ static esp_err_t stream_handler(httpd_req_t *req) {
   return res;
 }
 
+/**
+ * Map a frame size name to the sensor enum.
+ * Only sizes up to the boot size (QVGA) are accepted: the frame buffers
+ * in PSRAM were allocated for it.
+ */
+static framesize_t parseFrameSize(const char *name) {
+  if (strcmp(name, "QQVGA") == 0)
+    return FRAMESIZE_QQVGA; // 160x120
+  if (strcmp(name, "HQVGA") == 0)
+    return FRAMESIZE_HQVGA; // 240x176
+  if (strcmp(name, "QVGA") == 0)
+    return FRAMESIZE_QVGA; // 320x240
+  return FRAMESIZE_INVALID;
+}
+
+/**
+ * Camera Control Handler
+ * GET /control?framesize=QVGA&quality=30 (either parameter optional)
+ * Used by the backend to lower frame size / JPEG quality on a weak link
+ */
+static esp_err_t control_handler(httpd_req_t *req) {
+  char query[64];
+  char value[16];
+  sensor_t *s = esp_camera_sensor_get();
+
+  if (!s || httpd_req_get_url_query_str(req, query, sizeof(query)) != ESP_OK) {
+    httpd_resp_send_err(req, HTTPD_400_BAD_REQUEST, "Missing query");
+    return ESP_FAIL;
+  }
+
+  if (httpd_query_key_value(query, "framesize", value, sizeof(value)) == ESP_OK) {
+    framesize_t size = parseFrameSize(value);
+    if (size == FRAMESIZE_INVALID || s->set_framesize(s, size) != 0) {
+      httpd_resp_send_err(req, HTTPD_400_BAD_REQUEST, "Bad framesize");
+      return ESP_FAIL;
+    }
+  }
+
+  if (httpd_query_key_value(query, "quality", value, sizeof(value)) == ESP_OK) {
+    int quality = atoi(value); // 4-63, higher = smaller files
+    if (quality < 4 || quality > 63 || s->set_quality(s, quality) != 0) {
+      httpd_resp_send_err(req, HTTPD_400_BAD_REQUEST, "Bad quality");
+      return ESP_FAIL;
+    }
+  }
+
+  Serial.printf("📷 Camera profile: %s\n", query);
+  return httpd_resp_send(req, "OK", HTTPD_RESP_USE_STRLEN);
+}
+
+/**
+ * Start the control server on port 81
+ * Separate from the stream server: /stream never returns, so it would
+ * block any other request on the same server
+ */
+static void startControlServer() {
+  httpd_config_t config = HTTPD_DEFAULT_CONFIG();
+  config.server_port = 81;
+  config.ctrl_port += 1; // Second httpd instance needs its own control port
+  httpd_uri_t control_uri = {.uri = "/control",
+                             .method = HTTP_GET,
+                             .handler = control_handler,
+                             .user_ctx = NULL};
+
+  if (httpd_start(&control_httpd, &config) == ESP_OK) {
+    httpd_register_uri_handler(control_httpd, &control_uri);
+    Serial.printf("   Control URL: http://%s:81/control\n",
+                  WiFi.localIP().toString().c_str());
+  } else {
+    Serial.println("❌ Failed to start control server");
+  }
+}
+
 /**
  * Initialize camera hardware
  */
@@ -157,6 +231,7 @@ void startCameraServer(const char *ssid, const char *password) {
   } else {
     Serial.println("❌ Failed to start HTTP server");
   }
+  startControlServer();
 
   udpMode = false;
 }
@@ -176,6 +251,7 @@ void startCameraUDP(const char *ssid, const char *password,
 
   Serial.println("✅ UDP Camera Stream Started");
   Serial.printf("   Target: %s:%d\n", targetIP, targetPort);
+  startControlServer();
 
   udpMode = true;
 }
@@ -20,12 +20,14 @@ void initCamera();
 /**
  * Start WiFi and HTTP MJPEG server
  * Access stream at http://<IP>/stream
+ * Camera control at http://<IP>:81/control?framesize=QVGA&quality=30
  */
 void startCameraServer(const char *ssid, const char *password);
 
 /**
  * Start WiFi and UDP video streaming
  * Sends JPEG frames to specified IP:port
+ * Camera control at http://<IP>:81/control (as in HTTP mode)
  * @param ssid WiFi network name
  * @param password WiFi password
  * @param targetIP IP address of receiving computer
@@ -3,15 +3,29 @@
 
 from .config import AIConfig
 from .tactical_detector import TacticalDetector
+from .model_cache import ModelArtifactCache
+from .object_tracker import ObjectTracker, TrackedDetector
+from .sensor_fusion import CorridorDetector, fuse_range
 from .strategic_navigator import StrategicNavigator
 from .command_arbiter import CommandArbiter, CommandPriority
+from .command_dispatcher import CommandDispatcher
+from .shared_detector import SharedDetector
+from .vlm_scheduler import FairShareVLM
 from .frame_preprocessor import FramePreprocessor
 
 __all__ = [
     'AIConfig',
     'TacticalDetector',
+    'ModelArtifactCache',
+    'ObjectTracker',
+    'TrackedDetector',
+    'CorridorDetector',
+    'fuse_range',
     'StrategicNavigator', 
     'CommandArbiter',
     'CommandPriority',
+    'CommandDispatcher',
+    'SharedDetector',
+    'FairShareVLM',
     'FramePreprocessor',
 ]
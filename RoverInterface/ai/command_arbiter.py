@@ -2,13 +2,16 @@
 """
 Command Arbiter: Fuses commands from multiple sources with priority hierarchy.
 Priority: SAFETY > TACTICAL > STRATEGIC > MANUAL > IDLE
+Stops below SAFETY only guard the path ahead: a straight manual reverse
+passes them, so the operator can back away from an obstacle.
 """
 
 import time
+import heapq
 import threading
 from dataclasses import dataclass, field
 from enum import IntEnum
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
 from queue import Queue, Empty
 
 
@@ -21,6 +24,16 @@ class CommandPriority(IntEnum):
     SAFETY = 100    # Firmware-level or critical stop
 
 
+# Button commands, mapped the way GatewayModule's parseAndSendCommand does
+MANUAL_SETPOINTS = {
+    'F': (2048, 4095),
+    'B': (2048, 0),
+    'L': (0, 2048),
+    'R': (4095, 2048),
+    'S': (2048, 2048),
+}
+
+
 @dataclass
 class RoverCommand:
     """Unified command format for rover control"""
@@ -30,12 +43,29 @@ class RoverCommand:
     source: str = "unknown"
     reason: str = ""
     timestamp: float = field(default_factory=time.time)
+    # perf_counter() when the arbiter picked this command (for latency tracking)
+    decision_time: Optional[float] = field(default=None, compare=False, repr=False)
+    # Seconds until the arbiter drops this command (None = arbiter default)
+    ttl: Optional[float] = field(default=None, compare=False)
+    # FrameTrace of the frame that caused this command (glass-to-wheel tracing)
+    trace: Optional[Any] = field(default=None, compare=False, repr=False)
     
     @classmethod
     def stop(cls, priority: CommandPriority, source: str, reason: str = "") -> 'RoverCommand':
         """Create a STOP command"""
         return cls(priority=priority, x=2048, y=2048, source=source, reason=reason)
     
+    @classmethod
+    def manual(cls, command: str, source: str = "operator",
+               ttl: Optional[float] = None) -> Optional['RoverCommand']:
+        """Create a MANUAL command from a button (F/B/L/R/S), None if unknown"""
+        setpoint = MANUAL_SETPOINTS.get(command.strip().upper()) if command else None
+        if setpoint is None:
+            return None
+        x, y = setpoint
+        return cls(priority=CommandPriority.MANUAL, x=x, y=y, source=source,
+                   reason=command.strip().upper(), ttl=ttl)
+    
     @classmethod
     def forward(cls, priority: CommandPriority, source: str, speed: float = 0.5) -> 'RoverCommand':
         """Create a FORWARD command (speed: 0.0-1.0)"""
@@ -56,25 +86,44 @@ class RoverCommand:
         return cls(priority=priority, x=x, y=y, source=source, reason=direction)
 
 
+# Fixed slot per priority level, lowest first (index = level, not priority value)
+_LEVELS = tuple(sorted(CommandPriority))
+_SLOT = {priority: index for index, priority in enumerate(_LEVELS)}
+
+
 class CommandArbiter:
     """
     Priority-based command arbiter that fuses multiple input sources.
     Higher priority commands override lower priority ones.
+    Commands can carry a TTL; an expired command is dropped as if cleared.
     """
     
-    def __init__(self, command_callback: Optional[Callable[[RoverCommand], None]] = None):
+    def __init__(self, command_callback: Optional[Callable[[RoverCommand], None]] = None,
+                 idle_callback: Optional[Callable[[], None]] = None,
+                 default_ttls: Optional[dict] = None):
         """
         Initialize arbiter.
         
         Args:
             command_callback: Optional callback called when command changes
+            idle_callback: Optional callback called when no command is active anymore
+            default_ttls: Optional {CommandPriority: seconds} used when a
+                command has no ttl of its own (None = never expires)
         """
         self._lock = threading.Lock()
-        self._commands: dict[CommandPriority, Optional[RoverCommand]] = {}
+        self._expiry_cond = threading.Condition(self._lock)
+        self._commands: list[Optional[RoverCommand]] = [None] * len(_LEVELS)
         self._command_callback = command_callback
+        self._idle_callback = idle_callback
+        self._default_ttls = dict(default_ttls or {})
         self._last_command: Optional[RoverCommand] = None
         self._enabled = True
         
+        # Expiry heap of (deadline, seq, slot, command); stale entries skipped lazily
+        self._deadlines: list = []
+        self._deadline_seq = 0
+        self._expiry_thread: Optional[threading.Thread] = None
+        
         # Command log for debugging/mission log
         self._command_log: Queue = Queue(maxsize=100)
     
@@ -90,7 +139,9 @@ class CommandArbiter:
             return
             
         with self._lock:
-            self._commands[command.priority] = command
+            slot = _SLOT[command.priority]
+            self._commands[slot] = command
+            self._schedule_expiry(slot, command)
             self._log_command(command)
             self._evaluate_and_execute()
     
@@ -102,27 +153,86 @@ class CommandArbiter:
             priority: Priority level to clear
         """
         with self._lock:
-            self._commands[priority] = None
+            self._commands[_SLOT[priority]] = None
             self._evaluate_and_execute()
     
     def clear_all(self):
         """Clear all commands"""
         with self._lock:
-            self._commands.clear()
+            self._commands = [None] * len(_LEVELS)
+            self._deadlines.clear()
             self._last_command = None
+        if self._idle_callback:
+            self._idle_callback()
+    
+    def _schedule_expiry(self, slot: int, command: RoverCommand):
+        """Push the command's deadline and wake the expiry thread (lock held)"""
+        ttl = command.ttl if command.ttl is not None else self._default_ttls.get(command.priority)
+        if ttl is None:
+            return
+        
+        self._deadline_seq += 1
+        heapq.heappush(self._deadlines, (time.monotonic() + ttl, self._deadline_seq, slot, command))
+        
+        if self._expiry_thread is None:
+            self._expiry_thread = threading.Thread(
+                target=self._expiry_loop, daemon=True, name="ArbiterExpiry"
+            )
+            self._expiry_thread.start()
+        else:
+            self._expiry_cond.notify()
+    
+    def _expiry_loop(self):
+        """Background thread: drop commands whose deadline has passed"""
+        with self._expiry_cond:
+            while True:
+                if not self._deadlines:
+                    self._expiry_cond.wait()
+                    continue
+                
+                deadline, _, slot, command = self._deadlines[0]
+                now = time.monotonic()
+                if deadline > now:
+                    self._expiry_cond.wait(deadline - now)
+                    continue
+                
+                heapq.heappop(self._deadlines)
+                # Superseded or already cleared: nothing to do
+                if self._commands[slot] is not command:
+                    continue
+                
+                self._commands[slot] = None
+                # Only the winning command changes the output
+                if command is self._last_command:
+                    self._evaluate_and_execute()
     
     def _evaluate_and_execute(self):
         """Evaluate priorities and execute highest priority command"""
         # Find highest priority active command
         active_command = None
-        for priority in sorted(self._commands.keys(), reverse=True):
-            cmd = self._commands.get(priority)
+        for cmd in reversed(self._commands):
             if cmd is not None:
                 active_command = cmd
                 break
         
+        # Backing away from whatever a TACTICAL/STRATEGIC stop is about stays possible
+        if (active_command is not None and active_command.priority < CommandPriority.SAFETY and
+                (active_command.x, active_command.y) == MANUAL_SETPOINTS['S']):
+            manual = self._commands[_SLOT[CommandPriority.MANUAL]]
+            if manual is not None and (manual.x, manual.y) == MANUAL_SETPOINTS['B']:
+                active_command = manual
+        
+        # Nothing left active: let the output stage stop re-sending
+        if active_command is None:
+            if self._last_command is not None:
+                self._last_command = None
+                if self._idle_callback:
+                    self._idle_callback()
+            return
+        
         # Execute if different from last command
-        if active_command and active_command != self._last_command:
+        if active_command != self._last_command:
+            active_command.decision_time = time.perf_counter()
             self._last_command = active_command
             if self._command_callback:
                 self._command_callback(active_command)
@@ -179,5 +289,7 @@ class CommandArbiter:
                     'source': self._last_command.source if self._last_command else None,
                     'reason': self._last_command.reason if self._last_command else None,
                 } if self._last_command else None,
-                'active_priorities': [p.name for p in self._commands.keys() if self._commands.get(p)]
+                'active_priorities': [
+                    level.name for level, cmd in zip(_LEVELS, self._commands) if cmd is not None
+                ]
             }
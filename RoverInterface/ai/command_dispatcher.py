@@ -0,0 +1,191 @@
+# command_dispatcher.py - Coalescing, Rate-Limited Command Dispatch
+"""
+Command Dispatcher: Sits between the CommandArbiter and the serial link.
+Drops resubmits that do not change (x, y, priority), coalesces bursts,
+caps the link rate and re-sends the active command as a keepalive so the
+rover's heartbeat failsafe stays satisfied.
+"""
+
+import time
+import logging
+import threading
+from typing import Optional, Callable, Tuple
+
+from .command_arbiter import RoverCommand, CommandPriority
+
+log = logging.getLogger("rover.dispatch")
+
+
+def command_key(command: RoverCommand) -> Tuple[int, int, int]:
+    """Identity of a command on the wire (timestamp/reason are ignored)"""
+    return (command.x, command.y, int(command.priority))
+
+
+class CommandDispatcher:
+    """
+    Rate-limited dispatch stage for arbiter output.
+    Runs its own thread so callers (AI loops, API handlers) never block
+    on serial I/O.
+    """
+
+    def __init__(self, send_callback: Callable[[RoverCommand], bool],
+                 coalesce_window: float = 0.05,
+                 max_rate_hz: float = 20.0,
+                 keepalive_interval: float = 0.2,
+                 urgent_priority: CommandPriority = CommandPriority.TACTICAL):
+        """
+        Initialize dispatcher.
+
+        Args:
+            send_callback: Called with the command to put on the link
+            coalesce_window: Seconds to wait for a burst to settle before sending
+            max_rate_hz: Upper bound on link writes per second
+            keepalive_interval: Re-send the last command after this much silence
+                (keep below the firmware SIGNAL_TIMEOUT of 500ms), 0 disables
+            urgent_priority: Commands at or above this priority skip the
+                coalesce window (still rate limited)
+        """
+        self._send_callback = send_callback
+        self._coalesce_window = coalesce_window
+        self._min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self._keepalive_interval = keepalive_interval
+        self._urgent_priority = urgent_priority
+
+        self._cond = threading.Condition()
+        self._pending: Optional[RoverCommand] = None
+        self._pending_since = 0.0
+        self._last_sent: Optional[RoverCommand] = None
+        self._last_send_time = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Stats
+        self.stats = {
+            'submitted': 0,
+            'duplicates': 0,
+            'coalesced': 0,
+            'sent': 0,
+            'keepalives': 0,
+            'send_failures': 0
+        }
+
+    def submit(self, command: RoverCommand):
+        """
+        Queue a command for dispatch. Usable directly as the arbiter callback.
+
+        Args:
+            command: RoverCommand chosen by the arbiter
+        """
+        with self._cond:
+            self.stats['submitted'] += 1
+
+            if self._pending is not None:
+                # A newer command replaces one that was still waiting
+                self.stats['coalesced'] += 1
+                self._pending = command
+            elif (self._last_sent is not None and
+                    command_key(command) == command_key(self._last_sent)):
+                self.stats['duplicates'] += 1
+                return
+            else:
+                self._pending = command
+                self._pending_since = time.monotonic()
+            self._cond.notify()
+
+    def _next_send_time(self, now: float) -> float:
+        """Earliest time the pending command may go out"""
+        earliest = self._last_send_time + self._min_interval
+        if self._pending.priority < self._urgent_priority:
+            earliest = max(earliest, self._pending_since + self._coalesce_window)
+        return max(earliest, now)
+
+    def _dispatch_loop(self):
+        """Background thread: wait for pending commands or keepalive deadlines"""
+        while self._running:
+            with self._cond:
+                now = time.monotonic()
+                command = None
+                is_keepalive = False
+
+                if self._pending is not None:
+                    send_at = self._next_send_time(now)
+                    if send_at <= now:
+                        # A burst may have settled back on what is already out
+                        if (self._last_sent is not None and
+                                command_key(self._pending) == command_key(self._last_sent)):
+                            self.stats['duplicates'] += 1
+                        else:
+                            command = self._pending
+                        self._pending = None
+                    else:
+                        self._cond.wait(send_at - now)
+                        continue
+                elif self._last_sent is not None and self._keepalive_interval > 0:
+                    keepalive_at = self._last_send_time + self._keepalive_interval
+                    if keepalive_at <= now:
+                        command = self._last_sent
+                        is_keepalive = True
+                    else:
+                        self._cond.wait(keepalive_at - now)
+                        continue
+                else:
+                    self._cond.wait(0.5)
+                    continue
+
+                if command is None:
+                    continue
+                self._last_sent = command
+                self._last_send_time = now
+
+            # Send outside the lock so submit() never waits on serial I/O
+            self._send(command, is_keepalive)
+
+    def _send(self, command: RoverCommand, is_keepalive: bool):
+        """Invoke the send callback and record the outcome"""
+        try:
+            ok = self._send_callback(command)
+        except Exception as e:
+            log.error(f"❌ Dispatch error: {e}", extra={'sample': 'dispatch.error'})
+            ok = False
+
+        if ok is False:
+            self.stats['send_failures'] += 1
+        elif is_keepalive:
+            self.stats['keepalives'] += 1
+        else:
+            self.stats['sent'] += 1
+
+    def start(self):
+        """Start the dispatch thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._dispatch_loop, daemon=True, name="CommandDispatcher"
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the dispatch thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def reset(self):
+        """Forget the last sent command (stops keepalives until the next submit)"""
+        with self._cond:
+            self._pending = None
+            self._last_sent = None
+
+    def get_status(self) -> dict:
+        """Get dispatcher status for API"""
+        with self._cond:
+            return {
+                'running': self._running,
+                'last_sent': {
+                    'x': self._last_sent.x,
+                    'y': self._last_sent.y,
+                    'priority': self._last_sent.priority.name,
+                } if self._last_sent else None,
+                'stats': dict(self.stats)
+            }
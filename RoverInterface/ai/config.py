@@ -49,12 +49,54 @@ class AIConfig:
     vlm_target_latency: int = 2000  # 0.5 Hz
     vlm_cooldown_seconds: float = 2.0
     
+    # Tactical rate governor (paces against yolo_target_latency, degrades when behind)
+    governor_enabled: bool = True  # False = deadline pacing only, quality fixed
+    governor_imgsz_steps: tuple = (480, 320)  # Smaller inference sizes to fall back to
+    governor_patience: int = 10  # Overloaded iterations before stepping down (x3 to step up)
+    governor_recover_ratio: float = 0.6  # Step up once processing uses < 60% of the period
+    
+    # Command dispatch (arbiter -> serial link)
+    dispatch_coalesce_ms: int = 50  # Let bursts settle before sending
+    dispatch_max_rate_hz: float = 20.0  # Max link writes per second
+    dispatch_keepalive_ms: int = 200  # Re-send below firmware SIGNAL_TIMEOUT (500ms)
+    
+    # Command expiry (arbiter drops commands not refreshed within TTL)
+    tactical_command_ttl: float = 0.5  # Tactical loop resubmits every frame
+    strategic_command_ttl: float = 6.0  # ~3 VLM cycles before a steer goes stale
+    manual_command_ttl: float = 0.5  # One button press drives one heartbeat window
+    manual_override_s: float = 3.0  # VLM steering yields this long after operator input
+    
+    # Temporal tracking (detector runs every Nth frame, tracks extrapolate between)
+    tracker_enabled: bool = True
+    detect_every_n_frames: int = 3
+    tracker_iou_threshold: float = 0.3
+    tracker_max_age: float = 0.5  # Seconds a track survives without a match
+    tracker_min_hits: int = 2  # Matches before a track is reported
+    tracker_low_confidence: float = 0.25  # Weak boxes may extend tracks, not start them
+    track_area_smoothing: float = 0.5  # EMA weight of the newest area ratio
+    
+    # Drive corridor ROI + ultrasonic fusion
+    fusion_enabled: bool = True
+    drive_corridor_roi: tuple = (0.2, 0.35, 0.8, 1.0)  # x1, y1, x2, y2 normalized
+    roi_full_frame_every: int = 5  # Every Nth inference covers the whole frame
+    ultrasonic_stop_cm: int = 20  # Stop on range alone
+    ultrasonic_escalate_cm: int = 80  # Full frame, every frame, escalated_imgsz
+    ultrasonic_max_age: float = 1.5  # Telemetry arrives at 2Hz; older readings are ignored
+    escalated_imgsz: int = 640
+    
     # Frame settings
     input_width: int = 320
     input_height: int = 240
     
+    # Model artifacts + warm-up
+    yolo_imgsz: int = 640  # Inference resolution (exported models are built per size)
+    yolo_backend: str = "pytorch"  # Or an export format: onnx, openvino, coreml, engine
+    model_cache_dir: str = "~/.cache/rescue-rover/models"  # Exported artifacts, reused across restarts
+    warmup_iterations: int = 2  # Dummy inferences per representative input shape
+    
     # Safety thresholds
     person_stop_threshold: float = 0.4  # Stop if person bbox > 40% of frame
+    stop_release_ratio: float = 0.8  # Hysteresis: release a stop below 80% of the threshold
     obstacle_classes: list = field(default_factory=lambda: [
         "person", "car", "bicycle", "motorcycle", "dog", "cat"
     ])
@@ -6,8 +6,10 @@ for different AI model input requirements.
 
 import io
 import numpy as np
-from PIL import Image
-from typing import Optional, Tuple
+from typing import Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 
 class FramePreprocessor:
@@ -22,7 +24,7 @@ class FramePreprocessor:
         """
         self.target_size = target_size
     
-    def jpeg_to_pil(self, jpeg_bytes: bytes) -> Optional[Image.Image]:
+    def jpeg_to_pil(self, jpeg_bytes: bytes) -> Optional["Image.Image"]:
         """
         Convert JPEG bytes to PIL Image.
         
@@ -34,6 +36,7 @@ class FramePreprocessor:
         """
         if not jpeg_bytes:
             return None
+        from PIL import Image
         try:
             return Image.open(io.BytesIO(jpeg_bytes)).convert('RGB')
         except Exception:
@@ -54,12 +57,14 @@ class FramePreprocessor:
             return None
         return np.array(pil_img)
     
-    def resize_pil(self, image: Image.Image) -> Image.Image:
+    def resize_pil(self, image: "Image.Image") -> "Image.Image":
         """Resize PIL image to target size"""
+        from PIL import Image
         return image.resize(self.target_size, Image.Resampling.LANCZOS)
     
     def resize_numpy(self, array: np.ndarray) -> np.ndarray:
         """Resize numpy array to target size"""
+        from PIL import Image
         pil_img = Image.fromarray(array)
         resized = self.resize_pil(pil_img)
         return np.array(resized)
@@ -80,7 +85,7 @@ class FramePreprocessor:
         # YOLO expects RGB, which we already have
         return arr
     
-    def preprocess_for_vlm(self, jpeg_bytes: bytes) -> Optional[Image.Image]:
+    def preprocess_for_vlm(self, jpeg_bytes: bytes) -> Optional["Image.Image"]:
         """
         Preprocess frame for VLM inference.
         
@@ -96,7 +101,7 @@ class FramePreprocessor:
         # Resize for faster VLM processing
         return self.resize_pil(pil_img)
     
-    def duplicate_frame(self, jpeg_bytes: bytes) -> Tuple[Optional[np.ndarray], Optional[Image.Image]]:
+    def duplicate_frame(self, jpeg_bytes: bytes) -> Tuple[Optional[np.ndarray], Optional["Image.Image"]]:
         """
         Create copies for parallel processing by YOLO and VLM.
         
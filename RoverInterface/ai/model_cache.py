@@ -0,0 +1,138 @@
+# model_cache.py - Persistent Cache for Exported Models
+"""
+Model Cache: Keeps exported model artifacts (ONNX, OpenVINO, CoreML,
+TensorRT engines) on disk, keyed by the hash of the source weights, the
+input size and the backend. An export is paid once per key; every later
+start, and every other process on the machine, loads the cached artifact.
+
+Layout:
+    <cache_dir>/hashes.json                          path/size/mtime -> sha256
+    <cache_dir>/<stem>-<hash12>-<imgsz>-<backend>/   one entry per key
+        meta.json                                    written last = entry complete
+        <artifact>                                   file or directory
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Optional
+
+
+class ModelArtifactCache:
+    """
+    Directory of exported model artifacts.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize cache (the directory is created on first export).
+
+        Args:
+            directory: Cache root, '~' is expanded
+        """
+        self.directory = os.path.expanduser(directory)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'exports': 0}
+
+    def model_hash(self, model_path: str) -> str:
+        """
+        SHA-256 of the weights file, remembered per (path, size, mtime)
+        so unchanged weights are not re-hashed on every start.
+        """
+        path = os.path.abspath(model_path)
+        st = os.stat(path)
+        stamp = f"{path}:{st.st_size}:{st.st_mtime_ns}"
+
+        index_path = os.path.join(self.directory, 'hashes.json')
+        with self._lock:
+            try:
+                with open(index_path) as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+            if stamp in index:
+                return index[stamp]
+
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            index[stamp] = digest.hexdigest()
+
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{index_path}.{os.getpid()}"
+            with open(tmp, 'w') as f:
+                json.dump(index, f)
+            os.replace(tmp, index_path)
+            return index[stamp]
+
+    def entry_dir(self, model_path: str, imgsz: int, backend: str) -> str:
+        stem = os.path.splitext(os.path.basename(model_path))[0]
+        key = f"{stem}-{self.model_hash(model_path)[:12]}-{imgsz}-{backend}"
+        return os.path.join(self.directory, key)
+
+    def lookup(self, model_path: str, imgsz: int, backend: str) -> Optional[str]:
+        """Path of the cached artifact, or None if this key was never exported."""
+        entry = self.entry_dir(model_path, imgsz, backend)
+        try:
+            with open(os.path.join(entry, 'meta.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        artifact = os.path.join(entry, meta['artifact'])
+        return artifact if os.path.exists(artifact) else None
+
+    def get(self, model_path: str, imgsz: int, backend: str,
+            export: Callable[[], str]) -> str:
+        """
+        Cached artifact for this key, exporting it first if needed.
+
+        Args:
+            model_path: Source weights (.pt)
+            imgsz: Input size the artifact is built for
+            backend: Export format, e.g. 'onnx', 'openvino', 'coreml', 'engine'
+            export: Produces the artifact and returns its path (it is moved
+                into the cache)
+
+        Returns:
+            Path of the artifact inside the cache
+        """
+        cached = self.lookup(model_path, imgsz, backend)
+        if cached:
+            self.stats['hits'] += 1
+            return cached
+
+        entry = self.entry_dir(model_path, imgsz, backend)
+        start_time = time.perf_counter()
+        produced = export()
+        export_ms = (time.perf_counter() - start_time) * 1000
+
+        # Assemble in a private directory, publish with one rename
+        staging = f"{entry}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(staging, exist_ok=True)
+        name = os.path.basename(os.path.normpath(produced))
+        shutil.move(produced, os.path.join(staging, name))
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump({
+                'model': os.path.basename(model_path),
+                'model_hash': self.model_hash(model_path),
+                'imgsz': imgsz,
+                'backend': backend,
+                'artifact': name,
+                'export_ms': round(export_ms, 1),
+                'created': time.time(),
+            }, f, indent=2)
+        try:
+            os.rename(staging, entry)
+        except OSError:
+            if self.lookup(model_path, imgsz, backend) is None:
+                shutil.rmtree(entry, ignore_errors=True)  # Leftover of an interrupted export
+                os.rename(staging, entry)
+            else:
+                shutil.rmtree(staging, ignore_errors=True)  # Another process got there first
+
+        self.stats['exports'] += 1
+        return os.path.join(entry, name)
@@ -0,0 +1,288 @@
+# object_tracker.py - Temporal Tracking for the Tactical Layer
+"""
+Object Tracker: Keeps detections stable across frames.
+IoU association in two passes (confident detections first, then weak ones
+to existing tracks, as in ByteTrack) and a constant-velocity Kalman filter
+per track. Stop decisions use the smoothed area with hysteresis, and the
+detector only runs every Nth frame; in between, tracks are extrapolated.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .config import AIConfig, DEFAULT_CONFIG
+from .tactical_detector import Detection, TacticalResult
+
+
+def iou(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> float:
+    """Intersection over union of two (x1, y1, x2, y2) boxes"""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    if inter <= 0:
+        return 0.0
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class BoxKalman:
+    """Constant-velocity Kalman filter over (cx, cy, w, h) in normalized units"""
+
+    # Process noise per second (position, velocity) and measurement noise
+    _Q_POS = 1e-3
+    _Q_VEL = 1e-2
+    _R = 5e-4
+
+    def __init__(self, bbox: Tuple[float, float, float, float]):
+        self.x = np.zeros(8)
+        self.x[:4] = self._to_cxcywh(bbox)
+        self.P = np.diag([1e-3] * 4 + [1e-1] * 4)
+        self._H = np.hstack([np.eye(4), np.zeros((4, 4))])
+
+    @staticmethod
+    def _to_cxcywh(bbox) -> np.ndarray:
+        x1, y1, x2, y2 = bbox
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+
+    def predict(self, dt: float):
+        """Advance the state by dt seconds"""
+        if dt <= 0:
+            return
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        Q = np.diag([self._Q_POS * dt] * 4 + [self._Q_VEL * dt] * 4)
+        self.x = F @ self.x
+        self.x[2:4] = np.maximum(self.x[2:4], 1e-4)
+        self.P = F @ self.P @ F.T + Q
+
+    def update(self, bbox: Tuple[float, float, float, float]):
+        """Correct the state with a measured box"""
+        z = self._to_cxcywh(bbox)
+        S = self._H @ self.P @ self._H.T + np.eye(4) * self._R
+        K = self.P @ self._H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self._H @ self.x)
+        self.P = (np.eye(8) - K @ self._H) @ self.P
+
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        cx, cy, w, h = self.x[:4]
+        return (
+            float(np.clip(cx - w / 2, 0, 1)), float(np.clip(cy - h / 2, 0, 1)),
+            float(np.clip(cx + w / 2, 0, 1)), float(np.clip(cy + h / 2, 0, 1))
+        )
+
+
+@dataclass
+class Track:
+    """One tracked object"""
+    track_id: int
+    class_name: str
+    confidence: float
+    kalman: BoxKalman
+    area_ratio: float  # Smoothed
+    last_seen: float
+    hits: int = 1
+    stopping: bool = False  # Hysteresis state
+
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        return self.kalman.bbox
+
+
+class ObjectTracker:
+    """
+    Multi-object tracker fed with per-frame detections.
+    """
+
+    def __init__(self, config: AIConfig = None):
+        """
+        Initialize tracker.
+
+        Args:
+            config: AI configuration, uses default if None
+        """
+        self.config = config or DEFAULT_CONFIG
+        self.tracks: List[Track] = []
+        self._next_id = 1
+        self._last_time: Optional[float] = None
+
+    def predict(self, now: float):
+        """Extrapolate all tracks to `now` and drop stale ones"""
+        if self._last_time is not None:
+            dt = now - self._last_time
+            for track in self.tracks:
+                track.kalman.predict(dt)
+        self._last_time = now
+        self.tracks = [t for t in self.tracks if now - t.last_seen <= self.config.tracker_max_age]
+
+    def _associate(self, tracks: List[Track], detections: List[Detection]):
+        """Greedy IoU matching of detections to same-class tracks"""
+        pairs = []
+        for ti, track in enumerate(tracks):
+            for di, det in enumerate(detections):
+                if det.class_name != track.class_name:
+                    continue
+                overlap = iou(track.bbox, det.bbox)
+                if overlap >= self.config.tracker_iou_threshold:
+                    pairs.append((overlap, ti, di))
+        pairs.sort(reverse=True)
+
+        matched_tracks, matched_dets, matches = set(), set(), []
+        for _, ti, di in pairs:
+            if ti in matched_tracks or di in matched_dets:
+                continue
+            matched_tracks.add(ti)
+            matched_dets.add(di)
+            matches.append((tracks[ti], detections[di]))
+        unmatched_tracks = [t for i, t in enumerate(tracks) if i not in matched_tracks]
+        unmatched_dets = [d for i, d in enumerate(detections) if i not in matched_dets]
+        return matches, unmatched_tracks, unmatched_dets
+
+    def update(self, detections: List[Detection], now: float):
+        """
+        Fold one frame of detections into the tracks.
+
+        Args:
+            detections: Detector output (may include low-confidence boxes)
+            now: Frame time in seconds
+        """
+        self.predict(now)
+        high = [d for d in detections if d.confidence >= self.config.yolo_confidence]
+        low = [d for d in detections if d.confidence < self.config.yolo_confidence]
+
+        # Pass 1: confident detections; pass 2: weak ones keep existing tracks alive
+        matches, remaining, new_dets = self._associate(self.tracks, high)
+        low_matches, _, _ = self._associate(remaining, low)
+
+        alpha = self.config.track_area_smoothing
+        for track, det in matches + low_matches:
+            track.kalman.update(det.bbox)
+            track.area_ratio = alpha * det.area_ratio + (1 - alpha) * track.area_ratio
+            track.confidence = det.confidence
+            track.last_seen = now
+            track.hits += 1
+
+        for det in new_dets:
+            self.tracks.append(Track(
+                track_id=self._next_id,
+                class_name=det.class_name,
+                confidence=det.confidence,
+                kalman=BoxKalman(det.bbox),
+                area_ratio=det.area_ratio,
+                last_seen=now
+            ))
+            self._next_id += 1
+
+    def confirmed(self) -> List[Track]:
+        """Tracks seen often enough to report (large boxes confirm at once)"""
+        return [
+            t for t in self.tracks
+            if t.hits >= self.config.tracker_min_hits or t.area_ratio >= self.config.person_stop_threshold
+        ]
+
+    def stop_decision(self) -> Tuple[bool, Optional[str]]:
+        """
+        Stop with hysteresis: a track starts stopping at person_stop_threshold
+        and releases only below person_stop_threshold * stop_release_ratio.
+        """
+        enter = self.config.person_stop_threshold
+        release = enter * self.config.stop_release_ratio
+        reason = None
+        for track in self.confirmed():
+            if track.class_name not in self.config.obstacle_classes:
+                continue
+            if track.area_ratio >= enter:
+                track.stopping = True
+            elif track.area_ratio < release:
+                track.stopping = False
+            if track.stopping and reason is None:
+                reason = f"{track.class_name} detected ({track.area_ratio*100:.0f}% of frame)"
+        return reason is not None, reason
+
+    def reset(self):
+        self.tracks = []
+        self._last_time = None
+
+
+class TrackedDetector:
+    """
+    TacticalDetector + ObjectTracker: runs inference every Nth frame and
+    extrapolates tracks in between.
+    """
+
+    def __init__(self, detector, config: AIConfig = None):
+        """
+        Initialize tracked detector.
+
+        Args:
+            detector: TacticalDetector (anything with detect(frame, confidence=))
+            config: AI configuration, uses default if None
+        """
+        self.detector = detector
+        self.config = config or DEFAULT_CONFIG
+        self.tracker = ObjectTracker(self.config)
+        self._frames = 0
+        self._last_detect = 0.0
+        self.stats = {'detector_runs': 0, 'extrapolated': 0}
+
+    def _should_detect(self, now: float, detect_every: int = None) -> bool:
+        if self._frames % max(1, detect_every or self.config.detect_every_n_frames) == 0:
+            return True
+        # Never extrapolate longer than the track lifetime
+        return now - self._last_detect >= self.config.tracker_max_age / 2
+
+    def process(self, frame: np.ndarray, now: float = None, force_detect: bool = False,
+                imgsz: int = None, detect_every: int = None) -> TacticalResult:
+        """
+        Track objects in a frame.
+
+        Args:
+            frame: RGB numpy array (H, W, 3)
+            now: Frame time in seconds (default: time.monotonic())
+            force_detect: Run the detector even on a skip frame
+            imgsz: Inference resolution override (rate governor)
+            detect_every: Detector cadence override (rate governor)
+
+        Returns:
+            TacticalResult built from confirmed tracks
+        """
+        now = time.monotonic() if now is None else now
+        inference_ms = 0.0
+        extrapolated = not (force_detect or self._should_detect(now, detect_every))
+        self._frames += 1
+
+        if extrapolated:
+            self.tracker.predict(now)
+            self.stats['extrapolated'] += 1
+        else:
+            kwargs = {'imgsz': imgsz} if imgsz else {}
+            raw = self.detector.detect(frame, confidence=self.config.tracker_low_confidence, **kwargs)
+            inference_ms = raw.inference_time_ms
+            self.tracker.update(raw.detections, now)
+            self._last_detect = now
+            self.stats['detector_runs'] += 1
+
+        should_stop, stop_reason = self.tracker.stop_decision()
+        detections = [
+            Detection(
+                class_name=t.class_name,
+                confidence=t.confidence,
+                bbox=t.bbox,
+                area_ratio=t.area_ratio,
+                track_id=t.track_id
+            )
+            for t in self.tracker.confirmed()
+        ]
+        return TacticalResult(
+            detections=detections,
+            should_stop=should_stop,
+            stop_reason=stop_reason,
+            inference_time_ms=inference_ms,
+            extrapolated=extrapolated
+        )
+
+    def is_ready(self) -> bool:
+        return self.detector.is_ready()
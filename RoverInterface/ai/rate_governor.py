@@ -0,0 +1,148 @@
+# rate_governor.py - Deadline-Driven Tactical Rate Control
+"""
+Rate Governor: Paces the tactical loop against yolo_target_latency.
+Each iteration gets a deadline one period after it starts; the loop
+sleeps only for what is left of it, so processing time is no longer
+added on top of a fixed sleep. When iterations keep overrunning, the
+governor steps down a quality ladder (smaller inference size, then more
+tracker-extrapolated frames per detector run) and steps back up once
+there is headroom again.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .config import AIConfig, DEFAULT_CONFIG
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """One rung of the quality ladder"""
+    imgsz: int  # Inference resolution
+    detect_every: int  # Detector runs every Nth frame, tracks fill the rest
+
+
+def quality_levels(config: AIConfig) -> List[QualityLevel]:
+    """Quality ladder, best first."""
+    every = max(1, config.detect_every_n_frames)
+    levels = [QualityLevel(config.yolo_imgsz, every)]
+    for imgsz in sorted(config.governor_imgsz_steps, reverse=True):
+        if imgsz < levels[-1].imgsz:
+            levels.append(QualityLevel(imgsz, every))
+    if config.tracker_enabled:
+        levels.append(QualityLevel(levels[-1].imgsz, every * 2))
+    return levels
+
+
+class RateGovernor:
+    """
+    Deadline scheduler + quality ladder for the tactical loop.
+    """
+
+    def __init__(self, config: AIConfig = None):
+        """
+        Initialize governor at full quality.
+
+        Args:
+            config: AI configuration, uses default if None
+        """
+        self.config = config or DEFAULT_CONFIG
+        self.period = self.config.yolo_target_latency / 1000
+        # Disabled = pacing only, a single full-quality level
+        self.levels = quality_levels(self.config)
+        if not self.config.governor_enabled:
+            self.levels = self.levels[:1]
+        self.level = 0
+        self._load: Optional[float] = None  # EMA of processing time / period
+        self._behind = 0
+        self._ahead = 0
+        self._window_start = time.perf_counter()
+        self._window_count = 0
+        self.achieved_hz = 0.0
+        self.stats = {'iterations': 0, 'deadline_misses': 0, 'level_changes': 0}
+
+    @property
+    def quality(self) -> QualityLevel:
+        return self.levels[self.level]
+
+    def sleep_time(self, started: float, now: float = None) -> float:
+        """
+        Finish an iteration and get the time left until its deadline.
+
+        Args:
+            started: perf_counter() when the iteration began
+            now: perf_counter() now (default: current time)
+
+        Returns:
+            Seconds to sleep (0 if the deadline was missed)
+        """
+        now = time.perf_counter() if now is None else now
+        processing = now - started
+        self.stats['iterations'] += 1
+        self._window_count += 1
+        if now - self._window_start >= 1.0:
+            self.achieved_hz = self._window_count / (now - self._window_start)
+            self._window_start, self._window_count = now, 0
+
+        remaining = started + self.period - now
+        if remaining < 0:
+            self.stats['deadline_misses'] += 1
+        self._adapt(processing / self.period)
+        return max(0.0, remaining)
+
+    def pace(self, started: float, now: float = None) -> float:
+        """
+        Time left until the deadline of an iteration that ran no detection
+        (e.g. a static frame), without charging it to the load estimate.
+
+        Args:
+            started: perf_counter() when the iteration began
+            now: perf_counter() now (default: current time)
+
+        Returns:
+            Seconds to sleep
+        """
+        now = time.perf_counter() if now is None else now
+        return max(0.0, started + self.period - now)
+
+    def _adapt(self, load: float):
+        """Step the ladder on sustained overload or sustained headroom."""
+        self._load = load if self._load is None else 0.8 * self._load + 0.2 * load
+        patience = self.config.governor_patience
+
+        if self._load > 1.0:
+            self._behind += 1
+            self._ahead = 0
+        elif self._load < self.config.governor_recover_ratio:
+            self._ahead += 1
+            self._behind = 0
+        else:
+            self._behind = self._ahead = 0
+
+        if self._behind >= patience and self.level < len(self.levels) - 1:
+            self._set_level(self.level + 1)
+        elif self._ahead >= patience * 3 and self.level > 0:
+            self._set_level(self.level - 1)  # Recover slowly, degrade fast
+
+    def _set_level(self, level: int):
+        self.level = level
+        self.stats['level_changes'] += 1
+        self._behind = self._ahead = 0
+        self._load = None  # Old measurements describe the old level
+
+    def get_status(self) -> dict:
+        quality = self.quality
+        iterations = self.stats['iterations']
+        return {
+            'target_hz': round(1 / self.period, 1),
+            'achieved_hz': round(self.achieved_hz, 1),
+            'deadline_misses': self.stats['deadline_misses'],
+            'miss_rate': round(self.stats['deadline_misses'] / iterations, 3) if iterations else 0.0,
+            'level': self.level,
+            'levels': len(self.levels),
+            'imgsz': quality.imgsz,
+            'detect_every': quality.detect_every,
+            'load': round(self._load, 2) if self._load is not None else None,
+            'level_changes': self.stats['level_changes'],
+        }
@@ -0,0 +1,164 @@
+# sensor_fusion.py - Drive Corridor ROI and Ultrasonic Fusion
+"""
+Sensor Fusion: Focuses tactical inference on what can actually stop the
+rover. YOLO runs on the drive corridor (lower-central crop) and only
+periodically on the full frame. The HC-SR04 range from the gateway
+telemetry gates escalation: when something is close, inference switches
+to full frame at higher resolution on every frame, and the range itself
+can force a stop.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .config import AIConfig, DEFAULT_CONFIG
+from .tactical_detector import Detection, TacticalResult
+
+_EDGE = 0.01  # Crop-normalized distance at which a box counts as touching the crop edge
+
+
+def crop_roi(frame: np.ndarray, roi: Tuple[float, float, float, float]) -> Tuple[np.ndarray, Tuple[int, int, int, int]]:
+    """
+    Crop a normalized (x1, y1, x2, y2) region.
+
+    Returns:
+        (crop view, pixel box of the crop in the frame)
+    """
+    h, w = frame.shape[:2]
+    x1, y1 = int(roi[0] * w), int(roi[1] * h)
+    x2, y2 = max(int(roi[2] * w), x1 + 1), max(int(roi[3] * h), y1 + 1)
+    return frame[y1:y2, x1:x2], (x1, y1, x2, y2)
+
+
+class CorridorDetector:
+    """
+    Wraps TacticalDetector: ROI-cropped inference with range-driven escalation.
+    Usable wherever a TacticalDetector is (including under TrackedDetector).
+    """
+
+    def __init__(self, detector, config: AIConfig = None):
+        """
+        Initialize corridor detector.
+
+        Args:
+            detector: TacticalDetector
+            config: AI configuration, uses default if None
+        """
+        self.detector = detector
+        self.config = config or DEFAULT_CONFIG
+        self.range_cm: Optional[float] = None
+        self._runs = 0
+        self.stats = {'roi_runs': 0, 'full_runs': 0, 'escalated_runs': 0}
+
+    def set_range(self, range_cm: Optional[float]):
+        """Latest ultrasonic range (None = unknown/stale)"""
+        self.range_cm = range_cm
+
+    @property
+    def escalated(self) -> bool:
+        """Something is inside the escalation range"""
+        return self.range_cm is not None and self.range_cm < self.config.ultrasonic_escalate_cm
+
+    def detect(self, frame: np.ndarray, confidence: float = None, imgsz: int = None) -> TacticalResult:
+        """
+        Run inference on the corridor, the full frame, or the full frame at
+        escalated resolution.
+
+        Args:
+            frame: RGB numpy array (H, W, 3)
+            confidence: Passed through to the detector
+            imgsz: Inference resolution when not escalated (rate governor)
+        """
+        self._runs += 1
+        if self.escalated:
+            self.stats['escalated_runs'] += 1
+            return self.detector.detect(frame, confidence=confidence, imgsz=self.config.escalated_imgsz)
+
+        if self._runs % max(1, self.config.roi_full_frame_every) == 0:
+            self.stats['full_runs'] += 1
+            return self.detector.detect(frame, confidence=confidence, imgsz=imgsz)
+
+        self.stats['roi_runs'] += 1
+        crop, (cx1, cy1, cx2, cy2) = crop_roi(frame, self.config.drive_corridor_roi)
+        result = self.detector.detect(crop, confidence=confidence, imgsz=imgsz)
+
+        # Map crop-normalized boxes back to the frame. Boxes inside the crop
+        # keep their frame-relative area; a box cut off by a crop edge may be
+        # larger than what is visible and counts with its share of the corridor
+        h, w = frame.shape[:2]
+        cw, ch = cx2 - cx1, cy2 - cy1
+        inner_edges = (cx1 > 0, cy1 > 0, cx2 < w, cy2 < h)  # Crop edges that cut the frame
+        detections = []
+        for det in result.detections:
+            x1, y1, x2, y2 = det.bbox
+            bbox = ((cx1 + x1 * cw) / w, (cy1 + y1 * ch) / h, (cx1 + x2 * cw) / w, (cy1 + y2 * ch) / h)
+            area_ratio = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+            touching = (x1 <= _EDGE, y1 <= _EDGE, x2 >= 1 - _EDGE, y2 >= 1 - _EDGE)
+            if any(t and inner for t, inner in zip(touching, inner_edges)):
+                area_ratio = max(area_ratio, (x2 - x1) * (y2 - y1))
+            detections.append(Detection(
+                class_name=det.class_name,
+                confidence=det.confidence,
+                bbox=bbox,
+                area_ratio=area_ratio
+            ))
+
+        should_stop, stop_reason = False, None
+        for det in detections:
+            if (det.class_name in self.config.obstacle_classes and
+                    det.confidence >= self.config.yolo_confidence and
+                    det.area_ratio >= self.config.person_stop_threshold):
+                should_stop = True
+                stop_reason = f"{det.class_name} detected ({det.area_ratio*100:.0f}% of frame)"
+        return TacticalResult(
+            detections=detections,
+            should_stop=should_stop,
+            stop_reason=stop_reason,
+            inference_time_ms=result.inference_time_ms
+        )
+
+    def is_ready(self) -> bool:
+        return self.detector.is_ready()
+
+
+def in_corridor(det: Detection, roi: Tuple[float, float, float, float]) -> bool:
+    """Detection box overlaps the drive corridor"""
+    return det.bbox[0] < roi[2] and det.bbox[2] > roi[0] and det.bbox[1] < roi[3] and det.bbox[3] > roi[1]
+
+
+def fuse_range(result: TacticalResult, range_cm: Optional[float], config: AIConfig = None) -> TacticalResult:
+    """
+    Combine the vision decision with the ultrasonic range.
+
+    - range below ultrasonic_stop_cm: stop, whatever vision says
+    - range below ultrasonic_escalate_cm with a confident (yolo_confidence)
+      obstacle class in the corridor: stop even if its box is below
+      person_stop_threshold (weak tracker-level boxes do not count)
+    - otherwise: vision decision unchanged
+
+    Args:
+        result: TacticalResult (detector or tracker output)
+        range_cm: Ultrasonic range in cm, None if unknown or stale
+        config: AI configuration, uses default if None
+
+    Returns:
+        The same result, with should_stop/stop_reason/range_cm updated
+    """
+    config = config or DEFAULT_CONFIG
+    result.range_cm = range_cm
+    if range_cm is None or result.should_stop:
+        return result
+
+    if range_cm < config.ultrasonic_stop_cm:
+        result.should_stop = True
+        result.stop_reason = f"Obstacle at {range_cm:.0f}cm (ultrasonic)"
+    elif range_cm < config.ultrasonic_escalate_cm:
+        for det in result.detections:
+            if (det.class_name in config.obstacle_classes and
+                    det.confidence >= config.yolo_confidence and
+                    in_corridor(det, config.drive_corridor_roi)):
+                result.should_stop = True
+                result.stop_reason = f"{det.class_name} in path at {range_cm:.0f}cm"
+                break
+    return result
@@ -0,0 +1,137 @@
+# shared_detector.py - One YOLO Model for Many Rovers
+"""
+Shared Detector: A single TacticalDetector serving every rover's tactical
+loop. Requests that arrive within a short window are run as one batched
+model call, so N rovers cost one model in memory and fewer, larger
+inference calls instead of N models contending for the same accelerator.
+Drop-in for TacticalDetector wherever a detector is wrapped (corridor,
+tracker).
+"""
+
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from .config import AIConfig, DEFAULT_CONFIG
+from .tactical_detector import TacticalDetector, TacticalResult, warmup_shapes
+
+
+class _Request:
+    __slots__ = ('frame', 'confidence', 'imgsz', 'done', 'result', 'error')
+
+    def __init__(self, frame, confidence, imgsz):
+        self.frame = frame
+        self.confidence = confidence
+        self.imgsz = imgsz
+        self.done = threading.Event()
+        self.result: Optional[TacticalResult] = None
+        self.error: Optional[Exception] = None
+
+
+class SharedDetector:
+    """
+    Thread-safe, batching front end for one TacticalDetector.
+    """
+
+    def __init__(self, config: AIConfig = None, max_batch: int = 4, batch_window_ms: float = 5.0):
+        """
+        Initialize shared detector (the model loads on the first load()).
+
+        Args:
+            config: AI configuration, uses default if None
+            max_batch: Most frames per model call
+            batch_window_ms: How long the first request waits for company
+        """
+        self.config = config or DEFAULT_CONFIG
+        self._max_batch = max_batch
+        self._batch_window = batch_window_ms / 1000
+        self._detector: Optional[TacticalDetector] = None
+        self._load_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._queue: List[_Request] = []
+        self._warmup_ms: Optional[float] = None
+        self.stats = {'requests': 0, 'batches': 0, 'max_batch_seen': 0}
+
+    def load(self):
+        """Load the model once; later callers wait for the first."""
+        with self._load_lock:
+            if self._detector is None:
+                self._detector = TacticalDetector(self.config)
+                threading.Thread(target=self._batch_loop, daemon=True, name="SharedDetector").start()
+
+    def is_ready(self) -> bool:
+        return self._detector is not None and self._detector.is_ready()
+
+    def warmup(self) -> float:
+        """Warm the model once; every rover after the first gets 0."""
+        with self._load_lock:
+            if self._warmup_ms is not None or not self.is_ready():
+                return 0.0
+            # Through the batch thread, which owns the model once it is loaded
+            start_time = time.perf_counter()
+            for shape, imgsz in warmup_shapes(self.config):
+                frame = np.zeros(shape, np.uint8)
+                for _ in range(self.config.warmup_iterations):
+                    self.detect(frame, imgsz=imgsz)
+            self._warmup_ms = (time.perf_counter() - start_time) * 1000
+            return self._warmup_ms
+
+    def detect(self, frame: np.ndarray, confidence: float = None, imgsz: int = None) -> TacticalResult:
+        """
+        Same contract as TacticalDetector.detect; blocks until the batch runs.
+        """
+        if self._detector is None:
+            self.load()
+        request = _Request(frame, confidence, imgsz)
+        with self._cond:
+            self._queue.append(request)
+            self.stats['requests'] += 1
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _take_batch(self) -> List[_Request]:
+        """Wait for a request, then up to batch_window for more."""
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = time.monotonic() + self._batch_window
+            while len(self._queue) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._queue[:self._max_batch]
+            del self._queue[:self._max_batch]
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            batch = self._take_batch()
+            # One model call per (confidence, imgsz) group
+            groups = {}
+            for request in batch:
+                groups.setdefault((request.confidence, request.imgsz), []).append(request)
+
+            for (confidence, imgsz), requests in groups.items():
+                try:
+                    results = self._detector.detect_batch([r.frame for r in requests], confidence, imgsz)
+                    for request, result in zip(requests, results):
+                        request.result = result
+                except Exception as e:
+                    for request in requests:
+                        request.error = e
+                for request in requests:
+                    request.done.set()
+
+                self.stats['batches'] += 1
+                self.stats['max_batch_seen'] = max(self.stats['max_batch_seen'], len(requests))
+
+    def get_status(self) -> dict:
+        with self._cond:
+            queued = len(self._queue)
+        return {'ready': self.is_ready(), 'queued': queued, **self.stats}
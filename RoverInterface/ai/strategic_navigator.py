@@ -6,14 +6,17 @@ Runs at 0.5Hz (every 2 seconds) to analyze scene and provide steering guidance.
 
 import json
 import re
+import threading
 import time
 from dataclasses import dataclass
-from typing import Optional
-from PIL import Image
+from typing import Optional, TYPE_CHECKING
 import io
 
 from .config import AIConfig, DEFAULT_CONFIG, SteeringCommand, NavigationGoal
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 
 @dataclass
 class StrategicResult:
@@ -24,6 +27,7 @@ class StrategicResult:
     reasoning: str
     inference_time_ms: float
     raw_response: str
+    frame_id: Optional[int] = None  # Source frame (FrameBuffer provenance)
 
 
 class StrategicNavigator:
@@ -43,8 +47,8 @@ class StrategicNavigator:
         """
         self.config = config or DEFAULT_CONFIG
         self._last_inference_time = 0
-        import requests
-        self._requests = requests  # Lazy load requests
+        self._session = None  # requests.Session, created on first use
+        self._session_lock = threading.Lock()  # Rovers sharing the navigator warm up concurrently
         
         if not self.config.use_remote_vlm:
             print("⚠️ Local VLM disabled in favor of Hybrid Cloud Architecture.")
@@ -76,12 +80,37 @@ class StrategicNavigator:
             "reasoning": "Could not parse VLM response"
         }
     
+    def _get_session(self):
+        """Keep-alive HTTP session (importing requests is deferred to here)"""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+            return self._session
+    
+    def warmup(self) -> float:
+        """
+        Open the connection to the remote VLM ahead of the first analysis,
+        so DNS, TCP and TLS setup are not paid by the first decision.
+        
+        Returns:
+            Warm-up time in ms
+        """
+        start_time = time.perf_counter()
+        session = self._get_session()
+        if self.is_ready():
+            try:
+                session.head(self.config.remote_vlm_url, timeout=self.config.remote_timeout)
+            except Exception as e:
+                print(f"⚠️ Remote VLM unreachable during warm-up: {e}")
+        return (time.perf_counter() - start_time) * 1000
+    
     def can_run(self) -> bool:
         """Check if cooldown has elapsed since last inference"""
         elapsed = time.time() - self._last_inference_time
         return elapsed >= self.config.vlm_cooldown_seconds
     
-    def analyze(self, image: Image.Image, force: bool = False) -> Optional[StrategicResult]:
+    def analyze(self, image: "Image.Image", force: bool = False) -> Optional[StrategicResult]:
         """
         Analyze scene via Remote VLM.
         """
@@ -109,7 +138,7 @@ class StrategicNavigator:
             img_bytes = img_byte_arr.getvalue()
             
             # Send to Colab
-            response = self._requests.post(
+            response = self._get_session().post(
                 self.config.remote_vlm_url,
                 files={"file": ("frame.jpg", img_bytes, "image/jpeg")},
                 timeout=self.config.remote_timeout
@@ -151,7 +180,7 @@ class StrategicNavigator:
 
     def is_ready(self) -> bool:
         """Check if remote config is present"""
-        return self.config.use_remote_vlm and "ngrok" in self.config.remote_vlm_url
+        return self.config.use_remote_vlm and self.config.remote_vlm_url.startswith(("http://", "https://"))
     
     def get_cooldown_remaining(self) -> float:
         """Get seconds until next inference is allowed"""
@@ -6,10 +6,11 @@ Runs at 30Hz to detect people and obstacles.
 
 import time
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 
 from .config import AIConfig, DEFAULT_CONFIG
+from .model_cache import ModelArtifactCache
 
 
 @dataclass
@@ -19,6 +20,7 @@ class Detection:
     confidence: float
     bbox: Tuple[float, float, float, float]  # x1, y1, x2, y2 normalized
     area_ratio: float  # Fraction of frame covered by bbox
+    track_id: Optional[int] = None  # Set when produced by the ObjectTracker
 
 
 @dataclass
@@ -28,6 +30,29 @@ class TacticalResult:
     should_stop: bool
     stop_reason: Optional[str]
     inference_time_ms: float
+    frame_id: Optional[int] = None  # Source frame (FrameBuffer provenance)
+    extrapolated: bool = False  # Tracker prediction, detector skipped this frame
+    range_cm: Optional[float] = None  # Ultrasonic range fused into the decision
+
+
+def warmup_shapes(config: AIConfig) -> List[Tuple[Tuple[int, int, int], Optional[int]]]:
+    """
+    Input shapes the tactical loop will actually feed the model, as
+    (frame shape, imgsz override) pairs: the camera frame, the drive
+    corridor crop, the escalated close-range pass and the rate
+    governor's reduced sizes.
+    """
+    h, w = config.input_height, config.input_width
+    shapes = [((h, w, 3), None)]
+    if config.fusion_enabled:
+        x1, y1, x2, y2 = config.drive_corridor_roi
+        shapes.append(((max(1, int((y2 - y1) * h)), max(1, int((x2 - x1) * w)), 3), None))
+        if config.escalated_imgsz != config.yolo_imgsz:
+            shapes.append(((h, w, 3), config.escalated_imgsz))
+    if config.governor_enabled:
+        shapes.extend(((h, w, 3), imgsz) for imgsz in config.governor_imgsz_steps
+                      if imgsz < config.yolo_imgsz)
+    return shapes
 
 
 class TacticalDetector:
@@ -45,14 +70,20 @@ class TacticalDetector:
         """
         self.config = config or DEFAULT_CONFIG
         self.model = None
+        self._models: Dict[int, object] = {}  # imgsz -> exported model
         self._load_model()
     
     def _load_model(self):
-        """Load YOLOv8 model with CoreML acceleration if available"""
+        """Load YOLOv8 model, from the artifact cache for exported backends"""
         try:
             from ultralytics import YOLO
-            self.model = YOLO(self.config.yolo_model)
-            print(f"✅ YOLO model loaded: {self.config.yolo_model}")
+            base = YOLO(self.config.yolo_model)
+            if self.config.yolo_backend == "pytorch":
+                self.model = base
+            else:
+                self._models = self._load_exported(YOLO, base)
+                self.model = self._models[self.config.yolo_imgsz]
+            print(f"✅ YOLO model loaded: {self.config.yolo_model} ({self.config.yolo_backend})")
         except ImportError:
             print("⚠️ ultralytics not installed. Run: pip install ultralytics")
             self.model = None
@@ -60,34 +91,88 @@ class TacticalDetector:
             print(f"❌ Failed to load YOLO model: {e}")
             self.model = None
     
-    def detect(self, frame: np.ndarray) -> TacticalResult:
+    def _load_exported(self, YOLO, base) -> Dict[int, object]:
+        """One exported model per inference size (exports have a fixed input)"""
+        cache = ModelArtifactCache(self.config.model_cache_dir)
+        weights = getattr(base, 'ckpt_path', None) or self.config.yolo_model
+        sizes = {self.config.yolo_imgsz}
+        if self.config.fusion_enabled:
+            sizes.add(self.config.escalated_imgsz)
+        if self.config.governor_enabled:
+            sizes.update(s for s in self.config.governor_imgsz_steps if s < self.config.yolo_imgsz)
+        
+        models = {}
+        for imgsz in sorted(sizes):
+            exports = cache.stats['exports']
+            artifact = cache.get(
+                weights, imgsz, self.config.yolo_backend,
+                lambda: base.export(format=self.config.yolo_backend, imgsz=imgsz, verbose=False)
+            )
+            reused = "exported" if cache.stats['exports'] > exports else "cached"
+            print(f"📦 YOLO {self.config.yolo_backend} @ {imgsz}px ({reused}): {artifact}")
+            models[imgsz] = YOLO(artifact, task='detect')
+        return models
+    
+    def detect(self, frame: np.ndarray, confidence: float = None,
+               imgsz: int = None) -> TacticalResult:
         """
         Run object detection on frame.
         
         Args:
             frame: RGB numpy array (H, W, 3)
+            confidence: Override yolo_confidence (the tracker wants weak boxes too)
+            imgsz: Inference resolution override (escalated close-range inference)
             
         Returns:
             TacticalResult with detections and safety decision
         """
+        return self.detect_batch([frame], confidence, imgsz)[0]
+    
+    def detect_batch(self, frames: List[np.ndarray], confidence: float = None,
+                     imgsz: int = None) -> List[TacticalResult]:
+        """
+        Run object detection on several frames in one model call.
+        
+        Args:
+            frames: RGB numpy arrays (H, W, 3), sizes may differ
+            confidence: Override yolo_confidence
+            imgsz: Inference resolution override
+            
+        Returns:
+            One TacticalResult per frame, in order
+        """
         start_time = time.time()
         
         if self.model is None:
-            return TacticalResult(
-                detections=[],
-                should_stop=False,
-                stop_reason=None,
-                inference_time_ms=0
-            )
+            return [
+                TacticalResult(
+                    detections=[],
+                    should_stop=False,
+                    stop_reason=None,
+                    inference_time_ms=0
+                )
+                for _ in frames
+            ]
         
         # Run inference
-        results = self.model(
-            frame,
-            conf=self.config.yolo_confidence,
+        imgsz = imgsz or self.config.yolo_imgsz
+        model = self._models.get(imgsz, self.model)
+        results = model(
+            frames if len(frames) > 1 else frames[0],
+            conf=confidence if confidence is not None else self.config.yolo_confidence,
             iou=self.config.yolo_iou_threshold,
+            imgsz=imgsz,
             verbose=False
         )
         
+        inference_time = (time.time() - start_time) * 1000
+        return [
+            self._to_result(result, frame, inference_time)
+            for frame, result in zip(frames, results)
+        ]
+    
+    def _to_result(self, result, frame: np.ndarray, inference_time: float) -> TacticalResult:
+        """Convert one ultralytics result into a TacticalResult"""
         frame_h, frame_w = frame.shape[:2]
         frame_area = frame_h * frame_w
         
@@ -95,10 +180,7 @@ class TacticalDetector:
         should_stop = False
         stop_reason = None
         
-        for result in results:
-            if result.boxes is None:
-                continue
-                
+        if result.boxes is not None:
             for box in result.boxes:
                 class_id = int(box.cls[0])
                 class_name = self.model.names[class_id]
@@ -118,13 +200,11 @@ class TacticalDetector:
                 detections.append(detection)
                 
                 # Check for safety stop conditions
-                if class_name in self.config.obstacle_classes:
+                if class_name in self.config.obstacle_classes and confidence >= self.config.yolo_confidence:
                     if area_ratio >= self.config.person_stop_threshold:
                         should_stop = True
                         stop_reason = f"{class_name} detected ({area_ratio*100:.0f}% of frame)"
         
-        inference_time = (time.time() - start_time) * 1000
-        
         return TacticalResult(
             detections=detections,
             should_stop=should_stop,
@@ -132,6 +212,23 @@ class TacticalDetector:
             inference_time_ms=inference_time
         )
     
+    def warmup(self) -> float:
+        """
+        Run dummy inferences at every representative input shape so real
+        frames do not pay for graph setup and allocator growth.
+        
+        Returns:
+            Warm-up time in ms (0 if no model)
+        """
+        if self.model is None:
+            return 0.0
+        start_time = time.perf_counter()
+        for shape, imgsz in warmup_shapes(self.config):
+            frame = np.zeros(shape, np.uint8)
+            for _ in range(self.config.warmup_iterations):
+                self.detect(frame, imgsz=imgsz)
+        return (time.perf_counter() - start_time) * 1000
+    
     def is_ready(self) -> bool:
         """Check if model is loaded and ready"""
         return self.model is not None
@@ -0,0 +1,117 @@
+# vlm_scheduler.py - Fair-Share Access to the Remote VLM
+"""
+VLM Scheduler: Shares one StrategicNavigator endpoint between rovers.
+Each rover keeps its own cooldown, but requests to the VLM are admitted
+up to max_concurrent at a time, and when several rovers are waiting the
+one that has been served least goes first, so a chatty rover cannot
+starve the others.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from .config import AIConfig, DEFAULT_CONFIG
+from .strategic_navigator import StrategicNavigator, StrategicResult
+
+
+class FairShareVLM:
+    """
+    Admission control for a shared StrategicNavigator.
+    """
+
+    def __init__(self, navigator: StrategicNavigator, max_concurrent: int = 1):
+        """
+        Initialize scheduler.
+
+        Args:
+            navigator: The shared navigator (its own cooldown is bypassed)
+            max_concurrent: Requests in flight at once
+        """
+        self.navigator = navigator
+        self._max_concurrent = max_concurrent
+        self._cond = threading.Condition()
+        self._active = 0
+        self._arrivals = 0
+        self._waiting: Dict[str, int] = {}
+        self._served: Dict[str, int] = {}
+        self._warmup_lock = threading.Lock()
+        self._warmup_ms: Optional[float] = None
+
+    def client(self, rover_id: str, config: AIConfig = None) -> 'RoverVLMClient':
+        """StrategicNavigator-compatible handle for one rover."""
+        with self._cond:
+            # Newcomers start level with the least-served rover, not at zero
+            self._served.setdefault(rover_id, min(self._served.values(), default=0))
+        return RoverVLMClient(self, rover_id, config or self.navigator.config)
+
+    def warmup(self) -> float:
+        """Warm up the shared navigator once; later calls return the first result."""
+        with self._warmup_lock:
+            if self._warmup_ms is None:
+                self._warmup_ms = self.navigator.warmup()
+            return self._warmup_ms
+
+    def _next(self) -> Optional[str]:
+        if not self._waiting:
+            return None
+        return min(self._waiting, key=lambda r: (self._served[r], self._waiting[r]))
+
+    def acquire(self, rover_id: str):
+        """Block until this rover may send a request."""
+        with self._cond:
+            self._arrivals += 1
+            self._waiting[rover_id] = self._arrivals
+            while self._active >= self._max_concurrent or self._next() != rover_id:
+                self._cond.wait()
+            del self._waiting[rover_id]
+            self._active += 1
+
+    def release(self, rover_id: str):
+        with self._cond:
+            self._active -= 1
+            self._served[rover_id] = self._served.get(rover_id, 0) + 1
+            self._cond.notify_all()
+
+    def get_status(self) -> dict:
+        with self._cond:
+            return {
+                'active': self._active,
+                'waiting': sorted(self._waiting, key=self._waiting.get),
+                'served': dict(self._served)
+            }
+
+
+class RoverVLMClient:
+    """
+    Per-rover view of the shared VLM (drop-in for StrategicNavigator in AIWorker).
+    """
+
+    def __init__(self, scheduler: FairShareVLM, rover_id: str, config: AIConfig = None):
+        self._scheduler = scheduler
+        self.rover_id = rover_id
+        self.config = config or DEFAULT_CONFIG
+        self._last_inference_time = 0
+
+    def is_ready(self) -> bool:
+        return self._scheduler.navigator.is_ready()
+
+    def warmup(self) -> float:
+        return self._scheduler.warmup()
+
+    def can_run(self) -> bool:
+        return time.time() - self._last_inference_time >= self.config.vlm_cooldown_seconds
+
+    def get_cooldown_remaining(self) -> float:
+        return max(0, self.config.vlm_cooldown_seconds - (time.time() - self._last_inference_time))
+
+    def analyze(self, image, force: bool = False) -> Optional[StrategicResult]:
+        """Wait for this rover's turn, then run the shared navigator."""
+        if not force and not self.can_run():
+            return None
+        self._last_inference_time = time.time()
+        self._scheduler.acquire(self.rover_id)
+        try:
+            return self._scheduler.navigator.analyze(image, force=True)
+        finally:
+            self._scheduler.release(self.rover_id)
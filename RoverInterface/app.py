@@ -1,39 +1,77 @@
 #app.py
 
 from nicegui import ui, app
-import threading
 import sys
 import time
 
 from camera_reassembler import FrameBuffer
 from serial_manager import SerialManager
+from mission_log import MissionLog
+from mission_recorder import MissionRecorder
+from frame_export import FrameExporter
+from telemetry_stream import TelemetryBroadcaster
+from rover_log import setup_logging, parse_levels, get_logger
+from metrics import METRICS
+from tracer import TRACER
 import llm_worker
 import evidence_api
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import Request
-from fastapi.responses import StreamingResponse
+from fastapi import Request, HTTPException
+from fastapi.responses import StreamingResponse, PlainTextResponse, Response, JSONResponse
 
 # ------------------------
 # Backend state
 # ------------------------
 
+started_at = time.time()
+
 # Initialize FrameBuffer (Video)
 # Argument parsing for Rover IP
 import argparse
 parser = argparse.ArgumentParser()
 parser.add_argument('--ip', default='172.20.10.2', help='Rover IP address')
+parser.add_argument('--mission-log-file', default=None, help='Append mission log records to this JSONL file')
+parser.add_argument('--push-rate', type=float, default=10.0, help='Max telemetry push rate (Hz) for /api/stream')
+parser.add_argument('--log-level', default='INFO', help='Default log level')
+parser.add_argument('--log-levels', default='', help='Per-component levels, e.g. serial=DEBUG,api=WARNING')
+parser.add_argument('--log-json', default=None, help='Also write JSON-lines logs to this file')
+parser.add_argument('--camera-control-port', type=int, default=81, help='Rover camera control port for link-quality negotiation (0 = off)')
+parser.add_argument('--jitter-buffer', action='store_true', help='Pace /video_feed frames to a smooth cadence (AI still gets the newest frame)')
+parser.add_argument('--change-gate', action='store_true', help='Let AI skip frames near-identical to the last changed one (video feed unaffected)')
+parser.add_argument('--process-mode', action='store_true', help='Run ingest/decode and tactical inference in worker processes')
+parser.add_argument('--fleet', default=None, help='Fleet config (JSON) with additional rovers served under /api/rovers/<id>')
+parser.add_argument('--export-frames', default=None, metavar='NAME', help='Publish frames to shared memory rings NAME-jpeg / NAME-decoded (see frame_export.FrameReader)')
+parser.add_argument('--record-dir', default=None, help='Record frames, telemetry and AI decisions to this mission directory')
 args, _ = parser.parse_known_args()
 
+setup_logging(level=args.log_level, component_levels=parse_levels(args.log_levels), json_path=args.log_json)
+log = get_logger("api")
+
 # Initialize FrameBuffer (Video)
 # Using HTTP mode to support multi-client proxying via this backend
 stream_url = f"http://{args.ip}/stream"
-print(f"🚀 CONNECTING TO ROVER CAMERA AT: {stream_url}")
-frame_buffer = FrameBuffer(mode='http', http_url=stream_url)
+log.info(f"🚀 CONNECTING TO ROVER CAMERA AT: {stream_url}")
+# Frame size / JPEG quality follow the link quality (CameraModule /control)
+control_url = f"http://{args.ip}:{args.camera_control_port}/control" if args.camera_control_port else None
+pipeline = None
+if args.process_mode:
+    # Receiver, decode and YOLO run in worker processes; frames arrive via shared memory
+    from process_pipeline import ProcessPipeline
+    from ai import AIConfig
+    pipeline = ProcessPipeline(source={'mode': 'http', 'http_url': stream_url, 'control_url': control_url,
+                                       'change_gate': args.change_gate},
+                               config=AIConfig(), jitter_buffer=args.jitter_buffer)
+    frame_buffer = pipeline.frame_buffer
+    pipeline.start()
+    app.on_shutdown(pipeline.stop)
+else:
+    frame_buffer = FrameBuffer(mode='http', http_url=stream_url, control_url=control_url,
+                               jitter_buffer=args.jitter_buffer, change_gate=args.change_gate)
 
 # Initialize SerialManager (Control)
 serial_manager = SerialManager(port='/dev/cu.usbserial-0001') 
 
-mission_log = []
+mission_log = MissionLog(capacity=1000, spill_path=args.mission_log_file)
 
 # ------------------------
 # CORS (Vite dev server)
@@ -65,20 +103,32 @@ def root():
 # API endpoints
 # ------------------------
 
-@app.get('/video_feed')
-def video_feed():
+def mjpeg_response(source, compositor, fps: float):
+    fps = min(max(fps, 1.0), 30.0)
     def gen_frames():
-        while True:
-            frame = frame_buffer.get_frame()
-            if frame:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-            time.sleep(0.033) # ~30 FPS
+        # Registering as a viewer is what makes the compositor draw overlays
+        viewer = compositor.add_viewer(fps) if compositor else None
+        last = None
+        try:
+            while True:
+                frame = source.get_frame()
+                if frame and frame is not last:
+                    last = frame
+                    yield (b'--frame\r\n'
+                           b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+                time.sleep(1.0 / fps)
+        finally:
+            if viewer is not None:
+                compositor.remove_viewer(viewer)
 
     return StreamingResponse(gen_frames(), media_type="multipart/x-mixed-replace; boundary=frame")
 
-@app.get('/api/telemetry')
-def get_telemetry():
+@app.get('/video_feed')
+def video_feed(fps: float = 30.0):
+    compositor = ai_worker.compositor if 'ai_worker' in globals() else None
+    return mjpeg_response(frame_buffer, compositor, fps)
+
+def collect_telemetry():
     # Merge Video Telemetry (FPS, Connection) + Serial Telemetry (Voltage, Distance)
     video_stats = frame_buffer.get_telemetry()
     rover_stats = serial_manager.get_telemetry()
@@ -89,44 +139,248 @@ def get_telemetry():
         'mode': 'remote'
     }
 
+def collect_ai_status():
+    if 'ai_worker' in globals():
+        status = ai_worker.get_status()
+        status['command_latency'] = serial_manager.get_latency_stats()
+        return status
+    return {'enabled': False, 'running': False, 'message': 'AI Worker not initialized'}
+
+# Mission recorder (optional): raw frames + telemetry + AI decisions + commands
+recorder = None
+if args.record_dir:
+    recorder = MissionRecorder(args.record_dir, telemetry_source=collect_telemetry)
+    frame_buffer.add_frame_listener(recorder.frame_listener)
+    recorder.start()
+    app.on_shutdown(recorder.stop)
+
+# Shared-memory export (optional): frames for other tools on this host
+exporter = None
+if args.export_frames:
+    exporter = FrameExporter(args.export_frames)
+    frame_buffer.add_frame_listener(exporter.frame_listener)
+    exporter.start()
+    app.on_shutdown(exporter.stop)
+
+# Evidence is indexed from the recording
+evidence_api.bind_state(
+    frame_buffer, mission_log,
+    evidence_api.EvidenceStore(args.record_dir) if recorder else None
+)
+
+def collect_detections():
+    # Latest boxes for clients that draw overlays on the raw feed themselves
+    if 'ai_worker' in globals():
+        return ai_worker.compositor.get_detections()
+    return {'frame_id': None, 'detections': []}
+
+# Push channel: same payloads as the polling endpoints, sent only on change
+telemetry_stream = TelemetryBroadcaster({
+    'telemetry': collect_telemetry,
+    'ai': collect_ai_status,
+    'detections': collect_detections,
+}, max_rate_hz=args.push_rate)
+app.on_startup(telemetry_stream.start)
+
+@app.get('/api/stream')
+def stream_telemetry():
+    return StreamingResponse(
+        telemetry_stream.subscribe(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.get('/api/telemetry')
+def get_telemetry():
+    return collect_telemetry()
+
+@app.get('/api/link')
+def get_link():
+    # Camera link statistics and the negotiated camera profile
+    return frame_buffer.get_link_status()
+
+@app.get('/api/detections')
+def get_detections():
+    return collect_detections()
+
+@app.get('/api/metrics')
+def get_metrics(format: str = 'prometheus'):
+    # Per-stage latency p50/p95/p99 (Prometheus text by default, ?format=json for the UI)
+    if format == 'json':
+        return METRICS.snapshot()
+    return PlainTextResponse(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get('/api/trace')
+def get_trace():
+    # Glass-to-wheel latency: capture -> ... -> serial write
+    return TRACER.get_status()
+
+@app.get('/api/recorder')
+def get_recorder():
+    if recorder is None:
+        return {'recording': False}
+    return {'recording': True, **recorder.get_status()}
+
+@app.get('/api/export')
+def get_export():
+    if exporter is None:
+        return {'exporting': False}
+    return {'exporting': True, **exporter.get_status()}
+
+def submit_manual_command(worker, serial, cmd) -> bool:
+    # Drive buttons go through the arbiter: the dispatcher keepalive would
+    # otherwise overwrite a raw write with the held AI command within 200 ms
+    if worker is not None and worker.manual_command(cmd):
+        return bool(serial.serial_conn and serial.serial_conn.is_open)
+    return serial.send_command(cmd)
+
 @app.post('/api/command')
 async def send_command(request: Request):
     data = await request.json()
     cmd = data.get('command')
-    print(f"🎮 /api/command received: {cmd}", flush=True)  # DEBUG
+    log.debug(f"🎮 /api/command received: {cmd}", extra={'sample': 'api.command'})
     
     if cmd:
-        success = serial_manager.send_command(cmd)
-        print(f"🎮 Command result: {'✅' if success else '❌'}", flush=True)  # DEBUG
+        success = submit_manual_command(globals().get('ai_worker'), serial_manager, cmd)
         
-        log_entry = {
-            'command': cmd,
-            'status': 'sent' if success else 'failed',
-            'timestamp': str(threading.get_ident())
-        }
-        mission_log.append(log_entry)
+        mission_log.log(
+            f"🎮 {cmd} {'sent' if success else 'failed'}",
+            source='api',
+            command=cmd,
+            status='sent' if success else 'failed'
+        )
         
         return {'ok': success}
     return {'ok': False, 'error': 'No command provided'}
 
 @app.get('/api/mission_log')
-def get_mission_log():
-    return mission_log[-100:]
+def get_mission_log(since: int = 0, limit: int = 100):
+    # Clients pass the last id they have seen to receive only new records
+    records = mission_log.since(since, limit) if since else mission_log.tail(limit)
+    return [record.to_dict() for record in records]
 
 @app.post('/api/evidence')
 async def fetch_evidence():
-    await evidence_api.request_manifest()
-    return {'ok': True}
+    summary = await evidence_api.request_manifest()
+    return {'ok': summary is not None, **(summary or {})}
+
+def require_evidence_store():
+    store = evidence_api.get_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail='No mission recording (start with --record-dir)')
+    return store
+
+@app.get('/api/evidence')
+def get_evidence(since: int = 0, limit: int = 50, min_confidence: float = 0.0):
+    # Paginated: pass the returned `next` as `since`
+    return require_evidence_store().manifest(since, min(limit, 500), min_confidence)
+
+@app.get('/api/evidence/bundle')
+def get_evidence_bundle(since: int = 0, until: int = None, min_confidence: float = 0.0):
+    store = require_evidence_store()
+    return StreamingResponse(
+        store.iter_bundle(since, until, min_confidence),
+        media_type='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="evidence-{int(time.time())}.zip"'}
+    )
+
+@app.get('/api/evidence/{event_id}/thumbnail')
+def get_evidence_thumbnail(event_id: int):
+    thumb = require_evidence_store().thumbnail(event_id)
+    if thumb is None:
+        raise HTTPException(status_code=404, detail='Unknown event')
+    return Response(thumb, media_type='image/jpeg', headers={'Cache-Control': 'max-age=86400'})
+
+@app.get('/api/evidence/{event_id}/frame')
+def get_evidence_frame(event_id: int):
+    frame = require_evidence_store().frame(event_id)
+    if frame is None:
+        raise HTTPException(status_code=404, detail='Unknown event')
+    return Response(frame, media_type='image/jpeg')
 
 @app.get('/api/ai_status')
 def get_ai_status():
-    print("🔍 /api/ai_status called")
+    status = collect_ai_status()
+    log.debug(f"📡 /api/ai_status: enabled={status.get('enabled')}, reasoning_len={len(status.get('last_reasoning', ''))}",
+              extra={'sample': 'api.ai_status'})
+    return status
+
+@app.get('/api/health')
+def get_health():
+    # Readiness probe: 503 until every model has loaded and warmed up
     if 'ai_worker' in globals():
-        status = ai_worker.get_status()
-        print(f"📡 Returning: enabled={status.get('enabled')}, reasoning_len={len(status.get('last_reasoning', ''))}")
-        return status
-    print("⚠️ ai_worker not in globals")
-    return {'enabled': False, 'running': False, 'message': 'AI Worker not initialized'}
+        health = ai_worker.get_readiness()
+    else:
+        health = {'ready': False, 'components': {}, 'cold_start_ms': None}
+    if fleet is not None:
+        health['rovers'] = {rover.rover_id: rover.ai_worker.get_readiness() for rover in fleet}
+        health['ready'] = health['ready'] and all(r['ready'] for r in health['rovers'].values())
+    health['uptime_s'] = round(time.time() - started_at, 1)
+    return JSONResponse(health, status_code=200 if health['ready'] else 503)
+
+# ------------------------
+# Fleet (additional rovers, routes namespaced by rover id)
+# ------------------------
+
+fleet = None
+if args.fleet:
+    from fleet import RoverRegistry, load_fleet
+    from ai import AIConfig
+    fleet = RoverRegistry(AIConfig(), reserved_ports=[serial_manager.port])
+    for spec in load_fleet(args.fleet):
+        fleet.add(spec)
+    app.on_shutdown(fleet.stop)
+
+def get_rover(rover_id: str):
+    rover = fleet.get(rover_id) if fleet else None
+    if rover is None:
+        raise HTTPException(status_code=404, detail=f'Unknown rover {rover_id}')
+    return rover
+
+@app.get('/api/rovers')
+def list_rovers():
+    if fleet is None:
+        return {'rovers': []}
+    return fleet.get_status()
+
+@app.get('/api/rovers/{rover_id}/telemetry')
+def get_rover_telemetry(rover_id: str):
+    return get_rover(rover_id).collect_telemetry()
+
+@app.get('/api/rovers/{rover_id}/ai_status')
+def get_rover_ai_status(rover_id: str):
+    return get_rover(rover_id).collect_ai_status()
+
+@app.get('/api/rovers/{rover_id}/detections')
+def get_rover_detections(rover_id: str):
+    return get_rover(rover_id).ai_worker.compositor.get_detections()
+
+@app.get('/api/rovers/{rover_id}/mission_log')
+def get_rover_mission_log(rover_id: str, since: int = 0, limit: int = 100):
+    rover_mission_log = get_rover(rover_id).mission_log
+    records = rover_mission_log.since(since, limit) if since else rover_mission_log.tail(limit)
+    return [record.to_dict() for record in records]
+
+@app.get('/api/rovers/{rover_id}/video_feed')
+def rover_video_feed(rover_id: str, fps: float = 30.0):
+    rover = get_rover(rover_id)
+    return mjpeg_response(rover.frame_buffer, rover.ai_worker.compositor, fps)
+
+@app.post('/api/rovers/{rover_id}/command')
+async def send_rover_command(rover_id: str, request: Request):
+    rover = get_rover(rover_id)
+    data = await request.json()
+    cmd = data.get('command')
+    if not cmd:
+        return {'ok': False, 'error': 'No command provided'}
+    success = submit_manual_command(rover.ai_worker, rover.serial_manager, cmd)
+    rover.mission_log.log(
+        f"🎮 {cmd} {'sent' if success else 'failed'}",
+        source='api',
+        command=cmd,
+        status='sent' if success else 'failed'
+    )
+    return {'ok': success}
 
 # ------------------------
 # Background workers
@@ -137,17 +391,51 @@ def start_workers():
     serial_manager.start()
 
     # 2. Start AI Worker (Tactical + Strategic)
-    from ai.command_arbiter import CommandArbiter
+    from ai import CommandArbiter, CommandDispatcher, CommandPriority, AIConfig
+    
+    # Initialize Dispatcher (dedup, coalescing, rate limit, keepalive)
+    config = AIConfig()
+    global dispatcher
+    dispatcher = CommandDispatcher(
+        serial_manager.send_rover_command,
+        coalesce_window=config.dispatch_coalesce_ms / 1000,
+        max_rate_hz=config.dispatch_max_rate_hz,
+        keepalive_interval=config.dispatch_keepalive_ms / 1000
+    )
+    dispatcher.start()
     
-    # Initialize Arbiter
-    arbiter = CommandArbiter(serial_manager.send_command)
+    # Initialize Arbiter (decisions are recorded before dispatch when recording)
+    def on_command(cmd):
+        recorder.record_command(cmd)
+        dispatcher.submit(cmd)
+    
+    arbiter = CommandArbiter(
+        on_command if recorder else dispatcher.submit,
+        idle_callback=dispatcher.reset,
+        default_ttls={
+            CommandPriority.TACTICAL: config.tactical_command_ttl,
+            CommandPriority.STRATEGIC: config.strategic_command_ttl,
+        }
+    )
     
     # Initialize and Start AI Worker
     global ai_worker
-    ai_worker = llm_worker.AIWorker(frame_buffer, mission_log, arbiter)
+    # In fleet mode the default rover uses the fleet's shared models too
+    ai_worker = llm_worker.AIWorker(
+        frame_buffer, mission_log, arbiter, config=config, recorder=recorder,
+        range_source=lambda: serial_manager.get_range(config.ultrasonic_max_age),
+        pipeline=pipeline,
+        detector=fleet.detector if fleet else None,
+        strategic=fleet.vlm.client('default') if fleet else None
+    )
     ai_worker.start()
     
-    print("✅ AI Pipeline Initialized (Tactical + Strategic)")
+    log.info("✅ AI Pipeline Initialized (Tactical + Strategic)")
+    
+    # 3. Start fleet rovers
+    if fleet:
+        fleet.start()
+        log.info(f"✅ Fleet started: {', '.join(fleet.ids())}")
 
 start_workers()
 
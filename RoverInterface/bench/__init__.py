@@ -0,0 +1,9 @@
+# Offline benchmark harness for the Rescue Rover AI pipeline
+"""
+Runs the backend pipeline without rover hardware or the cloud VLM:
+- FrameBuffer(mode='replay') streams a recorded JPEG directory / MJPEG file
+- stub_vlm serves canned /analyze responses with configurable latency
+- mock_serial exposes a pty that behaves like the ESP32 gateway
+
+Run: python -m bench.run_pipeline --frames recordings/run1 --duration 30
+"""
@@ -0,0 +1,60 @@
+# mock_serial.py - Pseudo-terminal stand-in for the ESP32 gateway
+"""
+Opens a pty pair. SerialManager connects to `port` (the slave side) as if
+it were the USB gateway; this class reads the "X,Y" / F,B,L,R,S lines from
+the master side and periodically writes TELE:<voltage>,<distance> back.
+POSIX only.
+"""
+
+import os
+import threading
+import time
+import tty
+
+
+class MockGateway:
+    """Counts commands received over a pty and emits telemetry."""
+
+    def __init__(self, telemetry_interval: float = 0.1, voltage: float = 12.0, distance: int = 150):
+        self._master, slave = os.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        self._slave = slave
+        self._telemetry_interval = telemetry_interval
+        self.voltage = voltage
+        self.distance = distance
+        self.lines = []
+        self._running = False
+
+    def _read_loop(self):
+        buffer = b''
+        while self._running:
+            try:
+                chunk = os.read(self._master, 4096)
+            except OSError:
+                break
+            buffer += chunk
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                self.lines.append((time.perf_counter(), line.decode(errors='ignore')))
+
+    def _telemetry_loop(self):
+        while self._running:
+            try:
+                os.write(self._master, f"TELE:{self.voltage:.2f},{self.distance}\n".encode())
+            except OSError:
+                break
+            time.sleep(self._telemetry_interval)
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._read_loop, daemon=True, name="MockGatewayRX").start()
+        threading.Thread(target=self._telemetry_loop, daemon=True, name="MockGatewayTX").start()
+
+    def stop(self):
+        self._running = False
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
@@ -0,0 +1,146 @@
+# run_pipeline.py - End-to-end AI pipeline benchmark
+"""
+Runs AIWorker against a replayed recording, the stub VLM and a mock
+serial gateway, then reports throughput, per-stage latency percentiles,
+CPU and memory as JSON for regression tracking.
+
+Usage:
+    python -m bench.run_pipeline --frames recordings/run1 --duration 30
+    python -m bench.run_pipeline --synthetic 300 --fps 0 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+# Allow running from RoverInterface/ as `python -m bench.run_pipeline`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import AIConfig, CommandArbiter, CommandDispatcher, CommandPriority
+from camera_reassembler import FrameBuffer
+from llm_worker import AIWorker
+from metrics import METRICS
+from mission_log import MissionLog
+from rover_log import setup_logging
+from serial_manager import SerialManager
+from tracer import TRACER
+from bench.mock_serial import MockGateway
+from bench.stub_vlm import StubVLMServer
+
+
+def write_synthetic_frames(count: int, directory: str, size=(320, 240)):
+    """Write `count` moving-gradient JPEGs (QVGA, like the OV2640 stream)."""
+    import cv2
+    import numpy as np
+
+    w, h = size
+    base = np.tile(np.linspace(0, 255, w, dtype=np.uint8), (h, 1))
+    for i in range(count):
+        img = np.dstack([np.roll(base, i * 4, axis=1), base.T[:h, :1].repeat(w, 1), base])
+        cv2.rectangle(img, (40 + i % 200, 80), (100 + i % 200, 200), (0, 0, 255), -1)
+        cv2.imwrite(os.path.join(directory, f"{i:06d}.jpg"), img)
+
+
+def run(frames: str, fps, duration: float, vlm_latency: float) -> dict:
+    """Run the pipeline for `duration` seconds (or until replay ends)."""
+    METRICS.reset()
+
+    vlm = StubVLMServer(latency=vlm_latency)
+    vlm.start()
+    gateway = MockGateway()
+    gateway.start()
+
+    config = AIConfig(remote_vlm_url=vlm.url)
+    serial_manager = SerialManager(port=gateway.port)
+    serial_manager.start()
+    dispatcher = CommandDispatcher(
+        serial_manager.send_rover_command,
+        coalesce_window=config.dispatch_coalesce_ms / 1000,
+        max_rate_hz=config.dispatch_max_rate_hz,
+        keepalive_interval=config.dispatch_keepalive_ms / 1000
+    )
+    dispatcher.start()
+    arbiter = CommandArbiter(dispatcher.submit, idle_callback=dispatcher.reset, default_ttls={
+        CommandPriority.TACTICAL: config.tactical_command_ttl,
+        CommandPriority.STRATEGIC: config.strategic_command_ttl,
+    })
+
+    frame_buffer = FrameBuffer(mode='replay', replay_path=frames, replay_fps=fps)
+    worker = AIWorker(frame_buffer, MissionLog(capacity=1000), arbiter, config)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    worker.start()
+
+    deadline = wall_start + duration
+    while time.perf_counter() < deadline:
+        if frame_buffer.get_telemetry()['state'] == 'REPLAY_DONE':
+            time.sleep(0.5)  # Let in-flight work drain
+            break
+        time.sleep(0.1)
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    worker.stop()
+    frame_buffer.stop()
+    dispatcher.stop()
+    serial_manager.close()
+    gateway.stop()
+    vlm.stop()
+
+    stages = METRICS.snapshot()
+    processed = stages.get('decode', {}).get('count', 0)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    maxrss_mb = maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+    return {
+        'host': {'python': platform.python_version(), 'platform': platform.platform()},
+        'params': {'frames': frames, 'fps': fps, 'duration': duration, 'vlm_latency': vlm_latency},
+        'wall_s': round(wall, 3),
+        'throughput': {
+            'frames_ingested': frame_buffer.get_frame_trace().frame_id if frame_buffer.get_frame_trace() else 0,
+            'frames_processed': processed,
+            'tactical_fps': round(processed / wall, 2) if wall else 0.0,
+            'vlm_requests': vlm.requests,
+            'gateway_lines': len(gateway.lines),
+        },
+        'tactical_ready': worker.tactical.is_ready() if worker.tactical else False,
+        'stages': stages,
+        'glass_to_wheel': TRACER.get_status()['distributions'],
+        'cpu': {'process_s': round(cpu, 3), 'utilization': round(cpu / wall, 3) if wall else 0.0},
+        'memory': {'max_rss_mb': round(maxrss_mb, 1)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescue Rover AI pipeline benchmark")
+    parser.add_argument('--frames', help='JPEG directory or MJPEG file to replay')
+    parser.add_argument('--synthetic', type=int, default=0, help='Generate N synthetic frames instead')
+    parser.add_argument('--fps', type=float, default=None, help='Replay rate (omit = original, 0 = max)')
+    parser.add_argument('--duration', type=float, default=30.0, help='Max run time in seconds')
+    parser.add_argument('--vlm-latency', type=float, default=0.3, help='Stub VLM response delay (s)')
+    parser.add_argument('--output', help='Write the JSON report here as well')
+    args = parser.parse_args()
+    setup_logging(level='WARNING')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frames = args.frames
+        if not frames:
+            write_synthetic_frames(args.synthetic or 300, tmp)
+            frames = tmp
+        report = run(frames, args.fps, args.duration, args.vlm_latency)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# stub_vlm.py - Local stand-in for the Colab VLM server
+"""
+Serves POST /analyze like ai/colab_server_script.py, returning a fixed
+navigation JSON after a configurable delay. Used for offline benchmarks.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_RESPONSE = {
+    "hazard": False,
+    "nav_goal": "follow_path",
+    "steering": "center",
+    "reasoning": "stub response"
+}
+
+
+class StubVLMServer:
+    """Threaded HTTP server answering /analyze with canned output."""
+
+    def __init__(self, port: int = 0, latency: float = 0.3, response: dict = None):
+        """
+        Initialize stub server.
+
+        Args:
+            port: TCP port (0 = pick a free one)
+            latency: Seconds to sleep before answering (simulated inference)
+            response: Navigation dict returned in the "result" text
+        """
+        self.latency = latency
+        self.response = response or DEFAULT_RESPONSE
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self.rfile.read(length)
+                stub.requests += 1
+                time.sleep(stub.latency)
+
+                body = json.dumps({"result": json.dumps(stub.response)}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # Keep benchmark output clean
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.port = self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/analyze"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="StubVLM").start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == '__main__':
+    import sys
+    server = StubVLMServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8000)
+    server.start()
+    print(f"Stub VLM listening on {server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -3,40 +3,111 @@
 Camera Frame Buffer for Rescue Rover
 
 Supports multiple input modes:
-1. UDP Stream - Low latency, receives from ESP32-S3 rover
+1. UDP Stream - Low latency, receives from ESP32-S3 rover (whole-JPEG
+   datagrams, or chunked frames with FEC parity, see udp_fec.py; frames
+   FEC can't rebuild are optionally concealed, see jpeg_repair.py)
 2. HTTP Stream - Fallback, connects to rover's /stream endpoint
 3. Local Webcam - For development/testing
+4. Replay - Recorded JPEG directory or MJPEG file, for offline benchmarks
+5. Relay - Frames fed by another component (process mode, see process_pipeline.py)
 
 The FrameBuffer provides thread-safe access to the latest frame
 and telemetry data for use by the UI and AI workers.
 """
 
+import os
 import time
 import threading
 import socket
-import cv2
 import numpy as np
-from typing import Optional
+from typing import Iterator, Optional, Tuple
+
+from rover_log import get_logger
+from metrics import span
+from tracer import FrameTrace
+from mission_recorder import MissionReader, is_mission_directory
+from link_quality import LinkMonitor, QualityNegotiator, HttpCameraControl
+from jitter_buffer import JitterBuffer
+from udp_fec import FecReassembler
+from jpeg_repair import RestartRepairer
+from change_detector import ChangeDetector
+
+log = get_logger("camera")
+
+
+def iter_replay_frames(path: str) -> Iterator[Tuple[bytes, Optional[float]]]:
+    """
+    Yield (jpeg_bytes, timestamp) from a recording.
+    
+    Args:
+        path: Recorded mission directory (MissionRecorder, recorded timestamps),
+              directory of .jpg/.jpeg files (sorted by name, timestamp = mtime)
+              or an MJPEG file (concatenated JPEGs, timestamp = None)
+    """
+    if is_mission_directory(path):
+        reader = MissionReader(path)
+        try:
+            yield from reader.iter_frames()
+        finally:
+            reader.close()
+        return
+    
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(('.jpg', '.jpeg')))
+        for name in names:
+            full = os.path.join(path, name)
+            with open(full, 'rb') as f:
+                yield f.read(), os.path.getmtime(full)
+        return
+    
+    with open(path, 'rb') as f:
+        data = f.read()
+    start = data.find(b'\xff\xd8')
+    while start != -1:
+        end = data.find(b'\xff\xd9', start + 2)
+        if end == -1:
+            break
+        yield data[start:end + 2], None
+        start = data.find(b'\xff\xd8', end + 2)
 
 
 class FrameBuffer:
     """
     Thread-safe buffer for camera frames and telemetry.
-    Supports UDP, HTTP, and local webcam input.
+    Supports UDP, HTTP, local webcam and replay input.
     """
     
     def __init__(self, mode: str = 'udp', port: int = 9999, 
-                 http_url: str = None, camera_index: int = 0):
+                 http_url: str = None, camera_index: int = 0,
+                 replay_path: str = None, replay_fps: Optional[float] = None,
+                 replay_loop: bool = False, control_url: str = None,
+                 jitter_buffer: bool = False, partial_frames: bool = False,
+                 change_gate: bool = False):
         """
         Initialize FrameBuffer.
         
         Args:
-            mode: 'udp', 'http', or 'webcam'
+            mode: 'udp', 'http', 'webcam', 'replay' or 'relay'
             port: UDP port to listen on (for UDP mode)
             http_url: URL of MJPEG stream (for HTTP mode)
             camera_index: Camera device index (for webcam mode)
+            replay_path: JPEG directory or MJPEG file (for replay mode)
+            replay_fps: None = original timing (file mtimes, 30 FPS for MJPEG),
+                0 = as fast as possible, >0 = fixed rate (for replay mode)
+            replay_loop: Restart from the first frame at the end (for replay mode)
+            control_url: Rover camera control endpoint; when given, the camera
+                profile is negotiated from the link quality (udp/http modes)
+            jitter_buffer: Re-time display frames to a smooth cadence (raw
+                frames for AI are never delayed)
+            partial_frames: Publish UDP frames with lost chunks, their lost
+                restart intervals filled from the previous frame (UDP mode)
+            change_gate: Mark near-identical frames static in their trace so
+                AI consumers can skip them (the video feed shows all frames)
         """
         self._raw_frame: Optional[bytes] = None
+        self._raw_trace: Optional[FrameTrace] = None
+        self._paced: Tuple[Optional[bytes], Optional[FrameTrace]] = (None, None)
+        self._frame_id = 0
         self._display_frame: Optional[bytes] = None
         self._telemetry: dict = {
             'voltage': 0.0,
@@ -46,17 +117,36 @@ class FrameBuffer:
         }
         self._running = True
         self._lock = threading.Lock()
+        self._frame_listeners = []
         
         # Mode configuration
         self._mode = mode
         self._port = port
         self._http_url = http_url
         self._camera_index = camera_index
+        self._replay_path = replay_path
+        self._replay_fps = replay_fps
+        self._replay_loop = replay_loop
         
         # FPS tracking
         self._frame_count = 0
         self._last_fps_time = time.time()
         
+        # Static-frame marking (optional), applied to every fed frame
+        self.change = ChangeDetector() if change_gate else None
+        
+        # Display pacing (optional); raw frames bypass it
+        self._jitter = JitterBuffer(self._publish_paced) if jitter_buffer else None
+        
+        # Link quality (receiver modes) + camera profile negotiation
+        self.link = LinkMonitor()
+        self.fec = FecReassembler(keep_partial=partial_frames) if mode == 'udp' else None
+        self.repair = RestartRepairer() if partial_frames and mode == 'udp' else None
+        self.negotiator = None
+        if control_url and mode in ('udp', 'http'):
+            self.negotiator = QualityNegotiator(self.link, HttpCameraControl(control_url))
+            self.negotiator.start()
+        
         # Start receiver thread based on mode
         if mode == 'udp':
             self._start_udp_receiver()
@@ -64,39 +154,65 @@ class FrameBuffer:
             self._start_http_receiver()
         elif mode == 'webcam':
             self._start_webcam_receiver()
+        elif mode == 'replay':
+            self._start_replay_receiver()
+        elif mode == 'relay':
+            pass  # Frames arrive through feed_frame() from the owner
         else:
-            print(f"⚠️ Unknown mode: {mode}. Running without video input.")
+            log.warning(f"⚠️ Unknown mode: {mode}. Running without video input.")
     
     def _start_udp_receiver(self):
         """Start UDP receiver thread."""
         def udp_loop():
+            import cv2
             sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             sock.bind(('0.0.0.0', self._port))
             sock.settimeout(1.0)  # Allow checking _running flag
             
-            print(f"📡 UDP Receiver listening on port {self._port}")
+            log.info(f"📡 UDP Receiver listening on port {self._port}")
             
             while self._running:
                 try:
                     # Receive large packets (up to 64KB)
                     data, addr = sock.recvfrom(65535)
+                    arrived = time.perf_counter()
                     
-                    if len(data) > 100:  # Minimum JPEG size
-                        # Decode JPEG
-                        np_arr = np.frombuffer(data, dtype=np.uint8)
-                        img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-                        
-                        if img is not None:
-                            # Re-encode to ensure valid JPEG
-                            _, jpeg = cv2.imencode('.jpg', img)
-                            self.feed_frame(jpeg.tobytes())
-                            self._update_telemetry_state('CONNECTED')
+                    # FEC chunks are collected until their frame completes
+                    # (or is rebuilt from parity); headerless datagrams pass through
+                    lost_before = self.fec.stats['frames_lost']
+                    data = self.fec.add(data, arrived)
+                    lost = self.fec.stats['frames_lost'] - lost_before
+                    if lost:
+                        self.link.on_loss(lost, arrived)
+                    
+                    if self.repair:
+                        partials = self.fec.take_partials()
+                        if data is not None:
+                            self.repair.remember(data)
+                        elif partials:
+                            # Nothing newer arrived complete: conceal the latest lost frame
+                            data = self.repair.repair(*partials[-1])
+                    
+                    if data is not None and len(data) > 100:  # Minimum JPEG size
+                        with span('receive'):
+                            # Decode JPEG
+                            np_arr = np.frombuffer(data, dtype=np.uint8)
+                            img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+                            
+                            if img is not None:
+                                self.link.on_frame(len(data), arrived)
+                                # Re-encode to ensure valid JPEG
+                                _, jpeg = cv2.imencode('.jpg', img)
+                                self.feed_frame(jpeg.tobytes(), capture_time=arrived)
+                                self._update_telemetry_state('CONNECTED')
+                            else:
+                                self.link.on_loss(now=arrived)
                         
                 except socket.timeout:
                     self._update_telemetry_state('WAITING')
                 except Exception as e:
-                    print(f"UDP Error: {e}")
+                    log.warning(f"UDP Error: {e}", extra={'sample': 'camera.udp_error'})
             
             sock.close()
         
@@ -105,61 +221,71 @@ class FrameBuffer:
     def _start_http_receiver(self):
         """Start HTTP MJPEG receiver thread."""
         def http_loop():
-            print(f"🌐 HTTP Receiver connecting to {self._http_url}")
+            import cv2
+            log.info(f"🌐 HTTP Receiver connecting to {self._http_url}")
             
             while self._running:
                 try:
                     cap = cv2.VideoCapture(self._http_url)
                     if not cap.isOpened():
-                        print("❌ Failed to open HTTP stream, retrying...")
+                        log.warning("❌ Failed to open HTTP stream, retrying...", extra={'sample': 'camera.http_open'})
                         time.sleep(2)
                         continue
                     
                     self._update_telemetry_state('CONNECTED')
+                    self.link.on_connect()
                     
                     while self._running:
                         ret, frame = cap.read()
+                        arrived = time.perf_counter()
                         if not ret:
-                            print("⚠️ Stream interrupted, reconnecting...")
+                            log.warning("⚠️ Stream interrupted, reconnecting...")
+                            self.link.on_loss(now=arrived)
                             break
                         
-                        _, jpeg = cv2.imencode('.jpg', frame)
-                        self.feed_frame(jpeg.tobytes())
+                        with span('receive'):
+                            _, jpeg = cv2.imencode('.jpg', frame)
+                            self.link.on_frame(len(jpeg), arrived)
+                            self.feed_frame(jpeg.tobytes(), capture_time=arrived)
                     
                     cap.release()
                     
                 except Exception as e:
-                    print(f"HTTP Error: {e}")
+                    log.warning(f"HTTP Error: {e}", extra={'sample': 'camera.http_error'})
                     time.sleep(2)
         
         if self._http_url:
             threading.Thread(target=http_loop, daemon=True, name="HTTPReceiver").start()
         else:
-            print("⚠️ HTTP mode requires http_url parameter")
+            log.error("⚠️ HTTP mode requires http_url parameter")
     
     def _start_webcam_receiver(self):
         """Start local webcam receiver thread."""
         def webcam_loop():
-            print(f"📷 Webcam Receiver using camera {self._camera_index}")
+            import cv2
+            log.info(f"📷 Webcam Receiver using camera {self._camera_index}")
             cap = cv2.VideoCapture(self._camera_index)
             
             if not cap.isOpened():
-                print(f"❌ Failed to open webcam {self._camera_index}")
+                log.error(f"❌ Failed to open webcam {self._camera_index}")
                 return
             
             self._update_telemetry_state('CONNECTED')
             
             while self._running:
                 ret, frame = cap.read()
+                arrived = time.perf_counter()
                 if not ret:
                     time.sleep(0.1)
                     continue
                 
-                _, jpeg = cv2.imencode('.jpg', frame)
-                self.feed_frame(jpeg.tobytes(), telemetry={
-                    'distance': 100,  # Simulated
-                    'voltage': 12.0   # Simulated
-                })
+                with span('receive'):
+                    _, jpeg = cv2.imencode('.jpg', frame)
+                    self.link.on_frame(len(jpeg), arrived)
+                    self.feed_frame(jpeg.tobytes(), telemetry={
+                        'distance': 100,  # Simulated
+                        'voltage': 12.0   # Simulated
+                    }, capture_time=arrived)
                 
                 time.sleep(0.033)  # ~30 FPS
             
@@ -167,6 +293,47 @@ class FrameBuffer:
         
         threading.Thread(target=webcam_loop, daemon=True, name="WebcamReceiver").start()
     
+    def _start_replay_receiver(self):
+        """Start replay thread streaming a recording."""
+        def replay_loop():
+            log.info(f"📼 Replay Receiver reading {self._replay_path}")
+            self._update_telemetry_state('CONNECTED')
+            
+            while self._running:
+                prev_ts = None
+                next_due = time.perf_counter()
+                sent = 0
+                
+                for jpeg_bytes, ts in iter_replay_frames(self._replay_path):
+                    if not self._running:
+                        break
+                    
+                    # Pace: fixed rate, recorded timing, or none (max rate)
+                    if self._replay_fps is None:
+                        gap = (ts - prev_ts) if (ts is not None and prev_ts is not None) else 1 / 30
+                        next_due += min(max(gap, 0.0), 1.0)
+                        prev_ts = ts
+                    elif self._replay_fps > 0:
+                        next_due += 1 / self._replay_fps
+                    delay = next_due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    
+                    with span('receive'):
+                        self.feed_frame(jpeg_bytes)
+                    sent += 1
+                
+                if not self._replay_loop or sent == 0:
+                    break
+            
+            self._update_telemetry_state('REPLAY_DONE')
+            log.info("📼 Replay finished")
+        
+        if self._replay_path:
+            threading.Thread(target=replay_loop, daemon=True, name="ReplayReceiver").start()
+        else:
+            log.error("⚠️ Replay mode requires replay_path parameter")
+    
     def _update_telemetry_state(self, state: str):
         """Update connection state in telemetry."""
         with self._lock:
@@ -191,22 +358,77 @@ class FrameBuffer:
         # We don't need the lock for a boolean assignment in Python (atomic), but good practice.
         self._ai_active = active
 
-    def feed_frame(self, jpeg_bytes: bytes, telemetry: dict = None):
+    def feed_frame(self, jpeg_bytes: bytes, telemetry: dict = None,
+                   capture_time: float = None, frame_id: int = None,
+                   static: bool = None) -> FrameTrace:
         """
         Feed a new frame into the buffer.
+        
+        Args:
+            jpeg_bytes: Encoded frame
+            telemetry: Optional telemetry update
+            capture_time: perf_counter() when the frame was captured/arrived
+                (defaults to now)
+            frame_id: Keep an upstream frame id (frames relayed from another
+                process) instead of numbering locally
+            static: Keep an upstream static mark instead of running the
+                change detector here
+        
+        Returns:
+            FrameTrace assigned to this frame
         """
+        now = time.perf_counter()
+        if static is None:
+            static = self.change.is_static(jpeg_bytes, now) if self.change else False
         with self._lock:
+            self._frame_id = frame_id if frame_id is not None else self._frame_id + 1
+            trace = FrameTrace(
+                frame_id=self._frame_id,
+                capture_time=capture_time if capture_time is not None else now,
+                receive_time=now,
+                static=static
+            )
             self._raw_frame = jpeg_bytes
+            self._raw_trace = trace
             
             # Only update display frame if AI is NOT active.
             # If AI is active, it is responsible for setting display frame.
-            if not getattr(self, '_ai_active', False):
+            if self._jitter is None and not getattr(self, '_ai_active', False):
                 self._display_frame = jpeg_bytes
             
             if telemetry:
                 self._telemetry.update(telemetry)
         
-        self._update_fps()
+        if self._jitter is not None:
+            self._jitter.push((jpeg_bytes, trace), now)
+        
+        for listener in self._frame_listeners:
+            try:
+                listener(jpeg_bytes, trace)
+            except Exception as e:
+                log.error(f"❌ Frame listener error: {e}", extra={'sample': 'camera.listener'})
+        
+        if self._jitter is None:
+            self._update_fps()
+        return trace
+    
+    def _publish_paced(self, frame: Tuple[bytes, FrameTrace]):
+        """Jitter buffer playout: the display path sees frames on a steady cadence."""
+        with self._lock:
+            self._paced = frame
+            if not getattr(self, '_ai_active', False):
+                self._display_frame = frame[0]
+        self._update_fps()  # FPS as displayed, not as bursts arrive
+    
+    def add_frame_listener(self, callback):
+        """
+        Register a callback for every published raw frame.
+        
+        Args:
+            callback: Called as callback(jpeg_bytes, trace) on the receiver
+                thread, so it must not block (e.g. MissionRecorder queues)
+        """
+        self._frame_listeners.append(callback)
     
     def get_frame(self) -> Optional[bytes]:
         """Get the latest display frame (JPEG bytes)."""
@@ -218,6 +440,21 @@ class FrameBuffer:
         with self._lock:
             return self._raw_frame
 
+    def get_raw_frame_with_trace(self) -> Tuple[Optional[bytes], Optional[FrameTrace]]:
+        """Get the latest raw frame together with its FrameTrace."""
+        with self._lock:
+            return self._raw_frame, self._raw_trace
+
+    def get_paced_frame_with_trace(self) -> Tuple[Optional[bytes], Optional[FrameTrace]]:
+        """Latest frame for display (jitter-buffered if enabled, else raw)."""
+        with self._lock:
+            return self._paced if self._jitter is not None else (self._raw_frame, self._raw_trace)
+
+    def get_frame_trace(self) -> Optional[FrameTrace]:
+        """Get the FrameTrace of the latest raw frame."""
+        with self._lock:
+            return self._raw_trace
+
     def set_display_frame(self, jpeg_bytes: bytes):
         """Set the processed frame for display."""
         with self._lock:
@@ -226,7 +463,21 @@ class FrameBuffer:
     def get_telemetry(self) -> dict:
         """Get current telemetry data."""
         with self._lock:
-            return self._telemetry.copy()
+            telemetry = self._telemetry.copy()
+        if self._mode in ('udp', 'http', 'webcam'):
+            telemetry['link_quality'] = round(self.link.score(), 2)
+        return telemetry
+    
+    def get_link_status(self) -> dict:
+        """Link statistics and the negotiated camera profile."""
+        return {
+            **self.link.get_status(),
+            'negotiation': self.negotiator.get_status() if self.negotiator else None,
+            'jitter_buffer': self._jitter.get_status() if self._jitter else None,
+            'fec': self.fec.get_status() if self.fec else None,
+            'repair': self.repair.get_status() if self.repair else None,
+            'change_gate': self.change.get_status() if self.change else None
+        }
     
     def update_telemetry(self, data: dict):
         """Update telemetry data from external source."""
@@ -240,6 +491,10 @@ class FrameBuffer:
     def stop(self):
         """Stop receiving."""
         self._running = False
+        if self.negotiator:
+            self.negotiator.stop()
+        if self._jitter:
+            self._jitter.stop()
 
 
 # Development test mode - run directly to test
@@ -251,6 +506,10 @@ if __name__ == '__main__':
     
     if mode == 'udp':
         fb = FrameBuffer(mode='udp', port=9999)
+    elif mode == 'replay':
+        # Example: python camera_reassembler.py replay recordings/run1 [fps]
+        fps = float(sys.argv[3]) if len(sys.argv) > 3 else None
+        fb = FrameBuffer(mode='replay', replay_path=sys.argv[2], replay_fps=fps)
     elif mode == 'http':
         # Example: python camera_reassembler.py http http://192.168.1.10/stream
         url = sys.argv[2] if len(sys.argv) > 2 else None
@@ -0,0 +1,89 @@
+# change_detector.py
+"""
+Ingest-Stage Change Detection for Rescue Rover
+
+While the rover stands still, consecutive frames are nearly identical and
+re-running decode + YOLO on them buys nothing. Each JPEG is decoded at
+1/8 scale (libjpeg then only reads the DC coefficient of every 8x8
+block, ~1/50 of a full decode) and compared with the last frame that
+counted as changed. A frame is static when few blocks moved; static
+frames still go to the video feed, AI consumers may skip them.
+
+A frame is never static when the last changed one is older than the
+refresh interval, so the detector still runs at that rate (keep it below
+tactical_command_ttl so a tactical stop never lapses).
+"""
+
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class ChangeDetector:
+    """
+    Marks frames whose DC thumbnail matches the last changed frame.
+    """
+
+    def __init__(self, block_threshold: int = 10, changed_fraction: float = 0.01,
+                 refresh_interval: float = 0.25):
+        """
+        Initialize detector.
+
+        Args:
+            block_threshold: Gray-level difference at which an 8x8 block counts as changed
+            changed_fraction: Fraction of changed blocks from which the frame counts as changed
+            refresh_interval: Seconds after which a frame is treated as changed anyway
+        """
+        self._block_threshold = block_threshold
+        self._changed_fraction = changed_fraction
+        self._refresh_interval = refresh_interval
+        self._reference: Optional[np.ndarray] = None
+        self._reference_time = 0.0
+        self._last_fraction: Optional[float] = None
+        self.stats = {'frames': 0, 'static': 0, 'refreshes': 0}
+
+    @staticmethod
+    def thumbnail(jpeg: bytes) -> Optional[np.ndarray]:
+        """Grayscale 1/8-scale decode (block DC values), None if undecodable."""
+        import cv2
+        return cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+
+    def is_static(self, jpeg: bytes, now: float = None) -> bool:
+        """
+        Classify a frame (and make it the reference if it changed).
+
+        Args:
+            jpeg: Encoded frame
+            now: perf_counter() at arrival (default: current time)
+
+        Returns:
+            True if the frame is near-identical to the last changed frame
+        """
+        now = time.perf_counter() if now is None else now
+        self.stats['frames'] += 1
+        thumb = self.thumbnail(jpeg)
+        if thumb is None:
+            return False
+
+        if self._reference is not None and self._reference.shape == thumb.shape:
+            diff = np.abs(thumb.astype(np.int16) - self._reference)
+            self._last_fraction = float(np.count_nonzero(diff > self._block_threshold)) / diff.size
+            if self._last_fraction < self._changed_fraction:
+                if now - self._reference_time < self._refresh_interval:
+                    self.stats['static'] += 1
+                    return True
+                self.stats['refreshes'] += 1
+
+        self._reference = thumb.astype(np.int16)
+        self._reference_time = now
+        return False
+
+    def get_status(self) -> dict:
+        frames = self.stats['frames']
+        return {
+            **self.stats,
+            'static_ratio': round(self.stats['static'] / frames, 3) if frames else 0.0,
+            'changed_fraction': round(self._last_fraction, 4) if self._last_fraction is not None else None,
+            'refresh_interval_s': self._refresh_interval,
+        }
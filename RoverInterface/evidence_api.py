@@ -1,18 +1,295 @@
 #evidence_api.py
+"""
+Evidence API for Rescue Rover
+
+Builds an evidence manifest from the mission recording: every tactical
+detection of an evidence class (person by default) becomes an event with
+its confidence, bbox, timestamp and source frame. Events are indexed
+incrementally from the recorder's index, so a refresh only reads records
+appended since the last one.
+
+Thumbnails are rendered on first request and kept in an LRU cache.
+Bundles (frames + manifest.json) are streamed as a zip one frame at a
+time, never holding the whole archive in memory.
+"""
+
 import asyncio
+import io
+import json
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Iterator, List, Optional, Tuple
+
+from mission_recorder import MissionReader, TACTICAL
+from rover_log import get_logger
+
+log = get_logger("evidence")
 
 _frame_buffer = None
 _mission_log = None
+_store = None
+
+
+@dataclass
+class EvidenceEvent:
+    """One evidence detection"""
+    event_id: int
+    timestamp: float
+    frame_id: int
+    class_name: str
+    confidence: float
+    bbox: Tuple[float, float, float, float]  # x1, y1, x2, y2 normalized
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, non-seekable sink; zipfile then uses data descriptors."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class EvidenceStore:
+    """
+    Detection event index over a recorded mission.
+    """
+
+    def __init__(self, directory: str, classes=('person',), thumbnail_width: int = 160,
+                 thumbnail_cache: int = 256):
+        """
+        Initialize evidence store.
+
+        Args:
+            directory: MissionRecorder directory
+            classes: Detection classes that count as evidence (substring match)
+            thumbnail_width: Thumbnail width in pixels
+            thumbnail_cache: Number of thumbnails kept in memory
+        """
+        self.directory = directory
+        self._classes = tuple(classes)
+        self._thumbnail_width = thumbnail_width
+        self._thumbnail_cache_size = thumbnail_cache
+        self._thumbnails: OrderedDict = OrderedDict()
+
+        self._reader: Optional[MissionReader] = None
+        self._events: List[EvidenceEvent] = []
+        self._scanned = 0
+        self._last_frame_id = None
+        self._lock = threading.Lock()
+
+    def _open_reader(self) -> Optional[MissionReader]:
+        if self._reader is None:
+            try:
+                self._reader = MissionReader(self.directory)
+            except FileNotFoundError:
+                return None  # Recorder has not flushed its first batch yet
+        return self._reader
+
+    def refresh(self) -> int:
+        """
+        Index tactical records appended since the last refresh.
+
+        Returns:
+            Number of new events
+        """
+        with self._lock:
+            reader = self._open_reader()
+            if reader is None:
+                return 0
+            reader.refresh()
 
-def bind_state(frame_buffer, mission_log):
-    global _frame_buffer, _mission_log
+            before = len(self._events)
+            for position in range(self._scanned, len(reader)):
+                entry = reader.entry(position)
+                if entry.kind != TACTICAL:
+                    continue
+                # The tactical loop can run several times on the same frame
+                if entry.frame_id and entry.frame_id == self._last_frame_id:
+                    continue
+                self._last_frame_id = entry.frame_id
+
+                result = reader.read(entry)
+                for det in result.get('detections', []):
+                    if not any(c in det['class_name'] for c in self._classes):
+                        continue
+                    self._events.append(EvidenceEvent(
+                        event_id=len(self._events) + 1,
+                        timestamp=entry.timestamp,
+                        frame_id=entry.frame_id,
+                        class_name=det['class_name'],
+                        confidence=round(det['confidence'], 3),
+                        bbox=tuple(det['bbox'])
+                    ))
+            self._scanned = len(reader)
+            return len(self._events) - before
+
+    def event(self, event_id: int) -> Optional[EvidenceEvent]:
+        with self._lock:
+            if 1 <= event_id <= len(self._events):
+                return self._events[event_id - 1]
+        return None
+
+    def manifest(self, since: int = 0, limit: int = 50, min_confidence: float = 0.0) -> dict:
+        """
+        One page of events.
+
+        Args:
+            since: Return events after this event id (cursor from a previous page)
+            limit: Maximum events per page
+            min_confidence: Skip weaker detections
+
+        Returns:
+            {'total', 'events', 'next'} - pass `next` as `since` for the next page
+        """
+        self.refresh()
+        page = []
+        with self._lock:
+            total = len(self._events)
+            for event in self._events[max(since, 0):]:
+                if event.confidence < min_confidence:
+                    continue
+                page.append(event.to_dict())
+                if len(page) >= limit:
+                    break
+        return {
+            'total': total,
+            'events': page,
+            'next': page[-1]['event_id'] if len(page) == limit else None
+        }
+
+    def frame(self, event_id: int) -> Optional[bytes]:
+        """Full JPEG frame behind an event."""
+        event = self.event(event_id)
+        if event is None:
+            return None
+        with self._lock:
+            entry = self._reader.frame_by_id(event.frame_id) or self._reader.frame_at(event.timestamp)
+            return self._reader.read(entry) if entry else None
+
+    def thumbnail(self, event_id: int) -> Optional[bytes]:
+        """Small JPEG with the bbox drawn, rendered on first request."""
+        with self._lock:
+            cached = self._thumbnails.get(event_id)
+            if cached is not None:
+                self._thumbnails.move_to_end(event_id)
+                return cached
+
+        frame = self.frame(event_id)
+        if frame is None:
+            return None
+
+        import cv2
+        import numpy as np
+        img = cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_REDUCED_COLOR_2)
+        if img is None:
+            return None
+        h, w = img.shape[:2]
+        scale = self._thumbnail_width / w
+        img = cv2.resize(img, (self._thumbnail_width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        h, w = img.shape[:2]
+        x1, y1, x2, y2 = self.event(event_id).bbox
+        cv2.rectangle(img, (int(x1 * w), int(y1 * h)), (int(x2 * w), int(y2 * h)), (0, 0, 255), 1)
+        _, jpeg = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        thumb = jpeg.tobytes()
+
+        with self._lock:
+            self._thumbnails[event_id] = thumb
+            while len(self._thumbnails) > self._thumbnail_cache_size:
+                self._thumbnails.popitem(last=False)
+        return thumb
+
+    def iter_bundle(self, since: int = 0, until: Optional[int] = None,
+                    min_confidence: float = 0.0) -> Iterator[bytes]:
+        """
+        Stream a zip of event frames plus manifest.json.
+
+        Args:
+            since: First event id (exclusive)
+            until: Last event id (inclusive), None = latest
+            min_confidence: Skip weaker detections
+        """
+        self.refresh()
+        with self._lock:
+            events = [e for e in self._events[max(since, 0):until]
+                      if e.confidence >= min_confidence]
+
+        sink = _ZipSink()
+        written = set()
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as zf:
+            for event in events:
+                if event.frame_id in written:
+                    continue  # Several detections on one frame share the image
+                frame = self.frame(event.event_id)
+                if frame is None:
+                    continue
+                written.add(event.frame_id)
+                zf.writestr(f"frames/{event.frame_id:08d}.jpg", frame)
+                yield sink.drain()
+            zf.writestr("manifest.json", json.dumps({
+                'created': time.time(),
+                'events': [e.to_dict() for e in events]
+            }, indent=2))
+        yield sink.drain()
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'events': len(self._events),
+                'thumbnails_cached': len(self._thumbnails)
+            }
+
+    def close(self):
+        with self._lock:
+            if self._reader:
+                self._reader.close()
+                self._reader = None
+
+
+def bind_state(frame_buffer, mission_log, store: Optional[EvidenceStore] = None):
+    global _frame_buffer, _mission_log, _store
     _frame_buffer = frame_buffer
     _mission_log = mission_log
+    _store = store
+
+
+def get_store() -> Optional[EvidenceStore]:
+    return _store
 
-async def request_manifest():
+
+async def request_manifest() -> Optional[dict]:
+    """Refresh the event index (off the event loop) and log a summary."""
     if _mission_log is None:
-        return
+        return None
+
+    _mission_log.log("📦 Fetch manifest requested", source='evidence')
+    if _store is None:
+        _mission_log.log("⚠️ No mission recording, start with --record-dir", source='evidence')
+        return None
 
-    _mission_log.append("📦 Fetch manifest requested")
-    await asyncio.sleep(1.0)
-    _mission_log.append("📁 Manifest received")
+    new_events = await asyncio.to_thread(_store.refresh)
+    total = _store.get_status()['events']
+    _mission_log.log(
+        f"📁 Manifest ready: {total} events ({new_events} new)",
+        source='evidence',
+        total=total,
+        new=new_events
+    )
+    return {'total': total, 'new': new_events}
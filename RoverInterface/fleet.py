@@ -0,0 +1,245 @@
+# fleet.py
+"""
+Rover Fleet Registry for Rescue Rover
+
+Hosts several rovers in one backend. Each rover gets its own pipeline
+(camera FrameBuffer, SerialManager, dispatcher, arbiter, AIWorker and
+mission log), built from a fleet config file:
+
+    {
+      "rovers": [
+        {"id": "alpha", "ip": "172.20.10.2", "serial_port": "/dev/ttyUSB0"},
+        {"id": "bravo", "camera": {"mode": "udp", "port": 9998}, "serial_port": "/dev/ttyUSB1"}
+      ]
+    }
+
+Models are not per rover: tactical inference goes through one batched
+SharedDetector and VLM requests through one FairShareVLM, so adding a
+rover adds buffers and threads, not model memory. Routes are namespaced
+as /api/rovers/{rover_id}/... in app.py.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ai import (
+    AIConfig,
+    CommandArbiter,
+    CommandDispatcher,
+    CommandPriority,
+    FairShareVLM,
+    SharedDetector,
+    StrategicNavigator,
+)
+from camera_reassembler import FrameBuffer
+from serial_manager import SerialManager
+from mission_log import MissionLog
+from mission_recorder import MissionRecorder
+from rover_log import get_logger
+import llm_worker
+
+log = get_logger("fleet")
+
+
+@dataclass
+class RoverSpec:
+    """Configuration of one rover"""
+    rover_id: str
+    ip: Optional[str] = None  # Camera at http://<ip>/stream unless `camera` is given
+    camera: dict = field(default_factory=dict)  # FrameBuffer kwargs
+    serial_port: Optional[str] = None  # Required: auto-detect could open another rover's port
+    record_dir: Optional[str] = None
+
+    def frame_source(self) -> dict:
+        if self.camera:
+            return dict(self.camera)
+        return {'mode': 'http', 'http_url': f"http://{self.ip}/stream",
+                'control_url': f"http://{self.ip}:81/control"}
+
+
+def load_fleet(path: str) -> List[RoverSpec]:
+    """
+    Read a fleet config file.
+
+    Raises:
+        ValueError: on missing or duplicate rover ids, or a rover without serial_port
+    """
+    with open(path) as f:
+        data = json.load(f)
+    specs = []
+    for entry in data.get('rovers', []):
+        entry = dict(entry)
+        rover_id = entry.pop('id', None)
+        if not rover_id:
+            raise ValueError(f"Rover entry without id in {path}")
+        if not entry.get('serial_port'):
+            raise ValueError(f"Rover {rover_id} has no serial_port in {path}")
+        specs.append(RoverSpec(rover_id=rover_id, **entry))
+    ids = [s.rover_id for s in specs]
+    if len(ids) != len(set(ids)):
+        raise ValueError(f"Duplicate rover ids in {path}")
+    return specs
+
+
+class RoverPipeline:
+    """
+    Everything one rover needs, wired the same way as the single-rover app.
+    """
+
+    def __init__(self, spec: RoverSpec, config: AIConfig, detector=None, strategic=None):
+        """
+        Initialize rover pipeline (nothing runs until start()).
+
+        Args:
+            spec: Rover configuration
+            config: AI configuration
+            detector: Shared detector (None = private model)
+            strategic: Shared VLM client (None = private navigator)
+        """
+        self.spec = spec
+        self.rover_id = spec.rover_id
+        self.config = config
+        self.frame_buffer = FrameBuffer(**spec.frame_source())
+        self.serial_manager = SerialManager(port=spec.serial_port)
+        self.mission_log = MissionLog(capacity=1000)
+
+        self.recorder = None
+        if spec.record_dir:
+            self.recorder = MissionRecorder(spec.record_dir, telemetry_source=self.collect_telemetry)
+            self.frame_buffer.add_frame_listener(self.recorder.frame_listener)
+
+        self.dispatcher = CommandDispatcher(
+            self.serial_manager.send_rover_command,
+            coalesce_window=config.dispatch_coalesce_ms / 1000,
+            max_rate_hz=config.dispatch_max_rate_hz,
+            keepalive_interval=config.dispatch_keepalive_ms / 1000
+        )
+        self.arbiter = CommandArbiter(
+            self._on_command,
+            idle_callback=self.dispatcher.reset,
+            default_ttls={
+                CommandPriority.TACTICAL: config.tactical_command_ttl,
+                CommandPriority.STRATEGIC: config.strategic_command_ttl,
+            }
+        )
+        self.ai_worker = llm_worker.AIWorker(
+            self.frame_buffer, self.mission_log, self.arbiter, config=config,
+            recorder=self.recorder,
+            range_source=lambda: self.serial_manager.get_range(config.ultrasonic_max_age),
+            detector=detector, strategic=strategic
+        )
+
+    def _on_command(self, cmd):
+        if self.recorder:
+            self.recorder.record_command(cmd)
+        self.dispatcher.submit(cmd)
+
+    def start(self):
+        self.serial_manager.start()
+        self.dispatcher.start()
+        if self.recorder:
+            self.recorder.start()
+        self.ai_worker.start()
+        log.info(f"✅ Rover {self.rover_id} started")
+
+    def stop(self):
+        self.ai_worker.stop()
+        self.dispatcher.stop()
+        self.serial_manager.close()
+        self.frame_buffer.stop()
+        if self.recorder:
+            self.recorder.stop()
+
+    def collect_telemetry(self) -> dict:
+        return {
+            **self.frame_buffer.get_telemetry(),
+            **self.serial_manager.get_telemetry(),
+            'rover_id': self.rover_id,
+            'mode': 'remote'
+        }
+
+    def collect_ai_status(self) -> dict:
+        status = self.ai_worker.get_status()
+        status['command_latency'] = self.serial_manager.get_latency_stats()
+        return status
+
+
+class RoverRegistry:
+    """
+    Rover pipelines by id, plus the models they share.
+    """
+
+    def __init__(self, config: AIConfig = None, max_batch: int = 4, vlm_concurrency: int = 1,
+                 reserved_ports: Iterable[str] = ()):
+        """
+        Initialize registry.
+
+        Args:
+            config: AI configuration shared by all rovers
+            max_batch: Most frames per shared detector call
+            vlm_concurrency: VLM requests in flight across the fleet
+            reserved_ports: Serial ports used outside the fleet (the default rover)
+        """
+        self.config = config or AIConfig()
+        self.detector = SharedDetector(self.config, max_batch=max_batch)
+        self.vlm = FairShareVLM(StrategicNavigator(self.config), max_concurrent=vlm_concurrency)
+        self._rovers: Dict[str, RoverPipeline] = {}
+        self._reserved_ports = {p for p in reserved_ports if p}
+
+    def add(self, spec: RoverSpec) -> RoverPipeline:
+        """
+        Create a rover pipeline on the shared models.
+
+        Raises:
+            ValueError: if the rover id or serial port is taken, or no port is given
+        """
+        if spec.rover_id in self._rovers:
+            raise ValueError(f"Rover {spec.rover_id} already registered")
+        if not spec.serial_port:
+            raise ValueError(f"Rover {spec.rover_id} needs an explicit serial_port")
+        taken = self._reserved_ports | {r.spec.serial_port for r in self._rovers.values()}
+        if spec.serial_port in taken:
+            raise ValueError(f"Serial port {spec.serial_port} of rover {spec.rover_id} is already in use")
+        rover = RoverPipeline(
+            spec, self.config,
+            detector=self.detector,
+            strategic=self.vlm.client(spec.rover_id, self.config)
+        )
+        self._rovers[spec.rover_id] = rover
+        return rover
+
+    def get(self, rover_id: str) -> Optional[RoverPipeline]:
+        return self._rovers.get(rover_id)
+
+    def ids(self) -> List[str]:
+        return list(self._rovers)
+
+    def __iter__(self) -> Iterator[RoverPipeline]:
+        return iter(list(self._rovers.values()))
+
+    def __len__(self) -> int:
+        return len(self._rovers)
+
+    def start(self):
+        for rover in self:
+            rover.start()
+
+    def stop(self):
+        for rover in self:
+            rover.stop()
+
+    def get_status(self) -> dict:
+        return {
+            'rovers': [
+                {
+                    'id': rover.rover_id,
+                    'state': rover.frame_buffer.get_telemetry().get('state'),
+                    'serial': rover.serial_manager.get_telemetry().get('status'),
+                    'ai_enabled': rover.ai_worker.is_enabled(),
+                }
+                for rover in self
+            ],
+            'detector': self.detector.get_status(),
+            'vlm': self.vlm.get_status(),
+        }
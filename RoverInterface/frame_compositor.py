@@ -0,0 +1,208 @@
+# frame_compositor.py
+"""
+Frame Compositor for Rescue Rover
+
+Draws AI overlays onto the video feed, decoupled from detection. The
+tactical loop only publishes its latest detections (and the frame it
+decoded); the compositor combines them with the latest raw frame, draws
+and encodes on its own thread, and only while someone is watching
+/video_feed, at the highest rate any viewer asked for.
+
+Clients that draw overlays themselves can skip the annotated stream
+entirely and use the detections as JSON (/api/detections, or the
+'detections' event on /api/stream) on top of the raw feed.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from rover_log import get_logger
+from metrics import span
+
+log = get_logger("compositor")
+
+
+def draw_detections(img: np.ndarray, detections) -> np.ndarray:
+    """Draw detection boxes and labels in place."""
+    import cv2
+    h, w = img.shape[:2]
+    for det in detections:
+        x1, y1, x2, y2 = det.bbox
+        # Scale back to pixels
+        p1 = (int(x1 * w), int(y1 * h))
+        p2 = (int(x2 * w), int(y2 * h))
+
+        color = (0, 0, 255) if "person" in det.class_name else (0, 255, 0)
+        label = f"#{det.track_id} " if det.track_id is not None else ""
+        cv2.rectangle(img, p1, p2, color, 2)
+        cv2.putText(img, f"{label}{det.class_name} {det.confidence:.2f}",
+                    (p1[0], p1[1]-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return img
+
+
+class FrameCompositor:
+    """
+    Renders annotated display frames on demand.
+    """
+
+    def __init__(self, frame_buffer, default_fps: float = 30.0, jpeg_quality: int = 80):
+        """
+        Initialize compositor.
+
+        Args:
+            frame_buffer: FrameBuffer providing raw frames, receiving display frames
+            default_fps: Render rate for viewers that do not ask for one
+            jpeg_quality: Encode quality of annotated frames
+        """
+        self.frame_buffer = frame_buffer
+        self._default_fps = default_fps
+        self._jpeg_quality = jpeg_quality
+
+        self._cond = threading.Condition()
+        self._viewers = {}
+        self._next_viewer = 0
+        self._result = None
+        self._result_frame_id: Optional[int] = None
+        self._image: Optional[np.ndarray] = None
+        self._version = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {'rendered': 0, 'skipped_unchanged': 0}
+
+    # ------------------------
+    # Producer (tactical loop)
+    # ------------------------
+
+    def publish(self, result, frame_id: Optional[int], image: np.ndarray = None):
+        """
+        Hand over the latest detections. Never blocks on drawing/encoding.
+
+        Args:
+            result: TacticalResult
+            frame_id: Frame the result belongs to
+            image: The decoded frame, if the caller has it (saves a decode);
+                must not be modified afterwards
+        """
+        with self._cond:
+            self._result = result
+            self._result_frame_id = frame_id
+            self._image = image
+            self._version += 1
+            if self._viewers:
+                self._cond.notify()
+
+    def get_detections(self) -> dict:
+        """Latest detections as JSON for client-side overlays."""
+        with self._cond:
+            result, frame_id = self._result, self._result_frame_id
+        if result is None:
+            return {'frame_id': None, 'detections': []}
+        return {
+            'frame_id': frame_id,
+            'should_stop': result.should_stop,
+            'stop_reason': result.stop_reason,
+            'detections': [
+                {
+                    'class_name': d.class_name,
+                    'confidence': round(d.confidence, 3),
+                    'bbox': [round(v, 4) for v in d.bbox],
+                    'track_id': d.track_id,
+                }
+                for d in result.detections
+            ]
+        }
+
+    # ------------------------
+    # Viewers (/video_feed)
+    # ------------------------
+
+    def add_viewer(self, fps: float = None) -> int:
+        """Register a viewer; rendering runs while at least one exists."""
+        with self._cond:
+            self._next_viewer += 1
+            self._viewers[self._next_viewer] = fps or self._default_fps
+            self._cond.notify()
+            return self._next_viewer
+
+    def remove_viewer(self, viewer_id: int):
+        with self._cond:
+            self._viewers.pop(viewer_id, None)
+
+    # ------------------------
+    # Render thread
+    # ------------------------
+
+    def _render(self, result, result_frame_id, image):
+        """Compose the newest raw frame with the newest detections."""
+        import cv2
+        frame_bytes, trace = self.frame_buffer.get_paced_frame_with_trace()
+        if image is not None and trace is not None and trace.frame_id == result_frame_id:
+            img = image.copy()
+        elif frame_bytes is not None:
+            img = cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), cv2.IMREAD_COLOR)
+        else:
+            return
+        if img is None:
+            return
+
+        with span('draw'):
+            draw_detections(img, result.detections if result else [])
+        with span('encode'):
+            _, jpeg = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, self._jpeg_quality])
+        self.frame_buffer.set_display_frame(jpeg.tobytes())
+        self.stats['rendered'] += 1
+
+    def _render_loop(self):
+        rendered_key = None
+        next_render = 0.0
+        while self._running:
+            with self._cond:
+                while self._running and not self._viewers:
+                    self._cond.wait(1.0)
+                if not self._running:
+                    break
+                interval = 1.0 / max(self._viewers.values())
+                result, frame_id, image = self._result, self._result_frame_id, self._image
+                version = self._version
+
+            now = time.monotonic()
+            if now < next_render:
+                time.sleep(next_render - now)
+                continue
+            next_render = now + interval
+
+            # Nothing new since the last render: keep the current display frame
+            _, trace = self.frame_buffer.get_paced_frame_with_trace()
+            key = (trace.frame_id if trace else None, version)
+            if key == rendered_key:
+                self.stats['skipped_unchanged'] += 1
+                continue
+            rendered_key = key
+
+            try:
+                self._render(result, frame_id, image)
+            except Exception as e:
+                log.error(f"❌ Compositor error: {e}", extra={'sample': 'compositor.error'})
+
+    def start(self):
+        """Start the render thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._render_loop, daemon=True, name="FrameCompositor")
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def get_status(self) -> dict:
+        with self._cond:
+            viewers = len(self._viewers)
+            target_fps = max(self._viewers.values()) if self._viewers else 0
+        return {'viewers': viewers, 'target_fps': target_fps, **self.stats}
@@ -0,0 +1,180 @@
+# frame_export.py
+"""
+Shared-Memory Frame Export for Rescue Rover
+
+Publishes every camera frame into two named POSIX shared-memory rings
+(shm_ring.py) so other tools on the host (recorders, analytics models)
+get frames without another /video_feed client and another decode:
+
+    <name>-jpeg     encoded frames as received
+    <name>-decoded  BGR frames, shape (H, W, 3) in the slot header
+
+Each slot header carries the frame id, the capture time (perf_counter,
+comparable across processes on one host) and the shape.
+
+Reader side (needs only numpy and shm_ring.py):
+
+    reader = FrameReader('rescue-rover')
+    frame = reader.wait_frame(after=0)        # zero-copy view
+    img = frame.to_array()                    # (H, W, 3) uint8, no copy
+    ... use img ...
+    ok = reader.intact(frame)                 # False if overwritten meanwhile
+"""
+
+import threading
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+from rover_log import get_logger
+from shm_ring import SharedFrameRing, RingFrame
+
+log = get_logger("export")
+
+
+def _create_ring(name: str, slots: int, slot_bytes: int) -> SharedFrameRing:
+    """Create a named ring, replacing a block left behind by a crashed run."""
+    try:
+        return SharedFrameRing.create(slots, slot_bytes, name=name)
+    except FileExistsError:
+        log.warning(f"⚠️ Replacing stale shared memory block {name}")
+        stale = shared_memory.SharedMemory(name=name)
+        stale.close()
+        stale.unlink()
+        return SharedFrameRing.create(slots, slot_bytes, name=name)
+
+
+class FrameExporter:
+    """
+    FrameBuffer listener writing frames into named shared-memory rings.
+    """
+
+    def __init__(self, name: str = 'rescue-rover', slots: int = 4,
+                 jpeg_slot_bytes: int = 1024 * 1024, max_frame_shape=(720, 1280, 3),
+                 decoded: bool = True):
+        """
+        Initialize exporter (rings are created now).
+
+        Args:
+            name: Ring name prefix readers attach to
+            slots: Frames kept per ring
+            jpeg_slot_bytes: Largest JPEG exported
+            max_frame_shape: Largest decoded frame (H, W, C) exported
+            decoded: Also export decoded frames (one decode per frame, off
+                the receiver thread)
+        """
+        self.name = name
+        h, w, c = max_frame_shape
+        self.jpeg_ring = _create_ring(f"{name}-jpeg", slots, jpeg_slot_bytes)
+        self.decoded_ring = _create_ring(f"{name}-decoded", slots, h * w * c) if decoded else None
+        self._cond = threading.Condition()
+        self._pending: Optional[Tuple[bytes, int, float]] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'jpeg_frames': 0, 'decoded_frames': 0, 'decode_skipped': 0, 'dropped': 0}
+
+    def frame_listener(self, jpeg_bytes: bytes, trace):
+        """FrameBuffer listener: export every published frame."""
+        frame_id = trace.frame_id if trace else 0
+        timestamp = trace.capture_time if trace else None
+        try:
+            self.jpeg_ring.write(jpeg_bytes, frame_id, timestamp)
+            self.stats['jpeg_frames'] += 1
+        except ValueError as e:
+            self.stats['dropped'] += 1
+            log.warning(f"⚠️ Frame not exported: {e}", extra={'sample': 'export.oversize'})
+            return
+        if self.decoded_ring is not None:
+            with self._cond:
+                if self._pending is not None:
+                    self.stats['decode_skipped'] += 1  # Decoder behind: newest wins
+                self._pending = (jpeg_bytes, frame_id, timestamp)
+                self._cond.notify()
+
+    def _decode_loop(self):
+        import cv2
+        import numpy as np
+        while self._running:
+            with self._cond:
+                while self._pending is None and self._running:
+                    self._cond.wait(0.5)
+                pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+            jpeg_bytes, frame_id, timestamp = pending
+            img = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                continue
+            try:
+                self.decoded_ring.write(img, frame_id, timestamp)
+                self.stats['decoded_frames'] += 1
+            except ValueError as e:
+                self.stats['dropped'] += 1
+                log.warning(f"⚠️ Decoded frame not exported: {e}", extra={'sample': 'export.oversize'})
+
+    def start(self):
+        if self._running or self.decoded_ring is None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._decode_loop, daemon=True, name="FrameExportDecode")
+        self._thread.start()
+
+    def stop(self):
+        """Stop the decoder and remove the rings (readers keep their mapping until they close)."""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2)
+        for ring in (self.jpeg_ring, self.decoded_ring):
+            if ring is not None:
+                ring.close()
+                ring.unlink()
+
+    def get_status(self) -> dict:
+        return {
+            'jpeg_ring': self.jpeg_ring.name,
+            'decoded_ring': self.decoded_ring.name if self.decoded_ring else None,
+            **self.stats
+        }
+
+
+class FrameReader:
+    """
+    Attaches to an exporter's rings; reads are zero-copy views.
+    """
+
+    def __init__(self, name: str = 'rescue-rover'):
+        """
+        Args:
+            name: Ring name prefix given to FrameExporter
+        """
+        self.jpeg_ring = SharedFrameRing.attach(f"{name}-jpeg")
+        try:
+            self.decoded_ring = SharedFrameRing.attach(f"{name}-decoded")
+        except FileNotFoundError:
+            self.decoded_ring = None  # Exporter runs with decoded=False
+
+    def latest_jpeg(self, after: int = 0) -> Optional[RingFrame]:
+        """Newest encoded frame newer than seq `after` (data is a view)."""
+        return self.jpeg_ring.read_latest(after, copy=False)
+
+    def latest_frame(self, after: int = 0) -> Optional[RingFrame]:
+        """Newest decoded frame newer than seq `after`; frame.to_array() is a view."""
+        return self.decoded_ring.read_latest(after, copy=False) if self.decoded_ring else None
+
+    def wait_jpeg(self, after: int = 0, timeout: float = 1.0) -> Optional[RingFrame]:
+        return self.jpeg_ring.wait(after, timeout, copy=False)
+
+    def wait_frame(self, after: int = 0, timeout: float = 1.0) -> Optional[RingFrame]:
+        return self.decoded_ring.wait(after, timeout, copy=False) if self.decoded_ring else None
+
+    def intact(self, frame: RingFrame) -> bool:
+        """True if the frame was not overwritten while it was being used."""
+        ring = self.jpeg_ring if frame.shape == (0, 0, 0) else self.decoded_ring
+        return ring.intact(frame)
+
+    def close(self):
+        """Detach (drop all frame views first)."""
+        for ring in (self.jpeg_ring, self.decoded_ring):
+            if ring is not None:
+                ring.close()
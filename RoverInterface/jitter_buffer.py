@@ -0,0 +1,139 @@
+# jitter_buffer.py
+"""
+Adaptive Jitter Buffer for Rescue Rover video
+
+UDP frames arrive in bursts (the firmware sends chunks with delay(1)
+between them, WiFi adds its own jitter). The jitter buffer re-times
+publication to the stream's measured cadence: each frame is scheduled one
+frame interval after the previous one, but never before it arrived and
+never later than the adaptive target delay (2x measured jitter, clamped).
+When a newer frame is already due, the older one is dropped instead of
+being shown late.
+
+Only the display path goes through the buffer; AI consumers read the
+newest raw frame directly.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from rover_log import get_logger
+
+log = get_logger("jitter")
+
+
+class JitterBuffer:
+    """
+    Re-times items onto a smooth cadence and hands them to a callback.
+    """
+
+    def __init__(self, publish: Callable[[Any], None], min_delay: float = 0.0,
+                 max_delay: float = 0.15, depth: int = 3):
+        """
+        Initialize buffer and its playout thread.
+
+        Args:
+            publish: Called with each item at its playout time
+            min_delay: Smallest added delay (seconds)
+            max_delay: Largest added delay (seconds), bounds the latency cost
+            depth: Most items held; the oldest is dropped beyond this
+        """
+        self._publish = publish
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._depth = depth
+        self._cond = threading.Condition()
+        self._queue = deque()  # (playout_time, item)
+        self._last_arrival: Optional[float] = None
+        self._last_playout: Optional[float] = None
+        self._interval: Optional[float] = None
+        self._jitter = 0.0
+        self._delay = 0.0  # EMA of playout - arrival
+        self._running = True
+        self.stats = {'played': 0, 'dropped_late': 0, 'dropped_overflow': 0}
+        self._thread = threading.Thread(target=self._playout_loop, daemon=True, name="JitterBuffer")
+        self._thread.start()
+
+    @property
+    def target_delay(self) -> float:
+        return min(max(2 * self._jitter, self._min_delay), self._max_delay)
+
+    def schedule(self, now: float) -> float:
+        """Update cadence estimates for an arrival and return its playout time."""
+        if self._last_arrival is not None:
+            gap = now - self._last_arrival
+            if gap < 1.0:  # Longer gaps are outages, not cadence
+                if self._interval is None:
+                    self._interval = gap
+                else:
+                    self._jitter += (abs(gap - self._interval) - self._jitter) / 16
+                    self._interval += (gap - self._interval) / 16
+        self._last_arrival = now
+
+        if self._last_playout is None or self._interval is None:
+            playout = now + self.target_delay
+        else:
+            playout = min(max(self._last_playout + self._interval, now), now + self.target_delay)
+        self._last_playout = playout
+        self._delay += (playout - now - self._delay) / 16
+        return playout
+
+    def push(self, item: Any, now: float = None):
+        """Queue an item that arrived at `now` (perf_counter)."""
+        now = time.perf_counter() if now is None else now
+        with self._cond:
+            self._queue.append((self.schedule(now), item))
+            if len(self._queue) > self._depth:
+                self._queue.popleft()
+                self.stats['dropped_overflow'] += 1
+            self._cond.notify()
+
+    def _next_due(self) -> Optional[Any]:
+        """Wait for the head item's playout time; skip items a newer one overtook."""
+        with self._cond:
+            while self._running:
+                if not self._queue:
+                    self._cond.wait(0.5)
+                    continue
+                now = time.perf_counter()
+                playout, item = self._queue[0]
+                if playout > now:
+                    self._cond.wait(playout - now)
+                    continue
+                self._queue.popleft()
+                # A newer item is already due: showing this one would only add delay
+                while self._queue and self._queue[0][0] <= now:
+                    playout, item = self._queue.popleft()
+                    self.stats['dropped_late'] += 1
+                return item
+        return None
+
+    def _playout_loop(self):
+        while self._running:
+            item = self._next_due()
+            if item is None:
+                continue
+            try:
+                self._publish(item)
+                self.stats['played'] += 1
+            except Exception as e:
+                log.error(f"❌ Jitter buffer publish error: {e}", extra={'sample': 'jitter.publish'})
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def get_status(self) -> dict:
+        with self._cond:
+            queued = len(self._queue)
+        return {
+            'queued': queued,
+            'interval_ms': round(self._interval * 1000, 1) if self._interval else None,
+            'jitter_ms': round(self._jitter * 1000, 1),
+            'target_delay_ms': round(self.target_delay * 1000, 1),
+            'avg_delay_ms': round(self._delay * 1000, 1),
+            **self.stats
+        }
@@ -0,0 +1,191 @@
+# jpeg_repair.py
+"""
+Partial JPEG Recovery for Rescue Rover
+
+A JPEG with restart markers (DRI) is a run of independent restart
+intervals: the DC predictors reset at every RSTn marker, so an interval
+decodes without the ones before it. When UDP chunks of a frame are lost,
+the intervals that arrived intact are kept and the damaged ones are
+replaced with the same intervals of the previous good frame (same
+quantization/Huffman tables and geometry required). The result is a
+valid JPEG: mostly fresh pixels, stale where the link dropped data.
+
+Frames without restart markers cannot be repaired and stay dropped.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+EOI = b'\xff\xd9'
+_STANDALONE = set(range(0xd0, 0xd8)) | {0x01, 0xd8}  # Markers without a length field
+
+
+@dataclass(frozen=True)
+class JpegLayout:
+    """Where the entropy-coded data starts and how it is split"""
+    header: bytes  # Everything up to and including SOS; frames sharing it can swap intervals
+    intervals: int  # Restart intervals in the scan
+
+
+def parse_layout(data: bytes) -> Optional[JpegLayout]:
+    """
+    Parse the headers of a baseline JPEG.
+
+    Returns:
+        Layout, or None if the JPEG has no restart markers or the headers
+        are incomplete/unsupported
+    """
+    if data[:2] != b'\xff\xd8':
+        return None
+    pos, restart, frame = 2, 0, None
+    while pos + 4 <= len(data):
+        if data[pos] != 0xff:
+            return None
+        marker = data[pos + 1]
+        if marker in _STANDALONE:
+            pos += 2
+            continue
+        length = int.from_bytes(data[pos + 2:pos + 4], 'big')
+        segment = data[pos:pos + 2 + length]
+        if len(segment) < 2 + length:
+            return None
+        if marker == 0xdd:
+            restart = int.from_bytes(segment[4:6], 'big')
+        elif marker in (0xc0, 0xc1):
+            frame = segment
+        elif marker == 0xda:
+            if not restart or frame is None:
+                return None
+            height = int.from_bytes(frame[5:7], 'big')
+            width = int.from_bytes(frame[7:9], 'big')
+            sampling = [frame[10 + 3 * i + 1] for i in range(frame[9])]
+            h_max = max(s >> 4 for s in sampling)
+            v_max = max(s & 0x0f for s in sampling)
+            mcus = -(-width // (8 * h_max)) * -(-height // (8 * v_max))
+            return JpegLayout(data[:pos + 2 + length], -(-mcus // restart))
+        elif marker in (0xc2, 0xc3) or 0xc5 <= marker <= 0xcf:
+            return None  # Progressive / lossless / arithmetic: not handled
+        pos += 2 + length
+    return None
+
+
+def _markers(data: bytes, start: int, end: int) -> List[Tuple[int, int]]:
+    """(position, n) of every RSTn marker fully inside data[start:end]."""
+    found = []
+    pos = data.find(b'\xff', start, end - 1)
+    while pos != -1:
+        if 0xd0 <= data[pos + 1] <= 0xd7:
+            found.append((pos, data[pos + 1] - 0xd0))
+        pos = data.find(b'\xff', pos + 1, end - 1)
+    return found
+
+
+def split_intervals(jpeg: bytes, layout: JpegLayout) -> Optional[List[bytes]]:
+    """Entropy-coded data of each restart interval of a complete JPEG."""
+    end = jpeg.rfind(EOI)
+    if end < len(layout.header):
+        return None
+    intervals, start = [], len(layout.header)
+    for pos, _ in _markers(jpeg, start, end):
+        intervals.append(jpeg[start:pos])
+        start = pos + 2
+    intervals.append(jpeg[start:end])
+    return intervals if len(intervals) == layout.intervals else None
+
+
+def assemble(layout: JpegLayout, intervals: List[bytes]) -> bytes:
+    """Build a JPEG from its header and restart intervals."""
+    parts = [layout.header]
+    for i, interval in enumerate(intervals):
+        parts.append(interval)
+        if i < len(intervals) - 1:
+            parts.append(bytes((0xff, 0xd0 + i % 8)))
+    parts.append(EOI)
+    return b''.join(parts)
+
+
+class RestartRepairer:
+    """
+    Conceals lost restart intervals with the previous frame's.
+    """
+
+    def __init__(self):
+        self._reference: Optional[Tuple[JpegLayout, List[bytes]]] = None
+        self.stats = {'repaired': 0, 'unrepairable': 0, 'intervals_concealed': 0, 'intervals_kept': 0}
+
+    def remember(self, jpeg: bytes):
+        """Use a complete frame as the concealment reference."""
+        layout = parse_layout(jpeg)
+        intervals = split_intervals(jpeg, layout) if layout else None
+        if intervals:
+            self._reference = (layout, intervals)
+
+    def repair(self, data: bytes, missing: List[Tuple[int, int]]) -> Optional[bytes]:
+        """
+        Rebuild a partially received frame.
+
+        Args:
+            data: Frame bytes, with lost ranges zero-filled
+            missing: Sorted, non-overlapping (start, end) byte ranges that were lost
+
+        Returns:
+            A decodable JPEG, or None if the frame cannot be repaired
+        """
+        good = self._intact_intervals(data, missing)
+        if not good:
+            self.stats['unrepairable'] += 1
+            return None
+        layout, reference = self._reference
+        intervals = [good.get(i, reference[i]) for i in range(layout.intervals)]
+        jpeg = assemble(layout, intervals)
+        self.stats['repaired'] += 1
+        self.stats['intervals_kept'] += len(good)
+        self.stats['intervals_concealed'] += layout.intervals - len(good)
+        self.remember(jpeg)
+        return jpeg
+
+    def _intact_intervals(self, data: bytes, missing: List[Tuple[int, int]]) -> Dict[int, bytes]:
+        """Index -> entropy data of every interval received without a gap."""
+        if self._reference is None:
+            return {}
+        layout, _ = self._reference
+        scan = len(layout.header)
+        # Headers must have arrived and match the reference (tables, size, DRI)
+        if (missing and missing[0][0] < scan) or not data.startswith(layout.header):
+            return {}
+
+        # Received byte ranges of the scan
+        received, start = [], scan
+        for gap_start, gap_end in missing:
+            if gap_start > start:
+                received.append((start, gap_start))
+            start = max(start, gap_end)
+        if start < len(data):
+            received.append((start, len(data)))
+
+        good: Dict[int, bytes] = {}
+        last = -1  # Last interval index assigned
+        for seg_start, seg_end in received:
+            # After a gap an unknown number of markers is gone: the interval
+            # in progress is damaged and its index comes from the next RSTn
+            clean = seg_start == scan
+            index, start = (0 if clean else None), seg_start
+            for pos, rst in _markers(data, seg_start, seg_end):
+                if index is None:
+                    # Next index with this RST number; assumes the gap lost
+                    # fewer than 8 intervals (verified at EOI when it arrived)
+                    index = last + 1 + (rst - (last + 1)) % 8
+                elif clean:
+                    good[index] = data[start:pos]
+                last = index
+                index, start, clean = index + 1, pos + 2, True
+            end = data.rfind(EOI, start, seg_end)
+            if end != -1 and index is not None:
+                if index != layout.intervals - 1:
+                    return {}  # Numbering drifted: cannot place intervals safely
+                if clean:
+                    good[index] = data[start:end]
+        return {i: v for i, v in good.items() if i < layout.intervals}
+
+    def get_status(self) -> dict:
+        return {**self.stats, 'has_reference': self._reference is not None}
@@ -0,0 +1,264 @@
+# link_quality.py
+"""
+Camera Link Quality for Rescue Rover
+
+Scores the camera link from what the receiver sees (frame inter-arrival
+time, jitter, lost/undecodable frames, stalls) and negotiates the rover's
+camera profile with it: when the score stays low the rover is asked for a
+smaller frame size / stronger JPEG compression, and for the original
+profile again once the link has recovered. At range this trades stalls
+and reconnects for lower-fidelity frames that keep arriving.
+
+The rover applies profiles through its HTTP control endpoint
+(http://<ip>:81/control?framesize=QVGA&quality=30, CameraModule.cpp).
+"""
+
+import threading
+import time
+import urllib.request
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+
+from rover_log import get_logger
+
+log = get_logger("link")
+
+
+class LinkMonitor:
+    """
+    Inter-arrival, jitter and loss statistics over a sliding window.
+    """
+
+    def __init__(self, window: float = 2.0, stall_after: float = 1.0):
+        """
+        Initialize monitor.
+
+        Args:
+            window: Seconds of history the loss ratio and frame rate cover
+            stall_after: A gap longer than this makes the link score 0
+        """
+        self._window = window
+        self._stall_after = stall_after
+        self._lock = threading.Lock()
+        self._frames = deque()  # (arrival, size)
+        self._losses = deque()  # arrival of each lost frame
+        self._last_arrival: Optional[float] = None
+        self._interval: Optional[float] = None  # EMA of inter-arrival time
+        self._jitter = 0.0  # RFC 3550 style smoothed deviation
+        self._connection_frames = 0  # Since the last on_connect()
+        self.stats = {'frames': 0, 'lost': 0, 'stalls': 0}
+
+    def on_connect(self):
+        """A new connection to the camera was opened; nothing received on it yet."""
+        with self._lock:
+            self._connection_frames = 0
+            self._last_arrival = None  # The reconnect gap is not an inter-arrival time
+
+    @property
+    def receiving(self) -> bool:
+        """At least one frame arrived on the current connection."""
+        return self._connection_frames > 0
+
+    def on_frame(self, size: int, now: float = None):
+        """A frame arrived intact."""
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            if self._last_arrival is not None:
+                gap = now - self._last_arrival
+                if gap > self._stall_after:
+                    self.stats['stalls'] += 1
+                elif self._interval is None:
+                    self._interval = gap
+                else:
+                    self._jitter += (abs(gap - self._interval) - self._jitter) / 16
+                    self._interval += (gap - self._interval) / 16
+            self._last_arrival = now
+            self._frames.append((now, size))
+            self._connection_frames += 1
+            self.stats['frames'] += 1
+            self._trim(now)
+
+    def on_loss(self, count: int = 1, now: float = None):
+        """Frames were lost (undecodable, truncated, stream interrupted)."""
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            self._losses.extend([now] * count)
+            self.stats['lost'] += count
+            self._trim(now)
+
+    def _trim(self, now: float):
+        horizon = now - self._window
+        while self._frames and self._frames[0][0] < horizon:
+            self._frames.popleft()
+        while self._losses and self._losses[0] < horizon:
+            self._losses.popleft()
+
+    def score(self, now: float = None) -> float:
+        """
+        Link quality in [0, 1]: 1 = steady stream without loss,
+        0 = stalled (no frame for stall_after seconds) or nothing received.
+        """
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            self._trim(now)
+            if self._last_arrival is None or now - self._last_arrival > self._stall_after:
+                return 0.0
+            received, lost = len(self._frames), len(self._losses)
+            delivery = received / (received + lost) if received + lost else 0.0
+            if not self._interval:
+                return delivery
+            return delivery / (1 + self._jitter / self._interval)
+
+    def get_status(self, now: float = None) -> dict:
+        now = time.perf_counter() if now is None else now
+        score = self.score(now)
+        with self._lock:
+            received, lost = len(self._frames), len(self._losses)
+            sizes = [size for _, size in self._frames]
+            return {
+                'score': round(score, 2),
+                'fps': round(received / self._window, 1),
+                'interval_ms': round(self._interval * 1000, 1) if self._interval else None,
+                'jitter_ms': round(self._jitter * 1000, 1),
+                'loss_ratio': round(lost / (received + lost), 3) if received + lost else 0.0,
+                'avg_frame_bytes': int(sum(sizes) / len(sizes)) if sizes else 0,
+                'since_last_frame_ms': round((now - self._last_arrival) * 1000) if self._last_arrival else None,
+                'connection_frames': self._connection_frames,
+                **self.stats
+            }
+
+
+@dataclass(frozen=True)
+class CameraProfile:
+    """Rover camera settings (OV2640 frame size name, JPEG quality 4-63, higher = smaller)"""
+    framesize: str
+    quality: int
+
+
+# Best first; the first entry is the firmware's boot profile (initCamera)
+DEFAULT_PROFILES = [
+    CameraProfile('QVGA', 30),
+    CameraProfile('QVGA', 45),
+    CameraProfile('QQVGA', 45),
+]
+
+
+class HttpCameraControl:
+    """
+    Camera control channel over the rover's HTTP control endpoint.
+    """
+
+    def __init__(self, control_url: str, timeout: float = 1.0):
+        """
+        Args:
+            control_url: e.g. http://<ip>:81/control
+            timeout: Seconds per request (the link is bad when this is used)
+        """
+        self.control_url = control_url
+        self._timeout = timeout
+
+    def apply(self, profile: CameraProfile) -> bool:
+        url = f"{self.control_url}?framesize={profile.framesize}&quality={profile.quality}"
+        try:
+            with urllib.request.urlopen(url, timeout=self._timeout) as response:
+                return response.status == 200
+        except Exception as e:
+            log.warning(f"⚠️ Camera control failed: {e}", extra={'sample': 'link.control'})
+            return False
+
+
+class QualityNegotiator:
+    """
+    Steps the camera profile down when the link score stays low and back
+    up when it stays high. Until the current connection has delivered a
+    frame, a score of 0 means "still connecting", not a bad link, and
+    does not count as degraded.
+    """
+
+    def __init__(self, monitor: LinkMonitor, control, profiles: List[CameraProfile] = None,
+                 degrade_below: float = 0.6, recover_above: float = 0.85,
+                 hold: float = 3.0, interval: float = 0.5):
+        """
+        Initialize negotiator (starts at the boot profile).
+
+        Args:
+            monitor: LinkMonitor of the stream being negotiated
+            control: Anything with apply(CameraProfile) -> bool
+            profiles: Profile ladder, best first
+            degrade_below: Score under which the link counts as degraded
+            recover_above: Score over which the link counts as healthy
+            hold: Seconds degraded before stepping down (x3 healthy to step up)
+            interval: Seconds between evaluations
+        """
+        self.monitor = monitor
+        self.control = control
+        self.profiles = profiles or DEFAULT_PROFILES
+        self._degrade_below = degrade_below
+        self._recover_above = recover_above
+        self._hold = hold
+        self._interval = interval
+        self.level = 0
+        self._applied = 0  # Level the rover last acknowledged
+        self._since: Optional[float] = None
+        self._trend = 0  # -1 degraded, +1 healthy, 0 in between
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'downgrades': 0, 'upgrades': 0, 'control_failures': 0}
+
+    @property
+    def profile(self) -> CameraProfile:
+        return self.profiles[self.level]
+
+    def evaluate(self, now: float = None):
+        """One negotiation step."""
+        now = time.perf_counter() if now is None else now
+        score = self.monitor.score(now)
+        if not self.monitor.receiving:
+            trend = 0
+        else:
+            trend = -1 if score < self._degrade_below else 1 if score > self._recover_above else 0
+        if trend != self._trend:
+            self._trend, self._since = trend, now
+        held = now - self._since if self._since is not None else 0.0
+
+        if trend < 0 and held >= self._hold and self.level < len(self.profiles) - 1:
+            self.level += 1
+            self.stats['downgrades'] += 1
+            self._since = now  # Give the new profile a full hold period
+            log.info(f"📉 Link score {score:.2f}: asking rover for {self.profile}")
+        elif trend > 0 and held >= self._hold * 3 and self.level > 0:
+            self.level -= 1
+            self.stats['upgrades'] += 1
+            self._since = now
+            log.info(f"📈 Link score {score:.2f}: asking rover for {self.profile}")
+
+        # Retried every step until the rover acknowledges
+        if self._applied != self.level:
+            if self.control.apply(self.profile):
+                self._applied = self.level
+            else:
+                self.stats['control_failures'] += 1
+
+    def _loop(self):
+        while self._running:
+            self.evaluate()
+            time.sleep(self._interval)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="LinkNegotiator")
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def get_status(self) -> dict:
+        return {
+            'level': self.level,
+            'profile': {'framesize': self.profile.framesize, 'quality': self.profile.quality},
+            'acknowledged': self._applied == self.level,
+            **self.stats
+        }
@@ -6,17 +6,94 @@ Feeds decisions to the CommandArbiter for priority-based execution.
 
 import time
 import threading
-from typing import Optional
+from dataclasses import replace
+from typing import Callable, Optional
 
 from ai import (
     TacticalDetector, 
+    TrackedDetector,
+    CorridorDetector,
+    fuse_range,
     StrategicNavigator, 
     CommandArbiter,
     FramePreprocessor,
     AIConfig
 )
 from ai.command_arbiter import CommandPriority, RoverCommand
+from ai.tactical_detector import TacticalResult
+from ai.rate_governor import RateGovernor, QualityLevel
 from ai.config import SteeringCommand
+from mission_log import MissionLog
+from frame_compositor import FrameCompositor
+from rover_log import get_logger
+from metrics import span
+
+log = get_logger("ai")
+
+
+def build_tactical(config: AIConfig, detector=None):
+    """
+    Load YOLO and wrap it in the configured corridor/fusion and tracker stages.
+    
+    Args:
+        config: AI configuration
+        detector: Shared detector to wrap instead of loading a private model
+    
+    Returns:
+        (tactical, corridor, tracked) - stages that are disabled are None
+    """
+    if detector is not None:
+        detector.load()
+    tactical = detector or TacticalDetector(config)
+    corridor = tracked = None
+    if tactical.is_ready():
+        detector = tactical
+        if config.fusion_enabled:
+            detector = corridor = CorridorDetector(detector, config)
+        if config.tracker_enabled:
+            tracked = TrackedDetector(detector, config)
+    return tactical, corridor, tracked
+
+
+def run_tactical(tactical, corridor, tracked, img, range_cm: Optional[float],
+                 config: AIConfig, quality: QualityLevel = None) -> TacticalResult:
+    """Run one frame through the stages returned by build_tactical() and fuse the range."""
+    vision = detect_tactical(tactical, corridor, tracked, img, range_cm, config, quality)
+    return fuse_tactical(vision, range_cm, config)
+
+
+def detect_tactical(tactical, corridor, tracked, img, range_cm: Optional[float],
+                    config: AIConfig, quality: QualityLevel = None) -> TacticalResult:
+    """
+    Vision part of run_tactical() (the range only steers escalation).
+    
+    Args:
+        quality: Rate governor level (None = full quality). Ignored while
+            escalated: something close always gets the full pass.
+    """
+    if corridor:
+        corridor.set_range(range_cm)
+    escalated = corridor is not None and corridor.escalated
+    imgsz = detect_every = None
+    if quality is not None and not escalated:
+        imgsz = quality.imgsz if quality.imgsz != config.yolo_imgsz else None
+        detect_every = quality.detect_every
+    if tracked:
+        result = tracked.process(img, force_detect=escalated, imgsz=imgsz, detect_every=detect_every)
+    else:
+        result = (corridor or tactical).detect(img, imgsz=imgsz)
+    return result
+
+
+def fuse_tactical(vision: TacticalResult, range_cm: Optional[float], config: AIConfig) -> TacticalResult:
+    """
+    Fuse a range reading into a copy of a vision result, so a cached result
+    can be re-fused with every new reading while frames are static.
+    """
+    result = replace(vision)
+    if config.fusion_enabled:
+        result = fuse_range(result, range_cm, config)
+    return result
 
 
 class AIWorker:
@@ -25,136 +102,237 @@ class AIWorker:
     Runs detection at 30Hz and VLM analysis at 0.5Hz.
     """
     
-    def __init__(self, frame_buffer, mission_log: list, arbiter: CommandArbiter):
+    def __init__(self, frame_buffer, mission_log: MissionLog, arbiter: CommandArbiter,
+                 config: AIConfig = None, recorder=None,
+                 range_source: Callable[[], Optional[float]] = None,
+                 compositor: FrameCompositor = None, pipeline=None,
+                 detector=None, strategic=None):
         """
         Initialize AI worker.
         
         Args:
             frame_buffer: FrameBuffer instance for camera frames
-            mission_log: List to append mission log entries
+            mission_log: MissionLog to record mission log entries
             arbiter: CommandArbiter for command output
+            config: AI configuration, uses default if None
+            recorder: Optional MissionRecorder for detections and VLM decisions
+            range_source: Returns the ultrasonic range in cm (None if stale)
+            compositor: Draws overlays for the display feed, created if None
+            pipeline: ProcessPipeline running ingest/tactical in worker
+                processes (frame_buffer must then be its frame_buffer)
+            detector: Shared (batched) detector instead of a private YOLO model
+            strategic: Shared VLM client instead of a private StrategicNavigator
         """
         self.frame_buffer = frame_buffer
         self.mission_log = mission_log
         self.arbiter = arbiter
-        self.config = AIConfig()
+        self.config = config or AIConfig()
+        self.recorder = recorder
+        self.range_source = range_source
+        self.compositor = compositor or FrameCompositor(frame_buffer)
+        self.pipeline = pipeline
+        self._shared_detector = detector
+        self._shared_strategic = strategic
         
+        self.governor = RateGovernor(self.config)
         self.preprocessor = FramePreprocessor()
         self.tactical: Optional[TacticalDetector] = None
+        self.tracked: Optional[TrackedDetector] = None
+        self.corridor: Optional[CorridorDetector] = None
         self.strategic: Optional[StrategicNavigator] = None
         
         self._running = False
         self._enabled = True
+        self._stopping = False
+        self._frame_count = 0
+        self._fps_start = time.time()
+        self._started_at: Optional[float] = None
+        self._cold_start_ms: Optional[float] = None
+        self._operator_until = 0.0  # monotonic() until which VLM steering yields
         self._tactical_thread: Optional[threading.Thread] = None
         self._strategic_thread: Optional[threading.Thread] = None
         
+        # Model readiness: pending -> loading -> ready | unavailable | error
+        self.readiness = {
+            name: {'state': 'pending', 'load_ms': None, 'warmup_ms': None}
+            for name in ('tactical', 'strategic')
+        }
+        
         # Stats
         self.stats = {
             'tactical_fps': 0,
             'strategic_last_run': 0,
             'tactical_detections': 0,
-            'strategic_decisions': 0
+            'strategic_decisions': 0,
+            'static_frames_skipped': 0
         }
+        self._last_vision = None  # Re-fused with the current range on frames marked static at ingest
     
     def _load_models(self):
-        """Load AI models (can be slow, run in background)"""
+        """Load AI models (can be slow, run in background, one thread per model)"""
         self._log("🔄 Loading AI models...")
+        started = time.perf_counter()
         
+        loaders = [threading.Thread(target=self._load_strategic, daemon=True, name="LoadStrategic")]
+        if self.pipeline:
+            self._log("🔀 Tactical (YOLO) runs in the inference process")
+        else:
+            loaders.append(threading.Thread(target=self._load_tactical, daemon=True, name="LoadTactical"))
+        for loader in loaders:
+            loader.start()
+        for loader in loaders:
+            loader.join()
+        
+        self._log(f"⏱️ Models loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+    
+    def _load_tactical(self):
+        started = time.perf_counter()
+        self.readiness['tactical']['state'] = 'loading'
         try:
-            self.tactical = TacticalDetector(self.config)
-            if self.tactical.is_ready():
-                self._log("✅ Tactical (YOLO) ready")
-            else:
-                self._log("⚠️ Tactical (YOLO) not available")
+            tactical, corridor, tracked = build_tactical(self.config, self._shared_detector)
+            self._warm_up('tactical', "Tactical (YOLO)", tactical, started)
+            # Published only once warm, so the loop never shares the model with warm-up
+            self.tactical, self.corridor, self.tracked = tactical, corridor, tracked
         except Exception as e:
+            self.readiness['tactical']['state'] = 'error'
             self._log(f"❌ Tactical load error: {e}")
             self.tactical = None
-        
+    
+    def _load_strategic(self):
+        started = time.perf_counter()
+        self.readiness['strategic']['state'] = 'loading'
         try:
-            self.strategic = StrategicNavigator(self.config)
-            if self.strategic.is_ready():
-                self._log("✅ Strategic (VLM) ready")
-            else:
-                self._log("⚠️ Strategic (VLM) not available")
+            strategic = self._shared_strategic or StrategicNavigator(self.config)
+            self._warm_up('strategic', "Strategic (VLM)", strategic, started)
+            self.strategic = strategic
         except Exception as e:
+            self.readiness['strategic']['state'] = 'error'
             self._log(f"❌ Strategic load error: {e}")
             self.strategic = None
     
+    def _warm_up(self, name: str, label: str, component, started: float):
+        """Record load time, then warm a loaded component and record that too."""
+        entry = self.readiness[name]
+        entry['load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        if not component.is_ready():
+            entry['state'] = 'unavailable'
+            self._log(f"⚠️ {label} not available")
+            return
+        entry['warmup_ms'] = round(component.warmup(), 1)
+        entry['state'] = 'ready'
+        self._log(f"✅ {label} ready (load {entry['load_ms']:.0f} ms, warm-up {entry['warmup_ms']:.0f} ms)")
+    
     def _log(self, message: str):
         """Add entry to mission log"""
-        entry = f"🤖 {time.strftime('%H:%M:%S')} {message}"
-        self.mission_log.append(entry)
-        if len(self.mission_log) > 200:
-            self.mission_log.pop(0)
-        print(entry)
+        self.mission_log.log(f"🤖 {message}", source='ai')
+        log.info(message)
     
     def _tactical_loop(self):
         """Fast loop for object detection (30Hz target)"""
-        frame_count = 0
-        start_time = time.time()
-        
         while self._running:
             if not self._enabled:
                 time.sleep(0.1)
                 continue
             
-            frame_bytes = self.frame_buffer.get_raw_frame() # Get RAW
+            started = time.perf_counter()
+            frame_bytes, trace = self.frame_buffer.get_raw_frame_with_trace() # Get RAW
             if frame_bytes is None:
                 time.sleep(0.033)
                 continue
             
+            if trace.static and self._last_vision is not None:
+                # Scene unchanged: reuse the last vision result with the current
+                # range, which also keeps a tactical stop refreshed within its TTL
+                self.stats['static_frames_skipped'] += 1
+                range_cm = self.range_source() if self.range_source else None
+                self._handle_tactical(fuse_tactical(self._last_vision, range_cm, self.config), trace, None)
+                # Pace only: an idle iteration must not pull the load EMA down
+                time.sleep(self.governor.pace(started))
+                continue
+            
             # Decode for processing
             import cv2
             import numpy as np
-            nparr = np.frombuffer(frame_bytes, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            with span('decode'):
+                nparr = np.frombuffer(frame_bytes, np.uint8)
+                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             
             if img is None:
                 continue
-                
+            trace.mark('decode')
+            
+            result = None
             if self.tactical and self.tactical.is_ready():
-                result = self.tactical.detect(img)
-                
-                # Draw boxes
-                for det in result.detections:
-                    h, w = img.shape[:2]
-                    x1, y1, x2, y2 = det.bbox
-                    # Scale back to pixels
-                    p1 = (int(x1 * w), int(y1 * h))
-                    p2 = (int(x2 * w), int(y2 * h))
-                    
-                    color = (0, 0, 255) if "person" in det.class_name else (0, 255, 0)
-                    cv2.rectangle(img, p1, p2, color, 2)
-                    cv2.putText(img, f"{det.class_name} {det.confidence:.2f}", 
-                              (p1[0], p1[1]-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+                range_cm = self.range_source() if self.range_source else None
+                with span('detect'):
+                    self._last_vision = detect_tactical(self.tactical, self.corridor, self.tracked,
+                                                        img, range_cm, self.config, self.governor.quality)
+                    result = fuse_tactical(self._last_vision, range_cm, self.config)
+                trace.mark('detect')
+            
+            self._handle_tactical(result, trace, img)
+            # Sleep only what is left of this iteration's deadline
+            time.sleep(self.governor.sleep_time(started))
+    
+    def _remote_tactical_loop(self):
+        """Tactical results from the inference process (process mode)"""
+        last_seq = 0
+        while self._running:
+            if self.range_source:
+                self.pipeline.set_range(self.range_source())
+            
+            received = self.pipeline.wait_result(last_seq, timeout=0.1)
+            if received is None:
+                continue
+            last_seq, result, detect_time = received
+            if not self._enabled:
+                continue
+            
+            trace = self.frame_buffer.trace_for(result.frame_id)
+            if trace is None:
+                continue  # Frame already left the recent-trace window
+            trace.mark('detect', detect_time)
+            self._handle_tactical(result, trace, None)
+    
+    def _handle_tactical(self, result, trace, img):
+        """Record, arbitrate and publish one tactical result (result None = no detector)"""
+        if result is not None:
+            result.frame_id = trace.frame_id
+            if self._cold_start_ms is None:
+                self._cold_start_ms = round((time.perf_counter() - self._started_at) * 1000, 1)
+                self._log(f"⏱️ First detection {self._cold_start_ms:.0f} ms after start")
+            if self.recorder:
+                self.recorder.record_tactical(result)
 
-                # Safety logic...
-                if result.should_stop:
-                    cmd = RoverCommand.stop(
-                        priority=CommandPriority.TACTICAL,
-                        source="YOLO",
-                        reason=result.stop_reason or "Obstacle detected"
-                    )
-                    self.arbiter.submit(cmd)
+            # Safety logic...
+            if result.should_stop:
+                cmd = RoverCommand.stop(
+                    priority=CommandPriority.TACTICAL,
+                    source="YOLO",
+                    reason=result.stop_reason or "Obstacle detected"
+                )
+                cmd.trace = trace
+                self.arbiter.submit(cmd)  # Resubmit every frame to refresh the TTL
+                if not self._stopping:
                     self._log(f"🛑 TACTICAL STOP: {result.stop_reason}")
-                else:
-                    self.arbiter.clear(CommandPriority.TACTICAL)
+            else:
+                self.arbiter.clear(CommandPriority.TACTICAL)
+                if self._stopping:
+                    self._log("✅ TACTICAL CLEAR")
+            self._stopping = result.should_stop
 
-                frame_count += 1
-                self.stats['tactical_detections'] = len(result.detections)
+            self._frame_count += 1
+            self.stats['tactical_detections'] = len(result.detections)
 
-            # Update FrameBuffer with ANNOTATED frame for display
-            _, jpeg = cv2.imencode('.jpg', img)
-            self.frame_buffer.set_display_frame(jpeg.tobytes())
-            
-            # Update FPS every second
-            elapsed = time.time() - start_time
-            if elapsed >= 1.0:
-                self.stats['tactical_fps'] = frame_count / elapsed
-                frame_count = 0
-                start_time = time.time()
-            
-            time.sleep(0.033)
+        # Overlays are drawn by the compositor, only while someone watches
+        self.compositor.publish(result, trace.frame_id, img)
+        
+        # Update FPS every second
+        elapsed = time.time() - self._fps_start
+        if elapsed >= 1.0:
+            self.stats['tactical_fps'] = self._frame_count / elapsed
+            self._frame_count = 0
+            self._fps_start = time.time()
     
     def _strategic_loop(self):
         """Slow loop for VLM navigation (0.5Hz)"""
@@ -167,11 +345,12 @@ class AIWorker:
                 time.sleep(1.0)
                 continue
             
-            if not self.strategic.can_run():
+            if not self.strategic.can_run() or self._operator_driving():
                 time.sleep(0.5)
                 continue
             
-            frame = self.frame_buffer.get_frame()
+            # Raw frame: the display frame is only refreshed while someone watches
+            frame, trace = self.frame_buffer.get_raw_frame_with_trace()
             if frame is None:
                 time.sleep(0.5)
                 continue
@@ -182,9 +361,15 @@ class AIWorker:
                 continue
             
             # Run VLM analysis
-            result = self.strategic.analyze(vlm_input)
+            with span('vlm_request'):
+                result = self.strategic.analyze(vlm_input)
             if result is None:
                 continue
+            if trace is not None:
+                result.frame_id = trace.frame_id
+                trace.mark('vlm')
+            if self.recorder:
+                self.recorder.record_vlm(result)
             
             self.stats['strategic_last_run'] = time.time()
             self.stats['strategic_decisions'] += 1
@@ -215,7 +400,9 @@ class AIWorker:
                     speed=0.3
                 )
             
-            self.arbiter.submit(cmd)
+            cmd.trace = trace
+            if not self._operator_driving():  # Operator took over during the request
+                self.arbiter.submit(cmd)
             
             time.sleep(0.5)  # Check cooldown every 500ms
     
@@ -225,17 +412,20 @@ class AIWorker:
             return
         
         self._running = True
+        self._started_at = time.perf_counter()
         
         # Load models in background
         loader = threading.Thread(target=self._load_models, daemon=True)
         loader.start()
         
         # Start worker threads
-        self._tactical_thread = threading.Thread(target=self._tactical_loop, daemon=True)
+        tactical_loop = self._remote_tactical_loop if self.pipeline else self._tactical_loop
+        self._tactical_thread = threading.Thread(target=tactical_loop, daemon=True)
         self._strategic_thread = threading.Thread(target=self._strategic_loop, daemon=True)
         
         self._tactical_thread.start()
         self._strategic_thread.start()
+        self.compositor.start()
         
         self.frame_buffer.set_active_ai(True)
         self._log("🚀 AI Worker started")
@@ -243,9 +433,34 @@ class AIWorker:
     def stop(self):
         """Stop AI worker threads"""
         self._running = False
+        self.compositor.stop()
         self.frame_buffer.set_active_ai(False)
         self._log("🛑 AI Worker stopped")
     
+    def manual_command(self, command: str) -> bool:
+        """
+        Submit an operator button press through the arbiter, so the
+        dispatcher keepalive repeats it instead of a held AI command.
+        VLM steering is cleared and yields for manual_override_s; tactical
+        stops still win.
+        
+        Args:
+            command: 'F', 'B', 'L', 'R' or 'S'
+        
+        Returns:
+            False if the command is not a drive command
+        """
+        cmd = RoverCommand.manual(command, ttl=self.config.manual_command_ttl)
+        if cmd is None:
+            return False
+        self._operator_until = time.monotonic() + self.config.manual_override_s
+        self.arbiter.clear(CommandPriority.STRATEGIC)
+        self.arbiter.submit(cmd)
+        return True
+    
+    def _operator_driving(self) -> bool:
+        return time.monotonic() < self._operator_until
+    
     def enable(self):
         """Enable AI processing"""
         self._enabled = True
@@ -264,14 +479,44 @@ class AIWorker:
         """Check if AI is enabled"""
         return self._enabled
     
+    def get_readiness(self) -> dict:
+        """
+        Per-model load/warm-up times for the health endpoint.
+        
+        Returns:
+            {'ready': all models settled, 'components': {...},
+             'cold_start_ms': start() to first tactical result}
+        """
+        components = {name: dict(entry) for name, entry in self.readiness.items()}
+        if self.pipeline:
+            infer = self.pipeline.get_status().get('infer', {})
+            components['tactical'] = {
+                'state': infer.get('state', 'loading'),
+                'load_ms': infer.get('load_ms'),
+                'warmup_ms': infer.get('warmup_ms'),
+            }
+        return {
+            'ready': all(c['state'] not in ('pending', 'loading') for c in components.values()),
+            'components': components,
+            'cold_start_ms': self._cold_start_ms,
+        }
+    
     def get_status(self) -> dict:
         """Get AI status for API"""
         return {
             'enabled': self._enabled,
             'running': self._running,
-            'tactical_ready': self.tactical.is_ready() if self.tactical else False,
+            'tactical_ready': (self.pipeline.tactical_ready() if self.pipeline else
+                               self.tactical.is_ready() if self.tactical else False),
+            'pipeline': self.pipeline.get_status() if self.pipeline else None,
             'strategic_ready': self.strategic.is_ready() if self.strategic else False,
             'tactical_fps': round(self.stats['tactical_fps'], 1),
+            'tracker': self.tracked.stats if self.tracked else None,
+            'corridor': self.corridor.stats if self.corridor else None,
+            'compositor': self.compositor.get_status(),
+            'governor': self.pipeline.get_status().get('infer', {}).get('governor') if self.pipeline
+                        else self.governor.get_status(),
+            'readiness': self.get_readiness(),
             'strategic_cooldown': round(
                 self.strategic.get_cooldown_remaining(), 1
             ) if self.strategic else 0,
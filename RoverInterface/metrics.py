@@ -0,0 +1,168 @@
+# metrics.py
+"""
+Hot-path latency metrics for Rescue Rover
+
+Each pipeline stage (receive, decode, detect, draw, encode, VLM request,
+dispatch, serial write) records its duration into a log-linear histogram
+in the style of HdrHistogram: values are bucketed with ~1.5% relative
+precision from 1us to ~71 min in a fixed array, so recording is O(1), never
+allocates and takes no lock. Each stage has a single writer thread in
+practice; under the GIL a plain list increment is safe for that.
+
+Quantiles are computed on read and exported in Prometheus text format by
+`/api/metrics`.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# 128 exact buckets below 128us, then 64 linear sub-buckets per power of
+# two -> worst case 1/64 relative error
+_SUB_BUCKET_BITS = 7
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_HALF = _SUB_BUCKETS // 2
+_MAX_EXPONENT = 25  # values up to 2^32us (~71 minutes)
+_BUCKET_COUNT = _SUB_BUCKETS + _MAX_EXPONENT * _HALF
+
+
+def _bucket_index(value_us: int) -> int:
+    """Map a microsecond value to its bucket."""
+    if value_us < _SUB_BUCKETS:
+        return max(value_us, 0)
+    exponent = value_us.bit_length() - _SUB_BUCKET_BITS
+    if exponent > _MAX_EXPONENT:
+        return _BUCKET_COUNT - 1
+    return _SUB_BUCKETS + (exponent - 1) * _HALF + (value_us >> exponent) - _HALF
+
+
+def _bucket_value(index: int) -> int:
+    """Representative (upper-bound) microsecond value of a bucket."""
+    if index < _SUB_BUCKETS:
+        return index
+    exponent, sub = divmod(index - _SUB_BUCKETS, _HALF)
+    exponent += 1
+    return ((sub + _HALF + 1) << exponent) - 1
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear histogram of durations."""
+
+    def __init__(self):
+        self._counts: List[int] = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float):
+        """Record one duration."""
+        value_us = int(seconds * 1_000_000)
+        self._counts[_bucket_index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def quantiles(self, qs=(0.5, 0.95, 0.99)) -> Dict[float, float]:
+        """Quantiles in seconds (0.0 when empty)."""
+        counts = list(self._counts)
+        total = sum(counts)
+        result = {q: 0.0 for q in qs}
+        if total == 0:
+            return result
+
+        targets = sorted((max(1, int(q * total + 0.5)), q) for q in qs)
+        seen = 0
+        t = 0
+        for index, c in enumerate(counts):
+            if not c:
+                continue
+            seen += c
+            while t < len(targets) and seen >= targets[t][0]:
+                result[targets[t][1]] = min(_bucket_value(index), self.max_us) / 1_000_000
+                t += 1
+            if t == len(targets):
+                break
+        return result
+
+    def reset(self):
+        """Drop all samples."""
+        self._counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+
+class MetricsRegistry:
+    """Per-stage latency histograms."""
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        """Get (or create) the histogram for a stage."""
+        hist = self._histograms.get(stage)
+        if hist is None:
+            hist = self._histograms.setdefault(stage, LatencyHistogram())
+        return hist
+
+    def record(self, stage: str, seconds: float):
+        """Record a duration measured elsewhere."""
+        self.histogram(stage).record(seconds)
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time the enclosed block: `with span('decode'): ...`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(stage).record(time.perf_counter() - start)
+
+    def snapshot(self, stage: Optional[str] = None) -> dict:
+        """Summary per stage in milliseconds (for JSON APIs)."""
+        # copy(): another thread may be registering a new stage
+        stages = [stage] if stage else sorted(self._histograms.copy())
+        summary = {}
+        for name in stages:
+            hist = self._histograms.get(name)
+            if hist is None:
+                continue
+            q = hist.quantiles(self.QUANTILES)
+            summary[name] = {
+                'count': hist.count,
+                'p50_ms': round(q[0.5] * 1000, 3),
+                'p95_ms': round(q[0.95] * 1000, 3),
+                'p99_ms': round(q[0.99] * 1000, 3),
+                'max_ms': round(hist.max_us / 1000, 3),
+            }
+        return summary
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (summary per stage)."""
+        name = "rover_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Hot-path stage latency",
+            f"# TYPE {name} summary",
+        ]
+        histograms = self._histograms.copy()
+        for stage in sorted(histograms):
+            hist = histograms[stage]
+            for q, value in hist.quantiles(self.QUANTILES).items():
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {hist.total_us / 1_000_000:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Drop all samples."""
+        for hist in self._histograms.values():
+            hist.reset()
+
+
+# Process-wide registry used by all components
+METRICS = MetricsRegistry()
+span = METRICS.span
+record = METRICS.record
@@ -0,0 +1,132 @@
+# mission_log.py
+"""
+Mission Log for Rescue Rover
+
+Fixed-capacity ring buffer of structured log records shared by the API,
+the AI worker and the evidence service. Every record gets a monotonically
+increasing id so clients can poll with a `since` cursor and only receive
+new entries. Records can optionally be spilled to an append-only JSONL
+file so nothing is lost when the ring wraps.
+"""
+
+import json
+import time
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+
+@dataclass
+class LogRecord:
+    """Single mission log entry"""
+    id: int
+    timestamp: float
+    source: str
+    message: str
+    data: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        """Serialize for API / JSONL output"""
+        record = asdict(self)
+        record['time'] = time.strftime('%H:%M:%S', time.localtime(self.timestamp))
+        return record
+
+
+class MissionLog:
+    """
+    Thread-safe ring buffer of LogRecords.
+    Appends are O(1); the oldest record is overwritten once full.
+    """
+
+    def __init__(self, capacity: int = 500, spill_path: Optional[str] = None):
+        """
+        Initialize MissionLog.
+
+        Args:
+            capacity: Number of records kept in memory
+            spill_path: Optional JSONL file every record is appended to
+        """
+        self._capacity = capacity
+        self._records: List[Optional[LogRecord]] = [None] * capacity
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+        self._spill_file = open(spill_path, 'a', encoding='utf-8') if spill_path else None
+
+    def log(self, message: str, source: str = 'system', **data) -> LogRecord:
+        """
+        Append a record.
+
+        Args:
+            message: Human readable log line
+            source: Component that produced the entry (api, ai, evidence, ...)
+            **data: Extra structured fields
+
+        Returns:
+            The stored LogRecord
+        """
+        with self._lock:
+            record = LogRecord(
+                id=self._next_id,
+                timestamp=time.time(),
+                source=source,
+                message=message,
+                data=data
+            )
+            self._records[record.id % self._capacity] = record
+            self._next_id += 1
+
+            if self._spill_file:
+                self._spill_file.write(json.dumps(record.to_dict()) + '\n')
+                self._spill_file.flush()
+
+        return record
+
+    def append(self, entry) -> LogRecord:
+        """List-style append kept for callers that log plain strings or dicts."""
+        if isinstance(entry, dict):
+            data = dict(entry)
+            message = str(data.pop('message', '') or data.get('command', ''))
+            return self.log(message, source=data.pop('source', 'system'), **data)
+        return self.log(str(entry))
+
+    def since(self, last_id: int = 0, limit: int = 100) -> List[LogRecord]:
+        """
+        Get records newer than a cursor, oldest first.
+
+        Args:
+            last_id: Id of the last record the client has seen (0 = from start)
+            limit: Maximum number of records to return
+
+        Returns:
+            Up to `limit` records with id > last_id still held in the ring
+        """
+        with self._lock:
+            newest = self._next_id - 1
+            oldest = max(1, newest - self._capacity + 1)
+            start = max(last_id + 1, oldest)
+            end = min(newest, start + limit - 1)
+            return [self._records[i % self._capacity] for i in range(start, end + 1)]
+
+    def tail(self, count: int = 100) -> List[LogRecord]:
+        """Get the most recent `count` records, oldest first."""
+        with self._lock:
+            last_id = max(0, self._next_id - 1 - count)
+        return self.since(last_id, count)
+
+    @property
+    def last_id(self) -> int:
+        """Id of the newest record (0 if empty)."""
+        with self._lock:
+            return self._next_id - 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return min(self._next_id - 1, self._capacity)
+
+    def close(self):
+        """Close the spill file if one is open."""
+        with self._lock:
+            if self._spill_file:
+                self._spill_file.close()
+                self._spill_file = None
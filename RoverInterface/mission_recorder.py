@@ -0,0 +1,396 @@
+# mission_recorder.py
+"""
+Mission Recorder for Rescue Rover
+
+Records everything needed to scrub and replay a run: raw JPEG frames,
+telemetry, tactical detections, VLM decisions and arbiter commands.
+
+On disk (one directory per mission):
+    seg-000000.log, seg-000001.log, ...   append-only record segments
+    index.bin                             fixed-size index entries
+
+Segment record:  <magic 'RR'><kind u8><pad><frame_id u32><timestamp f64><length u32><payload>
+Index entry:     <timestamp f64><frame_id u32><segment u16><kind u8><pad><offset u64><length u32>
+
+Frames are stored as raw JPEG bytes, everything else as compact JSON.
+Producers only enqueue; a background thread batches records into one
+write per flush interval so the ingest loop never waits on disk.
+MissionReader maps segments and the index with mmap, so a mission can be
+scrubbed with random access (by time or frame id) without loading it.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, is_dataclass
+from enum import Enum
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from rover_log import get_logger
+
+log = get_logger("recorder")
+
+# Record kinds
+FRAME = 1
+TELEMETRY = 2
+TACTICAL = 3
+VLM = 4
+COMMAND = 5
+KIND_NAMES = {FRAME: 'frame', TELEMETRY: 'telemetry', TACTICAL: 'tactical', VLM: 'vlm', COMMAND: 'command'}
+
+RECORD_HEADER = struct.Struct('<2sBxIdI')
+INDEX_ENTRY = struct.Struct('<dIHBxQI')
+MAGIC = b'RR'
+INDEX_FILE = 'index.bin'
+
+
+def _segment_name(segment: int) -> str:
+    return f"seg-{segment:06d}.log"
+
+
+def _to_jsonable(obj):
+    """Dataclasses/enums (TacticalResult, RoverCommand, ...) to plain JSON types."""
+    if is_dataclass(obj):
+        obj = asdict(obj)
+    if isinstance(obj, dict):
+        return {k: _to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_jsonable(v) for v in obj]
+    if isinstance(obj, Enum):
+        return obj.name if isinstance(obj.value, int) else obj.value
+    return obj
+
+
+class MissionRecorder:
+    """
+    Batched, append-only writer for mission data.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024,
+                 flush_interval: float = 0.2, max_pending: int = 512,
+                 telemetry_source: Optional[Callable[[], dict]] = None,
+                 telemetry_interval: float = 0.5):
+        """
+        Initialize recorder.
+
+        Args:
+            directory: Mission directory (created if missing)
+            segment_bytes: Roll to a new segment after this many bytes
+            flush_interval: Seconds between batched writes
+            max_pending: Queued records before new frames are dropped
+            telemetry_source: Optional callable sampled every telemetry_interval
+            telemetry_interval: Seconds between telemetry samples
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._segment_bytes = segment_bytes
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._telemetry_source = telemetry_source
+        self._telemetry_interval = telemetry_interval
+
+        self._pending: deque = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Continue after existing segments (restart into the same directory)
+        existing = sorted(n for n in os.listdir(directory) if n.startswith('seg-'))
+        self._segment = int(existing[-1][4:10]) if existing else 0
+        self._segment_file = open(os.path.join(directory, _segment_name(self._segment)), 'ab')
+        self._segment_offset = self._segment_file.tell()
+        self._index_file = open(os.path.join(directory, INDEX_FILE), 'ab')
+
+        self.stats = {'records': 0, 'frames': 0, 'bytes': 0, 'dropped': 0, 'batches': 0}
+
+    # ------------------------
+    # Producers (cheap, non-blocking)
+    # ------------------------
+
+    def _enqueue(self, kind: int, payload: bytes, frame_id: int = 0, timestamp: float = None):
+        with self._cond:
+            if kind == FRAME and len(self._pending) >= self._max_pending:
+                self.stats['dropped'] += 1
+                return
+            self._pending.append((kind, frame_id or 0, timestamp or time.time(), payload))
+
+    def record_frame(self, jpeg_bytes: bytes, frame_id: int = 0, timestamp: float = None):
+        """Queue a raw JPEG frame."""
+        self._enqueue(FRAME, jpeg_bytes, frame_id, timestamp)
+
+    def record_event(self, kind: int, data, frame_id: int = 0, timestamp: float = None):
+        """Queue a JSON event (dict or dataclass)."""
+        payload = json.dumps(_to_jsonable(data), separators=(',', ':'), default=str).encode('utf-8')
+        self._enqueue(kind, payload, frame_id, timestamp)
+
+    def record_telemetry(self, telemetry: dict):
+        self.record_event(TELEMETRY, telemetry)
+
+    def record_tactical(self, result):
+        """Queue a TacticalResult."""
+        self.record_event(TACTICAL, result, frame_id=getattr(result, 'frame_id', None) or 0)
+
+    def record_vlm(self, result):
+        """Queue a StrategicResult."""
+        self.record_event(VLM, result, frame_id=getattr(result, 'frame_id', None) or 0)
+
+    def record_command(self, command):
+        """Queue an arbiter RoverCommand (trace is reduced to its frame id)."""
+        trace = getattr(command, 'trace', None)
+        frame_id = trace.frame_id if trace is not None else 0
+        data = {
+            'priority': command.priority.name,
+            'x': command.x,
+            'y': command.y,
+            'source': command.source,
+            'reason': command.reason,
+        }
+        self.record_event(COMMAND, data, frame_id=frame_id, timestamp=command.timestamp)
+
+    def frame_listener(self, jpeg_bytes: bytes, trace):
+        """FrameBuffer listener: record every published frame."""
+        self.record_frame(jpeg_bytes, frame_id=trace.frame_id if trace else 0)
+
+    # ------------------------
+    # Writer thread
+    # ------------------------
+
+    def _write_batch(self, batch: List[Tuple[int, int, float, bytes]]):
+        """Append a batch with one write per segment file and one to the index."""
+        chunks = []
+        pending = 0  # Bytes in chunks
+        index = []
+        for kind, frame_id, timestamp, payload in batch:
+            size = RECORD_HEADER.size + len(payload)
+            if self._segment_offset + pending + size > self._segment_bytes and \
+                    (chunks or self._segment_offset):
+                self._flush_chunks(chunks)
+                chunks, pending = [], 0
+                self._roll_segment()
+            offset = self._segment_offset + pending
+            chunks.append(RECORD_HEADER.pack(MAGIC, kind, frame_id & 0xFFFFFFFF, timestamp, len(payload)) + payload)
+            pending += size
+            index.append(INDEX_ENTRY.pack(timestamp, frame_id & 0xFFFFFFFF, self._segment, kind,
+                                          offset + RECORD_HEADER.size, len(payload)))
+            self.stats['records'] += 1
+            if kind == FRAME:
+                self.stats['frames'] += 1
+
+        self._flush_chunks(chunks)
+        # Index written after the data it points to, so readers never see dangling entries
+        self._index_file.write(b''.join(index))
+        self._index_file.flush()
+        self.stats['batches'] += 1
+
+    def _flush_chunks(self, chunks: List[bytes]):
+        if not chunks:
+            return
+        data = b''.join(chunks)
+        self._segment_file.write(data)
+        self._segment_file.flush()
+        self._segment_offset += len(data)
+        self.stats['bytes'] += len(data)
+
+    def _roll_segment(self):
+        self._segment_file.close()
+        self._segment += 1
+        self._segment_file = open(os.path.join(self.directory, _segment_name(self._segment)), 'ab')
+        self._segment_offset = 0
+
+    def _writer_loop(self):
+        next_telemetry = time.monotonic()
+        while True:
+            with self._cond:
+                if self._running:
+                    self._cond.wait(self._flush_interval)
+                batch = list(self._pending)
+                self._pending.clear()
+                running = self._running
+
+            if self._telemetry_source and time.monotonic() >= next_telemetry:
+                next_telemetry = time.monotonic() + self._telemetry_interval
+                try:
+                    self.record_telemetry(self._telemetry_source())
+                except Exception as e:
+                    log.warning(f"Telemetry sample failed: {e}", extra={'sample': 'recorder.telemetry'})
+
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except OSError as e:
+                    log.error(f"❌ Recorder write failed: {e}", extra={'sample': 'recorder.write'})
+            if not running:
+                break
+
+    def start(self):
+        """Start the background writer."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True, name="MissionRecorder")
+        self._thread.start()
+        log.info(f"⏺️ Recording mission to {self.directory}")
+
+    def stop(self):
+        """Flush pending records and close files."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._segment_file.close()
+        self._index_file.close()
+
+    def get_status(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        return {'directory': self.directory, 'segment': self._segment, 'pending': pending, **self.stats}
+
+
+class IndexEntry:
+    """One decoded index entry (view over the mmapped index)."""
+    __slots__ = ('timestamp', 'frame_id', 'segment', 'kind', 'offset', 'length')
+
+    def __init__(self, timestamp, frame_id, segment, kind, offset, length):
+        self.timestamp = timestamp
+        self.frame_id = frame_id
+        self.segment = segment
+        self.kind = kind
+        self.offset = offset
+        self.length = length
+
+
+class MissionReader:
+    """
+    Random-access reader over a recorded mission using mmap.
+    Only the index entries and the payloads actually touched are paged in.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._maps = {}
+        self._files = {}
+        self._index_file = open(os.path.join(directory, INDEX_FILE), 'rb')
+        self._index = b''
+        self._count = 0
+
+        # Timestamps of frame entries for bisecting by time
+        self._frame_positions: List[int] = []
+        self._frame_times: List[float] = []
+        self._frame_ids = {}
+        self.refresh()
+
+    def refresh(self) -> int:
+        """
+        Pick up entries appended since the last refresh (live missions).
+
+        Returns:
+            Number of new index entries
+        """
+        size = os.fstat(self._index_file.fileno()).st_size
+        count = size // INDEX_ENTRY.size
+        if count == self._count:
+            return 0
+        if isinstance(self._index, mmap.mmap):
+            self._index.close()
+        self._index = mmap.mmap(self._index_file.fileno(), count * INDEX_ENTRY.size, access=mmap.ACCESS_READ)
+
+        first = self._count
+        self._count = count
+        for position in range(first, count):
+            entry = self.entry(position)
+            if entry.kind == FRAME:
+                self._frame_positions.append(position)
+                self._frame_times.append(entry.timestamp)
+                self._frame_ids[entry.frame_id] = position
+        return count - first
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def frame_count(self) -> int:
+        return len(self._frame_positions)
+
+    def entry(self, position: int) -> IndexEntry:
+        """Decode the index entry at a position."""
+        return IndexEntry(*INDEX_ENTRY.unpack_from(self._index, position * INDEX_ENTRY.size))
+
+    def _segment_map(self, segment: int) -> mmap.mmap:
+        seg_map = self._maps.get(segment)
+        if seg_map is None:
+            f = open(os.path.join(self.directory, _segment_name(segment)), 'rb')
+            self._files[segment] = f
+            seg_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = seg_map
+        return seg_map
+
+    def payload(self, entry: IndexEntry) -> memoryview:
+        """Zero-copy view of a record payload."""
+        seg_map = self._segment_map(entry.segment)
+        if entry.offset + entry.length > len(seg_map):
+            # Segment still being written: remap to its current size
+            seg_map.close()
+            del self._maps[entry.segment]
+            self._files.pop(entry.segment).close()
+            seg_map = self._segment_map(entry.segment)
+        return memoryview(seg_map)[entry.offset:entry.offset + entry.length]
+
+    def read(self, entry: IndexEntry):
+        """Payload as bytes (frames) or decoded JSON (events)."""
+        data = self.payload(entry)
+        if entry.kind == FRAME:
+            return bytes(data)
+        return json.loads(bytes(data))
+
+    def entries(self, kind: Optional[int] = None, start: float = None, end: float = None) -> Iterator[IndexEntry]:
+        """Iterate index entries, optionally filtered by kind and time range."""
+        for position in range(self._count):
+            entry = self.entry(position)
+            if kind is not None and entry.kind != kind:
+                continue
+            if start is not None and entry.timestamp < start:
+                continue
+            if end is not None and entry.timestamp > end:
+                continue
+            yield entry
+
+    def frame_at(self, timestamp: float) -> Optional[IndexEntry]:
+        """Latest frame at or before a wall-clock time."""
+        i = bisect.bisect_right(self._frame_times, timestamp) - 1
+        if i < 0:
+            return None
+        return self.entry(self._frame_positions[i])
+
+    def frame_by_id(self, frame_id: int) -> Optional[IndexEntry]:
+        position = self._frame_ids.get(frame_id)
+        return self.entry(position) if position is not None else None
+
+    def frame(self, n: int) -> IndexEntry:
+        """n-th frame of the mission."""
+        return self.entry(self._frame_positions[n])
+
+    def iter_frames(self) -> Iterator[Tuple[bytes, float]]:
+        """(jpeg_bytes, timestamp) for every frame in order."""
+        for position in self._frame_positions:
+            entry = self.entry(position)
+            yield bytes(self.payload(entry)), entry.timestamp
+
+    def close(self):
+        for seg_map in self._maps.values():
+            seg_map.close()
+        for f in self._files.values():
+            f.close()
+        if isinstance(self._index, mmap.mmap):
+            self._index.close()
+        self._index_file.close()
+
+
+def is_mission_directory(path: str) -> bool:
+    """True if `path` holds a recorded mission."""
+    return os.path.isfile(os.path.join(path, INDEX_FILE))
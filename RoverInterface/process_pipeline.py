@@ -0,0 +1,377 @@
+# process_pipeline.py
+"""
+Process Mode for Rescue Rover
+
+Moves the hot path out of the API process so FastAPI/NiceGUI, video
+serving and inference stop competing for one GIL:
+
+    ingest process      FrameBuffer receiver -> JPEG ring, cv2 decode -> decoded ring
+    inference process   decoded ring -> tactical stack (ROI/fusion/tracker) -> result ring
+    API process         RingFrameBuffer (JPEG ring), AIWorker arbitration,
+                        strategic VLM loop, compositor, serial
+
+All frame traffic goes through SharedFrameRing blocks (no pickling).
+Small JSON messages (results, range, status) use rings of their own.
+Workers are started with `python -m process_pipeline <role>` rather than
+multiprocessing spawn, which would re-run app.py's module-level setup in
+every child; they exit when the API process goes away.
+
+perf_counter() is a system-wide monotonic clock on Linux and macOS, so
+frame traces stay comparable across the processes.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Optional, Tuple
+
+from ai import AIConfig
+from ai.tactical_detector import Detection, TacticalResult
+from camera_reassembler import FrameBuffer
+from rover_log import get_logger
+from shm_ring import FLAG_STATIC, SharedFrameRing
+from tracer import FrameTrace
+
+log = get_logger("process")
+
+
+def result_to_bytes(result: TacticalResult, detect_time: float) -> bytes:
+    return json.dumps({'result': asdict(result), 'detect_time': detect_time},
+                      separators=(',', ':')).encode('utf-8')
+
+
+def result_from_bytes(data: bytes) -> Tuple[TacticalResult, float]:
+    message = json.loads(data)
+    fields = message['result']
+    fields['detections'] = [
+        Detection(**{**det, 'bbox': tuple(det['bbox'])}) for det in fields['detections']
+    ]
+    return TacticalResult(**fields), message['detect_time']
+
+
+def _read_json(ring: SharedFrameRing, after: int) -> Tuple[int, Optional[dict]]:
+    frame = ring.read_latest(after)
+    if frame is None:
+        return after, None
+    return frame.seq, json.loads(frame.data)
+
+
+class RingFrameBuffer(FrameBuffer):
+    """
+    FrameBuffer fed from the ingest process' JPEG ring.
+    Same interface as FrameBuffer; frames keep the ingest frame ids and
+    the static mark of the ingest change gate.
+    """
+
+    def __init__(self, jpeg_ring: SharedFrameRing, status_ring: SharedFrameRing,
+                 trace_window: int = 64, jitter_buffer: bool = False):
+        """
+        Initialize relay buffer.
+
+        Args:
+            jpeg_ring: Ring the ingest process writes JPEG frames into
+            status_ring: Ring carrying ingest telemetry (state, fps) as JSON
+            trace_window: Recent FrameTraces kept for results that arrive later
+            jitter_buffer: Pace display frames (see FrameBuffer)
+        """
+        super().__init__(mode='relay', jitter_buffer=jitter_buffer)
+        self._jpeg_ring = jpeg_ring
+        self._status_ring = status_ring
+        self._traces: OrderedDict = OrderedDict()
+        self._trace_window = trace_window
+        self._traces_lock = threading.Lock()
+        self._link_status: dict = {}
+        self._follow = True
+        self._follower = threading.Thread(target=self._follow_loop, daemon=True, name="RingFollower")
+        self._follower.start()
+
+    def _follow_loop(self):
+        last_seq = 0
+        last_status = 0
+        while self._follow:
+            frame = self._jpeg_ring.wait(last_seq, timeout=0.1)
+            if frame is not None:
+                last_seq = frame.seq
+                trace = self.feed_frame(frame.data, capture_time=frame.timestamp, frame_id=frame.frame_id,
+                                        static=bool(frame.flags & FLAG_STATIC))
+                with self._traces_lock:
+                    self._traces[trace.frame_id] = trace
+                    while len(self._traces) > self._trace_window:
+                        self._traces.popitem(last=False)
+
+            last_status, status = _read_json(self._status_ring, last_status)
+            if status:
+                # fps/state come from the receiver itself, not from this relay
+                self.update_telemetry({k: status[k] for k in ('state', 'fps', 'link_quality') if k in status})
+                self._link_status = status.get('link', self._link_status)
+
+    def _update_fps(self):
+        pass  # Reported by the ingest process
+
+    def get_link_status(self) -> dict:
+        return self._link_status  # Measured by the ingest process' receiver
+
+    def trace_for(self, frame_id: int) -> Optional[FrameTrace]:
+        """FrameTrace of a recently relayed frame."""
+        with self._traces_lock:
+            return self._traces.get(frame_id)
+
+    def stop(self):
+        super().stop()
+        self._follow = False
+        if self._follower is not threading.current_thread():
+            self._follower.join(timeout=1.0)
+
+
+class ProcessPipeline:
+    """
+    Owns the shared-memory rings and the ingest/inference worker processes.
+    """
+
+    def __init__(self, source: dict, config: AIConfig = None, slots: int = 4,
+                 jpeg_slot_bytes: int = 1024 * 1024, max_frame_shape=(720, 1280, 3),
+                 jitter_buffer: bool = False):
+        """
+        Initialize pipeline (rings are allocated now, processes on start()).
+
+        Args:
+            source: FrameBuffer keyword arguments for the ingest process,
+                e.g. {'mode': 'http', 'http_url': ...}
+            config: AI configuration for the inference process
+            slots: Frames kept per ring
+            jpeg_slot_bytes: Largest JPEG accepted
+            max_frame_shape: Largest decoded frame (H, W, C) accepted
+            jitter_buffer: Pace display frames in the API process
+        """
+        self.source = source
+        self.config = config or AIConfig()
+        h, w, c = max_frame_shape
+        self.rings = {
+            'jpeg': SharedFrameRing.create(slots, jpeg_slot_bytes),
+            'decoded': SharedFrameRing.create(slots, h * w * c),
+            'results': SharedFrameRing.create(16, 64 * 1024),
+            'control': SharedFrameRing.create(4, 1024),
+            'ingest_status': SharedFrameRing.create(4, 4096),
+            'infer_status': SharedFrameRing.create(4, 16 * 1024),
+        }
+        self.frame_buffer = RingFrameBuffer(self.rings['jpeg'], self.rings['ingest_status'],
+                                            jitter_buffer=jitter_buffer)
+        self._processes = {}
+        self._status = {'ingest': {}, 'infer': {}}
+        self._status_seq = {'ingest': 0, 'infer': 0}
+        self._last_range = object()
+
+    def _spawn(self, role: str, *extra: str) -> subprocess.Popen:
+        cmd = [sys.executable, '-m', 'process_pipeline', role, '--parent', str(os.getpid()), *extra]
+        return subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    def start(self):
+        """Launch the ingest and inference processes."""
+        if self._processes:
+            return
+        r = {name: ring.name for name, ring in self.rings.items()}
+        self._processes['ingest'] = self._spawn(
+            'ingest', '--source', json.dumps(self.source),
+            '--jpeg', r['jpeg'], '--decoded', r['decoded'], '--status', r['ingest_status'])
+        self._processes['infer'] = self._spawn(
+            'infer', '--config', json.dumps(asdict(self.config)),
+            '--decoded', r['decoded'], '--results', r['results'],
+            '--control', r['control'], '--status', r['infer_status'])
+        log.info(f"🔀 Process mode: ingest pid {self._processes['ingest'].pid}, "
+                 f"inference pid {self._processes['infer'].pid}")
+
+    def set_range(self, range_cm: Optional[float]):
+        """Forward the ultrasonic range to the inference process (on change)."""
+        if range_cm != self._last_range:
+            self._last_range = range_cm
+            self.rings['control'].write(json.dumps({'range_cm': range_cm}).encode('utf-8'))
+
+    def wait_result(self, after: int, timeout: float = 0.1) -> Optional[Tuple[int, TacticalResult, float]]:
+        """
+        Next tactical result newer than `after`.
+
+        Returns:
+            (seq, result, detect_time) or None on timeout
+        """
+        frame = self.rings['results'].wait(after, timeout=timeout)
+        if frame is None:
+            return None
+        result, detect_time = result_from_bytes(frame.data)
+        return frame.seq, result, detect_time
+
+    def _refresh_status(self):
+        for role in ('ingest', 'infer'):
+            seq, status = _read_json(self.rings[f'{role}_status'], self._status_seq[role])
+            if status is not None:
+                self._status_seq[role], self._status[role] = seq, status
+
+    def tactical_ready(self) -> bool:
+        self._refresh_status()
+        return bool(self._status['infer'].get('ready'))
+
+    def get_status(self) -> dict:
+        self._refresh_status()
+        return {
+            role: {
+                'pid': proc.pid,
+                'alive': proc.poll() is None,
+                **self._status.get(role, {})
+            }
+            for role, proc in self._processes.items()
+        }
+
+    def stop(self):
+        """Stop workers and release the shared memory."""
+        for proc in self._processes.values():
+            proc.terminate()
+        for proc in self._processes.values():
+            try:
+                proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self._processes = {}
+        self.frame_buffer.stop()  # Joins the follower before the rings go away
+        for ring in self.rings.values():
+            ring.close()
+            ring.unlink()
+
+
+# ------------------------
+# Worker processes
+# ------------------------
+
+def _parent_alive(parent: int) -> bool:
+    return os.getppid() == parent
+
+
+def ingest_main(args):
+    """Receive frames, publish JPEG + decoded frames."""
+    import cv2
+    import numpy as np
+    from metrics import span
+
+    jpeg_ring = SharedFrameRing.attach(args.jpeg)
+    decoded_ring = SharedFrameRing.attach(args.decoded)
+    status_ring = SharedFrameRing.attach(args.status)
+
+    def on_frame(jpeg_bytes, trace):
+        try:
+            jpeg_ring.write(jpeg_bytes, trace.frame_id, trace.capture_time,
+                            flags=FLAG_STATIC if trace.static else 0)
+            if trace.static:
+                return  # Nothing new for inference; forced refreshes keep it fed
+            with span('decode'):
+                img = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if img is not None:
+                decoded_ring.write(img, trace.frame_id, trace.capture_time)
+        except ValueError as e:
+            log.warning(f"⚠️ Frame dropped: {e}", extra={'sample': 'process.oversize'})
+
+    frame_buffer = FrameBuffer(**json.loads(args.source))
+    frame_buffer.add_frame_listener(on_frame)
+
+    while _parent_alive(args.parent):
+        status = {**frame_buffer.get_telemetry(), 'link': frame_buffer.get_link_status()}
+        status_ring.write(json.dumps(status).encode('utf-8'))
+        time.sleep(0.5)
+    frame_buffer.stop()
+
+
+def infer_main(args):
+    """Run the tactical stack on every new decoded frame."""
+    from llm_worker import build_tactical, detect_tactical, fuse_tactical
+    from ai.rate_governor import RateGovernor
+    from metrics import span, METRICS
+
+    config = AIConfig(**json.loads(args.config))
+    decoded_ring = SharedFrameRing.attach(args.decoded)
+    result_ring = SharedFrameRing.attach(args.results)
+    control_ring = SharedFrameRing.attach(args.control)
+    status_ring = SharedFrameRing.attach(args.status)
+
+    status_ring.write(json.dumps({'ready': False, 'state': 'loading'}).encode('utf-8'))
+    started = time.perf_counter()
+    governor = RateGovernor(config)  # Frames pace this loop; the governor only picks quality
+    tactical, corridor, tracked = build_tactical(config)
+    ready = tactical.is_ready()
+    readiness = {
+        'state': 'ready' if ready else 'unavailable',
+        'load_ms': round((time.perf_counter() - started) * 1000, 1),
+        'warmup_ms': round(tactical.warmup(), 1),
+    }
+    status_ring.write(json.dumps({'ready': ready, **readiness}).encode('utf-8'))
+
+    last_seq = last_control = 0
+    range_cm = None
+    last_vision = None  # Re-fused when the range changes while frames are static
+    processed = 0
+    next_status = time.monotonic() + 1.0
+    while _parent_alive(args.parent):
+        frame = decoded_ring.wait(last_seq, timeout=0.05)  # Short: range changes arrive between frames
+        last_control, control = _read_json(control_ring, last_control)
+        range_changed = control is not None and control['range_cm'] != range_cm
+        if control is not None:
+            range_cm = control['range_cm']
+
+        if frame is not None and ready:
+            last_seq = frame.seq
+            started = time.perf_counter()
+            with span('detect'):
+                last_vision = detect_tactical(tactical, corridor, tracked, frame.to_array(), range_cm,
+                                              config, governor.quality)
+                last_vision.frame_id = frame.frame_id
+                result = fuse_tactical(last_vision, range_cm, config)
+            result_ring.write(result_to_bytes(result, time.perf_counter()), frame.frame_id)
+            governor.sleep_time(started)
+            processed += 1
+        elif frame is not None:
+            last_seq = frame.seq
+        elif range_changed and last_vision is not None:
+            # Static frames are not decoded: apply the new range to the last
+            # vision result instead of waiting for the next changed frame
+            result = fuse_tactical(last_vision, range_cm, config)
+            result_ring.write(result_to_bytes(result, time.perf_counter()), result.frame_id)
+
+        now = time.monotonic()
+        if now >= next_status:
+            status_ring.write(json.dumps({
+                'ready': ready,
+                **readiness,
+                'fps': round(processed / (now - next_status + 1.0), 1),
+                'stages': METRICS.snapshot('detect'),
+                'governor': governor.get_status(),
+            }).encode('utf-8'))
+            processed = 0
+            next_status = now + 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescue Rover process-mode worker")
+    parser.add_argument('role', choices=['ingest', 'infer'])
+    parser.add_argument('--parent', type=int, required=True)
+    parser.add_argument('--source', default='{}')
+    parser.add_argument('--config', default='{}')
+    parser.add_argument('--jpeg')
+    parser.add_argument('--decoded')
+    parser.add_argument('--results')
+    parser.add_argument('--control')
+    parser.add_argument('--status')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args()
+
+    from rover_log import setup_logging
+    setup_logging(level=args.log_level)
+    try:
+        (ingest_main if args.role == 'ingest' else infer_main)(args)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
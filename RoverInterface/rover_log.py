@@ -0,0 +1,175 @@
+# rover_log.py
+"""
+Structured logging for Rescue Rover
+
+All backend components log through `logging.getLogger("rover.<component>")`.
+`setup_logging()` attaches a single QueueHandler to the "rover" logger so
+hot paths (API handlers, serial writes, AI loops) only enqueue a record;
+formatting and console/file I/O happen on a background QueueListener
+thread.
+
+Sinks:
+- Console: human readable one-liners
+- JSON lines (optional): one machine-readable object per record
+
+High-rate events pass `extra={'sample': '<key>'}` and are let through at
+most once per sampling interval per key; the number of suppressed records
+is attached to the next one that gets through.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+ROOT_LOGGER = "rover"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(component: str) -> logging.Logger:
+    """Get the logger for a backend component (e.g. 'api', 'serial', 'ai')."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{component}")
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limits records tagged with a `sample` key.
+    Untagged records always pass.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        super().__init__()
+        self._interval = interval
+        self._last_emit: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, 'sample', None)
+        if key is None:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_emit.get(key, 0.0) < self._interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last_emit[key] = now
+            record.suppressed = self._suppressed.pop(key, 0)
+        return True
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues the record itself. The stock prepare() formats on the caller's
+    thread and drops exc_info; here only %-args are merged (they may be
+    mutated after the call) and the sinks' formatters run on the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    # Attributes every LogRecord has; anything else came in via `extra`
+    _RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'component': record.name[len(ROOT_LOGGER) + 1:] or ROOT_LOGGER,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self._RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Short human readable lines; shows how many sampled records were dropped."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-5s [%(name)s] %(message)s", datefmt="%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            line += f" (+{suppressed} suppressed)"
+        return line
+
+
+def parse_levels(spec: Optional[str]) -> Dict[str, str]:
+    """Parse 'serial=DEBUG,api=WARNING' into {'serial': 'DEBUG', 'api': 'WARNING'}."""
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            component, level = item.split('=', 1)
+            levels[component.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = 'INFO',
+                  component_levels: Optional[Dict[str, str]] = None,
+                  json_path: Optional[str] = None,
+                  sample_interval: float = 1.0):
+    """
+    Configure the "rover" logger tree with a queue-backed background handler.
+
+    Args:
+        level: Default level for all components
+        component_levels: Per-component overrides, e.g. {'serial': 'DEBUG'}
+        json_path: Optional file receiving JSON lines
+        sample_interval: Seconds between records sharing a `sample` key
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level.upper())
+    root.propagate = False
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    for component, component_level in (component_levels or {}).items():
+        get_logger(component).setLevel(component_level)
+
+    console = logging.StreamHandler()
+    console.setFormatter(ConsoleFormatter())
+    sinks = [console]
+
+    if json_path:
+        json_sink = logging.FileHandler(json_path, encoding='utf-8')
+        json_sink.setFormatter(JsonFormatter())
+        sinks.append(json_sink)
+
+    # Unbounded queue: producers never block; the listener drains in order
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _RecordQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_interval))
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *sinks, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
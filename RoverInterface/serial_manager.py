@@ -2,15 +2,56 @@ import serial
 import serial.tools.list_ports
 import threading
 import time
-import logging
+from collections import deque
+from typing import Optional
+
+from rover_log import get_logger
+from metrics import span, record
+from tracer import TRACER
+
+log = get_logger("serial")
+
+# Joystick range accepted by the Gateway ("X,Y\n", 0-4095, center=2048)
+JOYSTICK_MIN = 0
+JOYSTICK_MAX = 4095
+JOYSTICK_CENTER = 2048
+
+
+def encode_joystick(x, y):
+    """Encode a joystick setpoint as the Gateway's "X,Y" line (newline terminated)."""
+    x = min(max(int(x), JOYSTICK_MIN), JOYSTICK_MAX)
+    y = min(max(int(y), JOYSTICK_MIN), JOYSTICK_MAX)
+    return f"{x},{y}\n".encode('ascii')
+
+
+def _common_setpoints():
+    """Setpoints produced by RoverCommand.stop/forward/steer and the F/B/L/R/S buttons."""
+    c = JOYSTICK_CENTER
+    points = {(c, c), (c, JOYSTICK_MAX), (c, JOYSTICK_MIN),
+              (JOYSTICK_MIN, c), (JOYSTICK_MAX, c)}
+    for speed in (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0):
+        y = int(c + speed * 2047)
+        for x in (int(c - 0.5 * 2047), c, int(c + 0.5 * 2047)):
+            points.add((x, y))
+    return points
+
 
 class SerialManager:
+    # Pre-encoded frames for setpoints the arbiter emits all the time
+    _FRAME_CACHE = {xy: encode_joystick(*xy) for xy in _common_setpoints()}
+    _FRAME_CACHE_LIMIT = 512
+
     def __init__(self, port=None, baudrate=115200):
         self.port = port
         self.baudrate = baudrate
         self.serial_conn = None
         self.running = False
         self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        
+        # Arbiter decision -> bytes written latency (ms)
+        self._latencies = deque(maxlen=256)
+        self._last_measured_decision = None
         
         # Telemetry state
         self.telemetry = {
@@ -29,7 +70,7 @@ class SerialManager:
         for p in ports:
             # Common names for ESP32/Arduino drivers on Mac/Linux/Windows
             if any(x in p.device for x in ['usbserial', 'wchusb', 'CP210']):
-                print(f"✅ Found Serial Device: {p.device}")
+                log.info(f"✅ Found Serial Device: {p.device}")
                 return p.device
         return None
 
@@ -56,10 +97,10 @@ class SerialManager:
                 continue
 
             try:
-                print(f"🔌 Connecting to {target_port}...")
+                log.info(f"🔌 Connecting to {target_port}...")
                 self.serial_conn = serial.Serial(target_port, self.baudrate, timeout=1)
                 self.telemetry['status'] = 'CONNECTED'
-                print(f"✅ Serial Connected to {target_port}!")
+                log.info(f"✅ Serial Connected to {target_port}!")
                 
                 # Update configured port if auto-detected
                 self.port = target_port
@@ -70,16 +111,16 @@ class SerialManager:
                         if line:
                             self._parse_line(line)
                     except serial.SerialException:
-                        print("❌ Serial connection lost")
+                        log.error("❌ Serial connection lost")
                         break
                         
             except (OSError, serial.SerialException) as e:
-                print(f"❌ Serial Connection Failed: {e}")
+                log.error(f"❌ Serial Connection Failed: {e}", extra={'sample': 'serial.connect'})
                 self.telemetry['status'] = 'ERROR'
                 self.serial_conn = None
                 time.sleep(reconnect_delay)
             except Exception as e:
-                print(f"❌ Unexpected Serial Error: {e}")
+                log.exception(f"❌ Unexpected Serial Error: {e}")
                 self.telemetry['status'] = 'ERROR'
                 self.serial_conn = None
                 time.sleep(reconnect_delay)
@@ -100,7 +141,7 @@ class SerialManager:
         
         # Also print debug output from Gateway for monitoring
         elif "TX" in line or "RX" in line or "MAC" in line:
-            print(f"[Gateway] {line}")
+            log.debug(f"[Gateway] {line}", extra={'sample': 'serial.gateway'})
 
     def send_command(self, cmd):
         """Send command to Gateway (F, B, L, R, S)."""
@@ -110,13 +151,87 @@ class SerialManager:
         try:
             # Ensure newline for readline() on Arduino side
             full_cmd = f"{cmd}\n" 
-            self.serial_conn.write(full_cmd.encode('utf-8'))
-            print(f"📤 Sent: {cmd}")
+            with self.write_lock:
+                self.serial_conn.write(full_cmd.encode('utf-8'))
+            log.debug(f"📤 Sent: {cmd}")
+            return True
+        except Exception as e:
+            log.error(f"❌ Send Failed: {e}", extra={'sample': 'serial.send'})
+            return False
+
+    def send_joystick(self, x, y):
+        """Send a joystick setpoint to Gateway as an "X,Y" line (0-4095, center=2048)."""
+        conn = self.serial_conn
+        if not conn or not conn.is_open:
+            return False
+        
+        frame = self._FRAME_CACHE.get((x, y))
+        if frame is None:
+            frame = encode_joystick(x, y)
+            if len(self._FRAME_CACHE) < self._FRAME_CACHE_LIMIT:
+                self._FRAME_CACHE[(x, y)] = frame
+        
+        try:
+            with self.write_lock, span('serial_write'):
+                conn.write(frame)
             return True
         except Exception as e:
-            print(f"❌ Send Failed: {e}")
+            log.error(f"❌ Send Failed: {e}", extra={'sample': 'serial.send'})
             return False
 
+    def send_rover_command(self, command):
+        """
+        Send an arbiter RoverCommand via the joystick fast path.
+        Records decision -> write latency once per arbiter decision.
+        """
+        ok = self.send_joystick(command.x, command.y)
+        written = time.perf_counter()
+        
+        decision_time = getattr(command, 'decision_time', None)
+        if ok:
+            TRACER.complete(getattr(command, 'trace', None), source=command.source,
+                            decision_time=decision_time, write_time=written)
+        if ok and decision_time is not None and decision_time != self._last_measured_decision:
+            self._last_measured_decision = decision_time
+            latency = written - decision_time
+            self._latencies.append(latency * 1000)
+            record('dispatch', latency)
+        return ok
+
+    def get_latency_stats(self):
+        """Return arbiter decision -> serial write latency summary (ms)."""
+        samples = sorted(self._latencies)
+        if not samples:
+            return {'count': 0, 'last_ms': None, 'p50_ms': None, 'p95_ms': None, 'max_ms': None}
+        
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 3)
+        
+        return {
+            'count': len(samples),
+            'last_ms': round(self._latencies[-1], 3),
+            'p50_ms': pct(0.50),
+            'p95_ms': pct(0.95),
+            'max_ms': round(samples[-1], 3)
+        }
+
+    def get_range(self, max_age: float = 1.5) -> Optional[int]:
+        """
+        Latest ultrasonic distance in cm for sensor fusion.
+        
+        Args:
+            max_age: Readings older than this (seconds) count as unknown
+        
+        Returns:
+            Distance in cm, or None if stale or no echo (firmware reports 999)
+        """
+        with self.lock:
+            distance = self.telemetry['distance']
+            age = time.time() - self.telemetry['last_update']
+        if age > max_age or distance >= 999:
+            return None
+        return distance
+
     def get_telemetry(self):
         """Return thread-safe telemetry copy."""
         with self.lock:
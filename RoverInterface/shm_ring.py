@@ -0,0 +1,228 @@
+# shm_ring.py
+"""
+Shared-Memory Frame Ring for Rescue Rover
+
+A fixed set of slots in one multiprocessing.shared_memory block, written
+by a single producer and read by any number of consumers in other
+processes without pickling or copying through a pipe.
+
+Layout:
+    header:  <magic 4s><version u16><slots u16><slot_bytes u32><head u64>
+    slot i:  <seq u64><frame_id u32><length u32><timestamp f64>
+             <height u16><width u16><channels u8><flags u8><pad 2><payload slot_bytes>
+
+The writer invalidates a slot (seq = 0), fills it, then publishes it by
+setting the slot seq and finally the head. Readers copy the slot and
+re-check its seq afterwards; a slot overwritten mid-copy is detected and
+the read retried. Readers that fall behind simply get the newest frame.
+With copy=False a read returns a view into the slot instead; the reader
+checks intact() once done with it.
+"""
+
+import struct
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+MAGIC = b'RRNG'
+VERSION = 2  # 2: flags byte in the slot header
+HEADER = struct.Struct('<4sHHIQ')
+SLOT_HEADER = struct.Struct('<QIIdHHBB2x')
+FLAG_STATIC = 0x01  # Frame marked static by the producer's ChangeDetector
+_HEAD_OFFSET = 12  # offset of `head` inside HEADER
+
+
+@dataclass
+class RingFrame:
+    """One frame read from a ring"""
+    seq: int
+    frame_id: int
+    timestamp: float
+    shape: Tuple[int, int, int]  # (0, 0, 0) for encoded payloads
+    data: Union[bytes, memoryview]  # memoryview into the ring for copy=False reads
+    flags: int = 0
+
+    def to_array(self) -> np.ndarray:
+        """Decoded payload as an (H, W, C) uint8 array."""
+        return np.frombuffer(self.data, np.uint8).reshape(self.shape)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach without letting this process' resource tracker unlink the block on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+
+class SharedFrameRing:
+    """
+    Single-writer, multi-reader ring of frames in shared memory.
+    Use SharedFrameRing.create() in the owner and SharedFrameRing.attach()
+    everywhere else.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        magic, version, self.slots, self.slot_bytes, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{shm.name} is not a frame ring")
+        if version != VERSION:
+            raise ValueError(f"{shm.name} is a version {version} frame ring, this reader needs {VERSION}")
+        self._stride = SLOT_HEADER.size + self.slot_bytes
+
+    @classmethod
+    def create(cls, slots: int, slot_bytes: int, name: str = None) -> 'SharedFrameRing':
+        """
+        Allocate a new ring.
+
+        Args:
+            slots: Number of frames kept (>= 2; 3+ keeps torn reads rare)
+            slot_bytes: Maximum payload per frame
+            name: Shared memory name (random if None)
+        """
+        size = HEADER.size + slots * (SLOT_HEADER.size + slot_bytes)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, slots, slot_bytes, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedFrameRing':
+        """
+        Open an existing ring by name.
+
+        Raises:
+            FileNotFoundError: if no ring has this name
+            ValueError: if the block is not a frame ring of this layout version
+        """
+        shm = _attach(name)
+        try:
+            return cls(shm, owner=False)
+        except ValueError:
+            shm.close()
+            raise
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def head(self) -> int:
+        """Sequence number of the newest frame (0 = empty)."""
+        return struct.unpack_from('<Q', self._shm.buf, _HEAD_OFFSET)[0]
+
+    def _slot_offset(self, seq: int) -> int:
+        return HEADER.size + ((seq - 1) % self.slots) * self._stride
+
+    def write(self, payload, frame_id: int = 0, timestamp: float = None,
+              shape: Tuple[int, int, int] = (0, 0, 0), flags: int = 0) -> int:
+        """
+        Publish a frame.
+
+        Args:
+            payload: bytes, memoryview or a C-contiguous uint8 ndarray
+            frame_id: Producer frame id
+            timestamp: Producer time (default: time.perf_counter())
+            shape: (H, W, C) for decoded frames
+            flags: FLAG_* bits describing the frame
+
+        Returns:
+            Sequence number of the frame
+
+        Raises:
+            ValueError: if the payload does not fit a slot
+        """
+        if isinstance(payload, np.ndarray):
+            shape = payload.shape if payload.ndim == 3 else (payload.shape[0], payload.shape[1], 1)
+            payload = payload.reshape(-1).view(np.uint8)
+        view = memoryview(payload).cast('B')
+        if len(view) > self.slot_bytes:
+            raise ValueError(f"Frame of {len(view)} bytes exceeds slot size {self.slot_bytes}")
+
+        seq = self.head + 1
+        offset = self._slot_offset(seq)
+        buf = self._shm.buf
+        struct.pack_into('<Q', buf, offset, 0)  # Invalidate while writing
+        start = offset + SLOT_HEADER.size
+        buf[start:start + len(view)] = view
+        SLOT_HEADER.pack_into(
+            buf, offset, seq, frame_id & 0xFFFFFFFF, len(view),
+            timestamp if timestamp is not None else time.perf_counter(),
+            shape[0], shape[1], shape[2], flags
+        )
+        struct.pack_into('<Q', buf, _HEAD_OFFSET, seq)
+        return seq
+
+    def read(self, seq: int, copy: bool = True) -> Optional[RingFrame]:
+        """
+        Frame `seq` if it is still in the ring and intact.
+
+        Args:
+            seq: Sequence number
+            copy: False = data is a view into the slot, valid only while
+                intact(frame) holds; release it before close()
+        """
+        offset = self._slot_offset(seq)
+        buf = self._shm.buf
+        slot_seq, frame_id, length, timestamp, h, w, c, flags = SLOT_HEADER.unpack_from(buf, offset)
+        if slot_seq != seq:
+            return None
+        start = offset + SLOT_HEADER.size
+        data = bytes(buf[start:start + length]) if copy else buf[start:start + length]
+        if struct.unpack_from('<Q', buf, offset)[0] != seq:
+            return None  # Overwritten while copying
+        return RingFrame(seq, frame_id, timestamp, (h, w, c), data, flags)
+
+    def intact(self, frame: RingFrame) -> bool:
+        """True while the frame's slot has not been reused (check after using a view)."""
+        return struct.unpack_from('<Q', self._shm.buf, self._slot_offset(frame.seq))[0] == frame.seq
+
+    def read_latest(self, after: int = 0, copy: bool = True) -> Optional[RingFrame]:
+        """
+        Newest frame, if newer than `after`.
+
+        Args:
+            after: Last sequence number the caller has seen
+            copy: See read()
+        """
+        for _ in range(3):
+            head = self.head
+            if head <= after:
+                return None
+            frame = self.read(head, copy)
+            if frame is not None:
+                return frame
+        return None
+
+    def wait(self, after: int, timeout: float = 1.0, poll: float = 0.002,
+             copy: bool = True) -> Optional[RingFrame]:
+        """
+        Block until a frame newer than `after` is published.
+
+        Polls the head; at 2ms this costs little next to a 30 FPS stream and
+        needs no cross-process lock.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            frame = self.read_latest(after, copy)
+            if frame is not None or time.monotonic() >= deadline:
+                return frame
+            time.sleep(poll)
+
+    def close(self):
+        self._shm.close()
+
+    def unlink(self):
+        """Remove the block (owner only, after all readers closed)."""
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,165 @@
+# telemetry_stream.py
+"""
+Server-push telemetry for Rescue Rover
+
+Samples telemetry and AI status at a bounded rate and broadcasts only the
+fields that changed. Each update is serialized once and the same bytes are
+shared by every subscriber. A subscriber that joined late or fell behind
+gets a full snapshot instead of a delta, so no client ever applies a
+delta on top of state it never saw.
+
+Wire format (Server-Sent Events):
+    id: <version>
+    event: full | delta
+    data: {"v": <version>, "<channel>": {...changed fields...}}
+"""
+
+import asyncio
+import copy
+import json
+import time
+from typing import Callable, Dict, Optional
+
+from rover_log import get_logger
+
+log = get_logger("stream")
+
+
+class TelemetryBroadcaster:
+    """
+    Change-driven broadcaster for dashboard state.
+    Runs as a task on the web server's event loop.
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[], dict]], max_rate_hz: float = 10.0):
+        """
+        Initialize broadcaster.
+
+        Args:
+            sources: {channel name: callable returning that channel's dict}
+            max_rate_hz: Upper bound on sampling / push rate
+        """
+        self._sources = sources
+        self._interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.1
+
+        self._state: Dict[str, dict] = {name: {} for name in sources}
+        self._version = 0
+        self._delta_message: bytes = b''
+        self._full_message: Optional[bytes] = None
+        self._full_version = -1
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+
+    # ------------------------
+    # Producer
+    # ------------------------
+
+    def start(self):
+        """Start sampling on the running event loop (call from a startup hook)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        """Stop sampling."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        """Sample sources, publish a delta when anything changed."""
+        while True:
+            started = time.monotonic()
+            try:
+                self.update(self._sample())
+            except Exception as e:
+                log.warning(f"⚠️ Telemetry stream error: {e}", extra={'sample': 'stream.error'})
+            await asyncio.sleep(max(0.0, self._interval - (time.monotonic() - started)))
+
+    def _sample(self) -> Dict[str, dict]:
+        """Read every source once."""
+        return {name: source() for name, source in self._sources.items()}
+
+    def update(self, sample: Dict[str, dict]) -> bool:
+        """
+        Diff a sample against the current state and publish the changes.
+
+        Args:
+            sample: {channel: full channel dict}
+
+        Returns:
+            True if anything changed and a new version was published
+        """
+        delta = {}
+        for channel, values in sample.items():
+            previous = self._state.get(channel, {})
+            changed = {k: v for k, v in values.items() if previous.get(k) != v}
+            # Keys that disappeared are sent as null
+            changed.update({k: None for k in previous if k not in values})
+            if changed:
+                # Deep copy: sources may hand out live nested dicts (e.g. AI stats)
+                delta[channel] = copy.deepcopy(changed)
+                self._state[channel] = copy.deepcopy(values)
+
+        if not delta:
+            return False
+
+        self._version += 1
+        self._delta_message = self._encode('delta', delta)
+
+        # Wake everyone waiting on the previous version
+        self._changed.set()
+        self._changed = asyncio.Event()
+        return True
+
+    def _encode(self, event: str, payload: dict) -> bytes:
+        """Serialize one SSE message."""
+        body = json.dumps({'v': self._version, **payload}, separators=(',', ':'), default=str)
+        return f"id: {self._version}\nevent: {event}\ndata: {body}\n\n".encode('utf-8')
+
+    def _full_snapshot(self) -> bytes:
+        """Full-state message for the current version (built at most once per version)."""
+        if self._full_version != self._version:
+            self._full_message = self._encode('full', self._state)
+            self._full_version = self._version
+        return self._full_message
+
+    # ------------------------
+    # Consumers
+    # ------------------------
+
+    async def subscribe(self):
+        """
+        Async generator of SSE messages for one client.
+        Starts with a full snapshot, then deltas as state changes.
+        """
+        self.subscribers += 1
+        try:
+            seen = self._version
+            yield self._full_snapshot()
+
+            while True:
+                if self._version == seen:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), timeout=15.0)
+                    except asyncio.TimeoutError:
+                        # Comment line keeps proxies from closing an idle stream
+                        yield b": keepalive\n\n"
+                    continue
+
+                if self._version == seen + 1:
+                    message = self._delta_message
+                else:
+                    message = self._full_snapshot()
+                seen = self._version
+                yield message
+        finally:
+            self.subscribers -= 1
+
+    def get_status(self) -> dict:
+        """Get broadcaster status for API"""
+        return {
+            'version': self._version,
+            'subscribers': self.subscribers,
+            'max_rate_hz': round(1.0 / self._interval, 1)
+        }
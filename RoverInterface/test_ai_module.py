@@ -56,6 +56,40 @@ class TestCommandArbiter:
         current = arbiter.get_current_command()
         # Note: The arbiter only re-evaluates on submit, so this tests internal state
     
+    def test_command_expiry(self):
+        """Test that an expired top command falls back to the next level"""
+        import time
+        from ai.command_arbiter import CommandArbiter, CommandPriority, RoverCommand
+        
+        received_commands = []
+        arbiter = CommandArbiter(command_callback=received_commands.append,
+                                 default_ttls={CommandPriority.STRATEGIC: 0.05})
+        
+        arbiter.submit(RoverCommand.forward(CommandPriority.MANUAL, "user"))
+        arbiter.submit(RoverCommand.steer(CommandPriority.STRATEGIC, "VLM", "left"))
+        assert arbiter.get_current_command().priority == CommandPriority.STRATEGIC
+        
+        time.sleep(0.15)
+        assert arbiter.get_current_command().priority == CommandPriority.MANUAL
+        assert received_commands[-1].priority == CommandPriority.MANUAL
+        assert arbiter.get_status()['active_priorities'] == ['MANUAL']
+    
+    def test_refresh_extends_deadline(self):
+        """Test that resubmitting replaces the pending deadline"""
+        import time
+        from ai.command_arbiter import CommandArbiter, CommandPriority, RoverCommand
+        
+        arbiter = CommandArbiter()
+        for _ in range(4):
+            cmd = RoverCommand.stop(CommandPriority.TACTICAL, "YOLO")
+            cmd.ttl = 0.08
+            arbiter.submit(cmd)
+            time.sleep(0.04)
+        assert arbiter.get_current_command() is not None
+        
+        time.sleep(0.15)
+        assert arbiter.get_current_command() is None
+    
     def test_status_reporting(self):
         """Test status reporting"""
         from ai.command_arbiter import CommandArbiter, CommandPriority, RoverCommand
@@ -71,6 +105,1626 @@ class TestCommandArbiter:
         assert status['enabled'] == False
 
 
+class TestCommandDispatcher:
+    """Tests for CommandDispatcher dedup, coalescing and keepalive"""
+    
+    def test_duplicate_resubmits_dropped(self):
+        """Test that resubmits with only a new timestamp are not re-sent"""
+        import time
+        from ai.command_arbiter import CommandPriority, RoverCommand
+        from ai.command_dispatcher import CommandDispatcher
+        
+        sent = []
+        dispatcher = CommandDispatcher(lambda cmd: sent.append(cmd) or True,
+                                       coalesce_window=0.0, keepalive_interval=0)
+        dispatcher.start()
+        
+        for _ in range(5):
+            dispatcher.submit(RoverCommand.stop(CommandPriority.TACTICAL, "YOLO"))
+            time.sleep(0.06)
+        dispatcher.stop()
+        
+        assert len(sent) == 1
+        assert dispatcher.stats['duplicates'] == 4
+    
+    def test_burst_coalesced(self):
+        """Test that a burst inside the window only sends the latest command"""
+        import time
+        from ai.command_arbiter import CommandPriority, RoverCommand
+        from ai.command_dispatcher import CommandDispatcher
+        
+        sent = []
+        dispatcher = CommandDispatcher(lambda cmd: sent.append(cmd) or True,
+                                       coalesce_window=0.1, keepalive_interval=0)
+        dispatcher.start()
+        
+        for direction in ("left", "center", "right"):
+            dispatcher.submit(RoverCommand.steer(CommandPriority.STRATEGIC, "VLM", direction))
+        time.sleep(0.2)
+        dispatcher.stop()
+        
+        assert len(sent) == 1
+        assert sent[0].reason == "right"
+    
+    def test_keepalive_resend(self):
+        """Test that the active command is re-sent and stops after reset"""
+        import time
+        from ai.command_arbiter import CommandPriority, RoverCommand
+        from ai.command_dispatcher import CommandDispatcher
+        
+        sent = []
+        dispatcher = CommandDispatcher(lambda cmd: sent.append(cmd) or True,
+                                       coalesce_window=0.0, keepalive_interval=0.05)
+        dispatcher.start()
+        dispatcher.submit(RoverCommand.forward(CommandPriority.STRATEGIC, "VLM"))
+        time.sleep(0.2)
+        assert dispatcher.stats['keepalives'] >= 2
+        
+        dispatcher.reset()
+        count = len(sent)
+        time.sleep(0.15)
+        dispatcher.stop()
+        assert len(sent) == count
+    
+    def test_arbiter_idle_resets_dispatcher(self):
+        """Test that clearing the last active priority fires the idle callback"""
+        from ai.command_arbiter import CommandArbiter, CommandPriority, RoverCommand
+        
+        idle_calls = []
+        arbiter = CommandArbiter(idle_callback=lambda: idle_calls.append(True))
+        arbiter.submit(RoverCommand.stop(CommandPriority.TACTICAL, "YOLO"))
+        arbiter.clear(CommandPriority.TACTICAL)
+        
+        assert len(idle_calls) == 1
+        assert arbiter.get_current_command() is None
+    
+    def test_manual_command_replaces_held_strategic(self):
+        """Test that an operator button wins over a held VLM steer and is what the keepalive repeats"""
+        import time
+        from ai import AIConfig
+        from ai.command_arbiter import CommandArbiter, CommandPriority, RoverCommand
+        from ai.command_dispatcher import CommandDispatcher
+        from camera_reassembler import FrameBuffer
+        from mission_log import MissionLog
+        from llm_worker import AIWorker
+        
+        sent = []
+        dispatcher = CommandDispatcher(lambda cmd: sent.append(cmd) or True,
+                                       coalesce_window=0.0, keepalive_interval=0.05)
+        arbiter = CommandArbiter(dispatcher.submit, idle_callback=dispatcher.reset)
+        worker = AIWorker(FrameBuffer(mode='relay'), MissionLog(capacity=10), arbiter,
+                          config=AIConfig(manual_command_ttl=0.3))
+        dispatcher.start()
+        try:
+            arbiter.submit(RoverCommand.steer(CommandPriority.STRATEGIC, "VLM", "left"))
+            time.sleep(0.05)
+            assert worker.manual_command('B')
+            assert not worker.manual_command('CAPTURE')  # Not a drive command
+            
+            time.sleep(0.15)
+            assert arbiter.get_current_command().priority == CommandPriority.MANUAL
+            assert (sent[-1].x, sent[-1].y) == (2048, 0)
+            assert dispatcher.stats['keepalives'] >= 1
+            assert worker._operator_driving()
+            
+            time.sleep(0.3)  # Manual TTL over: nothing is re-sent anymore
+            assert arbiter.get_current_command() is None
+            count = len(sent)
+            time.sleep(0.15)
+            assert len(sent) == count
+        finally:
+            dispatcher.stop()
+            worker.frame_buffer.stop()
+
+
+class _FakeSerial:
+    """Minimal stand-in for serial.Serial that records writes"""
+    
+    def __init__(self):
+        self.is_open = True
+        self.written = []
+    
+    def write(self, data):
+        self.written.append(data)
+        return len(data)
+
+
+class TestSerialJoystick:
+    """Tests for the SerialManager joystick fast path"""
+    
+    def test_encode_clamps_range(self):
+        """Test joystick frame encoding and clamping"""
+        from serial_manager import encode_joystick
+        
+        assert encode_joystick(2048, 2048) == b"2048,2048\n"
+        assert encode_joystick(-5, 9000) == b"0,4095\n"
+    
+    def test_send_rover_command(self):
+        """Test that arbiter commands are written as X,Y frames with latency recorded"""
+        from ai.command_arbiter import CommandArbiter, CommandPriority, RoverCommand
+        from serial_manager import SerialManager
+        
+        manager = SerialManager(port="test")
+        manager.serial_conn = _FakeSerial()
+        
+        arbiter = CommandArbiter(manager.send_rover_command)
+        cmd = RoverCommand.steer(CommandPriority.STRATEGIC, "VLM", "left")
+        arbiter.submit(cmd)
+        
+        assert manager.serial_conn.written == [f"{cmd.x},{cmd.y}\n".encode()]
+        assert manager.get_latency_stats()['count'] == 1
+        
+        # Keepalive re-send of the same decision is not measured again
+        manager.send_rover_command(cmd)
+        assert manager.get_latency_stats()['count'] == 1
+    
+    def test_send_without_connection(self):
+        """Test that sending while disconnected fails cleanly"""
+        from serial_manager import SerialManager
+        
+        manager = SerialManager(port="test")
+        assert manager.send_joystick(2048, 2048) is False
+
+
+class TestMissionLog:
+    """Tests for the MissionLog ring buffer"""
+    
+    def test_ids_and_cursor(self):
+        """Test monotonic ids and since-cursor pagination"""
+        from mission_log import MissionLog
+        
+        log = MissionLog(capacity=10)
+        for i in range(5):
+            log.log(f"entry {i}", source='test')
+        
+        assert [r.id for r in log.since(0)] == [1, 2, 3, 4, 5]
+        assert [r.id for r in log.since(3)] == [4, 5]
+        assert [r.id for r in log.since(0, limit=2)] == [1, 2]
+        assert log.since(5) == []
+    
+    def test_wraparound(self):
+        """Test that old records are overwritten once capacity is reached"""
+        from mission_log import MissionLog
+        
+        log = MissionLog(capacity=4)
+        for i in range(10):
+            log.log(f"entry {i}")
+        
+        assert len(log) == 4
+        assert [r.id for r in log.since(0)] == [7, 8, 9, 10]
+        assert [r.message for r in log.tail(2)] == ["entry 8", "entry 9"]
+    
+    def test_spill_file(self, tmp_path):
+        """Test append-only JSONL spill"""
+        import json
+        from mission_log import MissionLog
+        
+        path = tmp_path / "mission.jsonl"
+        log = MissionLog(capacity=2, spill_path=str(path))
+        log.log("a")
+        log.append({'command': 'F', 'status': 'sent'})
+        log.append("legacy string")
+        log.close()
+        
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line['id'] for line in lines] == [1, 2, 3]
+        assert lines[1]['data']['status'] == 'sent'
+
+
+class TestTelemetryBroadcaster:
+    """Tests for delta-encoded telemetry push"""
+    
+    def test_delta_and_snapshot(self):
+        """Test that subscribers get a snapshot first, then only changed fields"""
+        import asyncio
+        import json
+        from telemetry_stream import TelemetryBroadcaster
+        
+        def payload(message):
+            return json.loads(message.decode().split('data: ', 1)[1])
+        
+        async def scenario():
+            broadcaster = TelemetryBroadcaster({'telemetry': dict})
+            broadcaster.update({'telemetry': {'voltage': 12.1, 'distance': 40}})
+            
+            stream = broadcaster.subscribe()
+            first = await stream.__anext__()
+            assert b"event: full" in first
+            assert payload(first)['telemetry'] == {'voltage': 12.1, 'distance': 40}
+            
+            # No change -> no new version
+            assert broadcaster.update({'telemetry': {'voltage': 12.1, 'distance': 40}}) is False
+            
+            next_message = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0)
+            broadcaster.update({'telemetry': {'voltage': 12.1, 'distance': 35}})
+            second = await next_message
+            assert b"event: delta" in second
+            assert payload(second)['telemetry'] == {'distance': 35}
+            await stream.aclose()
+            assert broadcaster.subscribers == 0
+        
+        asyncio.run(scenario())
+    
+    def test_lagging_subscriber_gets_snapshot(self):
+        """Test that a client that missed versions is resynced with full state"""
+        import asyncio
+        from telemetry_stream import TelemetryBroadcaster
+        
+        async def scenario():
+            broadcaster = TelemetryBroadcaster({'telemetry': dict})
+            stream = broadcaster.subscribe()
+            await stream.__anext__()
+            
+            broadcaster.update({'telemetry': {'fps': 10}})
+            broadcaster.update({'telemetry': {'fps': 12}})
+            message = await stream.__anext__()
+            assert b"event: full" in message
+            assert b'"fps":12' in message
+            await stream.aclose()
+        
+        asyncio.run(scenario())
+
+
+class TestRoverLog:
+    """Tests for queue-backed structured logging"""
+    
+    def test_sampling_and_json_sink(self, tmp_path):
+        """Test that sampled records are rate limited and JSON lines are written"""
+        import json
+        from rover_log import setup_logging, shutdown_logging, get_logger
+        
+        path = tmp_path / "rover.jsonl"
+        setup_logging(level='DEBUG', json_path=str(path), sample_interval=60.0)
+        log = get_logger("serial")
+        for i in range(5):
+            log.debug(f"send {i}", extra={'sample': 'serial.send'})
+        log.info("connected", extra={'port': '/dev/test'})
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            log.exception("write failed on %s", '/dev/test')
+        shutdown_logging()
+        
+        entries = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [e['msg'] for e in entries] == ["send 0", "connected", "write failed on /dev/test"]
+        assert entries[1]['component'] == 'serial'
+        assert entries[1]['port'] == '/dev/test'
+        assert 'ZeroDivisionError' in entries[2]['exc']  # Traceback formatted by the sink, not folded into msg
+    
+    def test_component_levels(self):
+        """Test per-component level parsing"""
+        from rover_log import parse_levels
+        
+        assert parse_levels("serial=debug, api=WARNING") == {'serial': 'DEBUG', 'api': 'WARNING'}
+        assert parse_levels("") == {}
+
+
+class TestMetrics:
+    """Tests for stage latency histograms"""
+    
+    def test_quantiles_within_precision(self):
+        """Test histogram quantiles against exact values"""
+        from metrics import LatencyHistogram
+        
+        hist = LatencyHistogram()
+        samples = [i / 10000 for i in range(1, 1001)]  # 0.1ms .. 100ms
+        for value in samples:
+            hist.record(value)
+        
+        q = hist.quantiles((0.5, 0.99))
+        assert abs(q[0.5] - 0.05) / 0.05 < 0.02
+        assert abs(q[0.99] - 0.099) / 0.099 < 0.02
+        assert hist.count == 1000
+    
+    def test_prometheus_export(self):
+        """Test span timing and Prometheus text output"""
+        from metrics import MetricsRegistry
+        
+        registry = MetricsRegistry()
+        with registry.span('decode'):
+            pass
+        registry.record('detect', 0.012)
+        
+        text = registry.render_prometheus()
+        assert '# TYPE rover_stage_latency_seconds summary' in text
+        assert 'rover_stage_latency_seconds{stage="detect",quantile="0.5"} 0.012' in text
+        assert 'rover_stage_latency_seconds_count{stage="decode"} 1' in text
+        assert registry.snapshot()['detect']['count'] == 1
+
+
+class TestGlassToWheelTracer:
+    """Tests for per-frame provenance and end-to-end tracing"""
+    
+    def test_frame_ids_assigned(self):
+        """Test that FrameBuffer stamps each frame with an increasing id"""
+        from camera_reassembler import FrameBuffer
+        
+        fb = FrameBuffer(mode='none')
+        first = fb.feed_frame(b"jpeg-1", capture_time=1.0)
+        second = fb.feed_frame(b"jpeg-2")
+        
+        assert second.frame_id == first.frame_id + 1
+        assert first.capture_time == 1.0
+        frame, trace = fb.get_raw_frame_with_trace()
+        assert frame == b"jpeg-2" and trace is second
+    
+    def test_chain_closed_at_serial_write(self):
+        """Test that a traced command completes once at the serial write"""
+        from ai.command_arbiter import CommandArbiter, CommandPriority, RoverCommand
+        from serial_manager import SerialManager
+        from tracer import FrameTrace, GlassToWheelTracer
+        import serial_manager as serial_module
+        
+        tracer = GlassToWheelTracer(sample_every=1)
+        original, serial_module.TRACER = serial_module.TRACER, tracer
+        try:
+            manager = SerialManager(port="test")
+            manager.serial_conn = _FakeSerial()
+            arbiter = CommandArbiter(manager.send_rover_command)
+            
+            import time
+            trace = FrameTrace(frame_id=7, capture_time=time.perf_counter(),
+                               receive_time=time.perf_counter())
+            trace.mark('detect')
+            cmd = RoverCommand.stop(CommandPriority.TACTICAL, "YOLO")
+            cmd.trace = trace
+            arbiter.submit(cmd)
+            manager.send_rover_command(cmd)  # keepalive: not counted twice
+        finally:
+            serial_module.TRACER = original
+        
+        chains = tracer.recent()
+        assert len(chains) == 1
+        assert chains[0]['frame_id'] == 7
+        assert [s['stage'] for s in chains[0]['stages']] == ['receive', 'detect', 'decision', 'serial_write']
+
+
+class TestReplay:
+    """Tests for offline replay input"""
+    
+    def test_mjpeg_split(self, tmp_path):
+        """Test splitting a concatenated MJPEG file into frames"""
+        from camera_reassembler import iter_replay_frames
+        
+        frames = [b"\xff\xd8frame-one\xff\xd9", b"\xff\xd8frame-two\xff\xd9"]
+        path = tmp_path / "run.mjpeg"
+        path.write_bytes(b"--boundary\r\n".join(frames))
+        
+        assert [f for f, _ in iter_replay_frames(str(path))] == frames
+    
+    def test_replay_mode_publishes_all_frames(self, tmp_path):
+        """Test that replay mode at max rate feeds every frame then reports done"""
+        import time
+        from camera_reassembler import FrameBuffer
+        
+        for i in range(5):
+            (tmp_path / f"{i:03d}.jpg").write_bytes(b"\xff\xd8" + bytes([i]) + b"\xff\xd9")
+        
+        fb = FrameBuffer(mode='replay', replay_path=str(tmp_path), replay_fps=0)
+        for _ in range(50):
+            if fb.get_telemetry()['state'] == 'REPLAY_DONE':
+                break
+            time.sleep(0.02)
+        
+        assert fb.get_telemetry()['state'] == 'REPLAY_DONE'
+        assert fb.get_frame_trace().frame_id == 5
+        assert fb.get_raw_frame() == b"\xff\xd8\x04\xff\xd9"
+
+
+class TestMissionRecorder:
+    """Tests for the mission recorder and mmap reader"""
+
+    def test_record_and_scrub(self, tmp_path):
+        """Test that frames and events round-trip and frames are found by time and id"""
+        from mission_recorder import MissionRecorder, MissionReader, FRAME, COMMAND
+        from ai.command_arbiter import CommandPriority, RoverCommand
+
+        rec = MissionRecorder(str(tmp_path), flush_interval=0.01)
+        rec.start()
+        for i in range(1, 6):
+            rec.record_frame(b"\xff\xd8" + bytes([i]) + b"\xff\xd9", frame_id=i, timestamp=100.0 + i)
+        rec.record_command(RoverCommand.stop(CommandPriority.TACTICAL, "YOLO", "Person"))
+        rec.stop()
+
+        reader = MissionReader(str(tmp_path))
+        assert reader.frame_count == 5
+        assert reader.read(reader.frame_at(103.5)) == b"\xff\xd8\x03\xff\xd9"
+        assert reader.frame_at(50.0) is None
+        assert reader.frame_by_id(5).timestamp == 105.0
+        command = reader.read(next(reader.entries(kind=COMMAND)))
+        assert command['priority'] == 'TACTICAL' and command['reason'] == 'Person'
+        assert len(list(reader.entries(kind=FRAME, start=102.0, end=104.0))) == 3
+        reader.close()
+
+    def test_segments_roll_and_replay(self, tmp_path):
+        """Test that small segments roll over and replay reads the mission directory"""
+        from mission_recorder import MissionRecorder
+        from camera_reassembler import iter_replay_frames
+
+        rec = MissionRecorder(str(tmp_path), segment_bytes=64, flush_interval=0.01)
+        rec.start()
+        frames = [b"\xff\xd8" + bytes([i]) * 30 + b"\xff\xd9" for i in range(4)]
+        for i, frame in enumerate(frames):
+            rec.record_frame(frame, frame_id=i + 1)
+        rec.stop()
+
+        assert rec.get_status()['segment'] >= 2
+        assert [f for f, _ in iter_replay_frames(str(tmp_path))] == frames
+
+
+class TestEvidenceStore:
+    """Tests for the recorder-backed evidence store"""
+
+    def _record_mission(self, directory, frames=6):
+        import cv2
+        import numpy as np
+        from mission_recorder import MissionRecorder
+        from ai.tactical_detector import TacticalResult, Detection
+
+        rec = MissionRecorder(directory, flush_interval=0.01)
+        rec.start()
+        _, jpeg = cv2.imencode('.jpg', np.zeros((120, 160, 3), np.uint8))
+        for i in range(1, frames + 1):
+            rec.record_frame(jpeg.tobytes(), frame_id=i)
+            detections = [Detection("person", 0.5 + i / 20, (0.1, 0.1, 0.5, 0.9), 0.3),
+                          Detection("chair", 0.9, (0.6, 0.6, 0.9, 0.9), 0.1)]
+            result = TacticalResult(detections, False, None, 5.0, frame_id=i)
+            rec.record_tactical(result)
+            rec.record_tactical(result)  # Same frame processed twice
+        rec.stop()
+
+    def test_manifest_pagination(self, tmp_path):
+        """Test that only person detections are indexed, once per frame, and paged"""
+        from evidence_api import EvidenceStore
+
+        self._record_mission(str(tmp_path))
+        store = EvidenceStore(str(tmp_path))
+
+        page = store.manifest(limit=4)
+        assert page['total'] == 6
+        assert [e['frame_id'] for e in page['events']] == [1, 2, 3, 4]
+        rest = store.manifest(since=page['next'], limit=4)
+        assert [e['frame_id'] for e in rest['events']] == [5, 6]
+        assert rest['next'] is None
+        assert store.manifest(min_confidence=0.8)['events'][0]['frame_id'] == 6
+
+    def test_thumbnail_cached_and_bundle_streams(self, tmp_path):
+        """Test lazy thumbnail caching and that the streamed zip is complete"""
+        import io
+        import json
+        import zipfile
+        from evidence_api import EvidenceStore
+
+        self._record_mission(str(tmp_path), frames=3)
+        store = EvidenceStore(str(tmp_path))
+        store.refresh()
+
+        thumb = store.thumbnail(1)
+        assert thumb.startswith(b"\xff\xd8")
+        assert store.thumbnail(1) is thumb
+        assert store.thumbnail(99) is None
+
+        chunks = list(store.iter_bundle())
+        assert len(chunks) == 4  # One per frame + manifest
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert len([n for n in archive.namelist() if n.startswith("frames/")]) == 3
+        assert len(json.loads(archive.read("manifest.json"))['events']) == 3
+
+
+class _ScriptedDetector:
+    """Detector stub returning one person box per call from a list of area ratios"""
+
+    def __init__(self, areas, confidence=0.8):
+        self.areas = list(areas)
+        self.confidence = confidence
+        self.calls = 0
+
+    def detect(self, frame, confidence=None):
+        from ai.tactical_detector import Detection, TacticalResult
+
+        area = self.areas[min(self.calls, len(self.areas) - 1)]
+        self.calls += 1
+        side = area ** 0.5
+        det = Detection("person", self.confidence, (0.5 - side / 2, 0.5 - side / 2, 0.5 + side / 2, 0.5 + side / 2), area)
+        return TacticalResult([det], area >= 0.4, None, 10.0)
+
+    def is_ready(self):
+        return True
+
+
+class TestObjectTracker:
+    """Tests for temporal tracking and stop hysteresis"""
+
+    def test_flicker_does_not_toggle_stop(self):
+        """Test that a box flickering around the threshold keeps a single stop"""
+        from ai.config import AIConfig
+        from ai.object_tracker import TrackedDetector
+
+        config = AIConfig(detect_every_n_frames=1, track_area_smoothing=1.0)
+        tracked = TrackedDetector(_ScriptedDetector([0.41, 0.39, 0.41, 0.39, 0.39, 0.30]), config)
+
+        decisions = [tracked.process(None, now=i * 0.033).should_stop for i in range(6)]
+        # Enters at 0.41, holds through 0.39 flicker, releases below 0.32
+        assert decisions == [True, True, True, True, True, False]
+
+    def test_detector_runs_every_nth_frame(self):
+        """Test that skipped frames are extrapolated from the same track"""
+        from ai.config import AIConfig
+        from ai.object_tracker import TrackedDetector
+
+        config = AIConfig(detect_every_n_frames=3)
+        detector = _ScriptedDetector([0.1])
+        tracked = TrackedDetector(detector, config)
+
+        results = [tracked.process(None, now=i * 0.033) for i in range(9)]
+        assert detector.calls == 3
+        assert [r.extrapolated for r in results[:3]] == [False, True, True]
+        track_ids = {d.track_id for r in results[3:] for d in r.detections}
+        assert track_ids == {1}
+
+    def test_track_expires_without_detections(self):
+        """Test that a track is dropped after tracker_max_age without matches"""
+        from ai.config import AIConfig
+        from ai.object_tracker import ObjectTracker
+        from ai.tactical_detector import Detection
+
+        tracker = ObjectTracker(AIConfig(tracker_max_age=0.5))
+        tracker.update([Detection("person", 0.9, (0.1, 0.1, 0.3, 0.3), 0.04)], now=0.0)
+        tracker.update([], now=0.4)
+        assert len(tracker.tracks) == 1
+        tracker.update([], now=0.6)
+        assert tracker.tracks == []
+
+
+class TestSensorFusion:
+    """Tests for corridor ROI inference and ultrasonic fusion"""
+
+    class _CenterDetector:
+        """Returns one person covering the middle of whatever it is given"""
+
+        def __init__(self):
+            self.calls = []
+
+        def detect(self, frame, confidence=None, imgsz=None):
+            from ai.tactical_detector import Detection, TacticalResult
+
+            self.calls.append((frame.shape[:2], imgsz))
+            det = Detection("person", 0.9, (0.25, 0.25, 0.75, 0.75), 0.25)
+            return TacticalResult([det], False, None, 5.0)
+
+        def is_ready(self):
+            return True
+
+    def test_corridor_crop_maps_boxes_back(self):
+        """Test that ROI inference sees the crop and reports frame coordinates"""
+        import numpy as np
+        from ai.config import AIConfig
+        from ai.sensor_fusion import CorridorDetector
+
+        config = AIConfig(drive_corridor_roi=(0.0, 0.5, 1.0, 1.0), roi_full_frame_every=3)
+        inner = self._CenterDetector()
+        corridor = CorridorDetector(inner, config)
+        frame = np.zeros((200, 100, 3), np.uint8)
+
+        result = corridor.detect(frame)
+        assert inner.calls[0] == ((100, 100), None)
+        assert result.detections[0].bbox == (0.25, 0.625, 0.75, 0.875)
+        assert abs(result.detections[0].area_ratio - 0.125) < 1e-9
+
+        corridor.detect(frame)
+        corridor.detect(frame)  # Periodic full frame
+        assert inner.calls[2] == ((200, 100), None)
+
+        corridor.set_range(50)  # Inside ultrasonic_escalate_cm
+        corridor.detect(frame)
+        assert inner.calls[3] == ((200, 100), config.escalated_imgsz)
+
+    def test_obstacle_filling_corridor_stops_on_roi_runs(self):
+        """Test that a person filling the corridor stops on every run, not only full-frame ones"""
+        import numpy as np
+        from ai.config import AIConfig
+        from ai.sensor_fusion import CorridorDetector
+        from ai.object_tracker import TrackedDetector
+        from ai.tactical_detector import Detection, TacticalResult
+
+        class _FillDetector:
+            def detect(self, frame, confidence=None, imgsz=None):
+                if frame.shape[:2] == (200, 100):  # Full frame: person covers 72%
+                    det = Detection("person", 0.9, (0.05, 0.1, 0.85, 1.0), 0.72)
+                else:
+                    det = Detection("person", 0.9, (0.0, 0.0, 1.0, 1.0), 1.0)
+                return TacticalResult([det], det.area_ratio >= 0.4, None, 5.0)
+
+            def is_ready(self):
+                return True
+
+        config = AIConfig(tracker_enabled=False)
+        corridor = CorridorDetector(_FillDetector(), config)
+        frame = np.zeros((200, 100, 3), np.uint8)
+        assert all(corridor.detect(frame).should_stop for _ in range(config.roi_full_frame_every))
+        assert corridor.stats['roi_runs'] == config.roi_full_frame_every - 1
+
+        tracked = TrackedDetector(CorridorDetector(_FillDetector(), config), config)
+        assert all(tracked.process(frame, now=i * 0.03, force_detect=True).should_stop for i in range(10))
+
+        # A box wholly inside the corridor keeps its frame-relative area
+        inner = CorridorDetector(TestSensorFusion._CenterDetector(), config)
+        det = inner.detect(frame).detections[0]
+        assert abs(det.area_ratio - 0.25 * 0.6 * 0.65) < 1e-9
+
+    def test_fuse_range_rules(self):
+        """Test range-only stops and close-range corridor stops"""
+        from ai.config import AIConfig
+        from ai.sensor_fusion import fuse_range
+        from ai.tactical_detector import Detection, TacticalResult
+
+        config = AIConfig()
+        small_person = Detection("person", 0.9, (0.4, 0.5, 0.5, 0.8), 0.03)
+
+        assert fuse_range(TacticalResult([], False, None, 0), 10, config).should_stop
+        assert not fuse_range(TacticalResult([], False, None, 0), 50, config).should_stop
+        assert fuse_range(TacticalResult([small_person], False, None, 0), 50, config).should_stop
+        assert not fuse_range(TacticalResult([small_person], False, None, 0), 150, config).should_stop
+        assert not fuse_range(TacticalResult([small_person], False, None, 0), None, config).should_stop
+
+        weak_person = Detection("person", 0.3, (0.4, 0.5, 0.5, 0.8), 0.03)  # Tracker-level confidence
+        assert not fuse_range(TacticalResult([weak_person], False, None, 0), 50, config).should_stop
+
+    def test_manual_reverse_during_range_stop(self):
+        """Test that the operator can back away from an ultrasonic stop but not drive into it"""
+        from ai import AIConfig
+        from ai.command_arbiter import CommandArbiter, CommandPriority, RoverCommand
+        from ai.sensor_fusion import fuse_range
+        from ai.tactical_detector import TacticalResult
+        from camera_reassembler import FrameBuffer
+        from mission_log import MissionLog
+        from llm_worker import AIWorker
+        from tracer import FrameTrace
+
+        config = AIConfig(manual_command_ttl=None)
+        arbiter = CommandArbiter()
+        worker = AIWorker(FrameBuffer(mode='relay'), MissionLog(capacity=10), arbiter, config=config)
+        worker._started_at = 0.0  # Loops are not started here
+        try:
+            def frame(i):  # Stop resubmitted every frame, as the tactical loop does
+                result = fuse_range(TacticalResult([], False, None, 0), 10, config)
+                worker._handle_tactical(result, FrameTrace(i, 0.0, 0.0), None)
+
+            frame(1)
+            worker.manual_command('F')
+            frame(2)
+            assert arbiter.get_current_command().priority == CommandPriority.TACTICAL
+
+            worker.manual_command('B')
+            frame(3)
+            current = arbiter.get_current_command()
+            assert current.priority == CommandPriority.MANUAL and current.y == 0
+
+            arbiter.submit(RoverCommand.stop(CommandPriority.SAFETY, "firmware"))
+            assert arbiter.get_current_command().priority == CommandPriority.SAFETY
+        finally:
+            worker.frame_buffer.stop()
+
+    def test_range_stop_on_static_frames(self):
+        """Test that static frames re-fuse the current range instead of replaying the last decision"""
+        import threading
+        import time
+        import cv2
+        import numpy as np
+        from ai import AIConfig
+        from ai.command_arbiter import CommandArbiter, CommandPriority
+        from ai.tactical_detector import TacticalResult
+        from camera_reassembler import FrameBuffer
+        from mission_log import MissionLog
+        from llm_worker import AIWorker
+
+        config = AIConfig()
+        ranges = [150]
+        arbiter = CommandArbiter()
+        fb = FrameBuffer(mode='relay')
+        worker = AIWorker(fb, MissionLog(capacity=10), arbiter, config=config,
+                          range_source=lambda: ranges[-1])
+        worker._started_at = 0.0
+        worker._last_vision = TacticalResult([], False, None, 5.0)  # Plain wall: nothing detected
+        _, jpeg = cv2.imencode('.jpg', np.zeros((48, 64, 3), np.uint8))
+        fb.feed_frame(jpeg.tobytes(), static=True)
+
+        worker._running = True
+        loop = threading.Thread(target=worker._tactical_loop, daemon=True)
+        loop.start()
+        try:
+            time.sleep(0.1)
+            assert arbiter.get_current_command() is None
+            ranges.append(config.ultrasonic_stop_cm - 5)
+            for _ in range(50):
+                current = arbiter.get_current_command()
+                if current is not None:
+                    break
+                time.sleep(0.01)
+            assert current.priority == CommandPriority.TACTICAL
+            assert worker._last_vision.range_cm is None and not worker._last_vision.should_stop
+        finally:
+            worker._running = False
+            loop.join(timeout=1)
+            fb.stop()
+
+    def test_serial_range_staleness(self):
+        """Test that stale or no-echo readings are reported as unknown"""
+        import time
+        from serial_manager import SerialManager
+
+        manager = SerialManager(port='/dev/null')
+        assert manager.get_range() is None  # Never updated
+        manager._parse_line("TELE:7.4,42")
+        assert manager.get_range() == 42
+        manager._parse_line("TELE:7.4,999")
+        assert manager.get_range() is None
+        manager._parse_line("TELE:7.4,42")
+        manager.telemetry['last_update'] = time.time() - 5
+        assert manager.get_range(max_age=1.5) is None
+
+
+class TestFrameCompositor:
+    """Tests for on-demand overlay rendering"""
+
+    def _setup(self):
+        import cv2
+        import numpy as np
+        from camera_reassembler import FrameBuffer
+        from frame_compositor import FrameCompositor
+        from ai.tactical_detector import Detection, TacticalResult
+
+        fb = FrameBuffer(mode='none')
+        fb.set_active_ai(True)
+        _, jpeg = cv2.imencode('.jpg', np.zeros((60, 80, 3), np.uint8))
+        trace = fb.feed_frame(jpeg.tobytes())
+        result = TacticalResult([Detection("person", 0.9, (0.1, 0.1, 0.6, 0.9), 0.4, track_id=3)], True, "person", 5.0)
+        return fb, FrameCompositor(fb), result, trace
+
+    def test_renders_only_with_viewers(self):
+        """Test that nothing is drawn until a viewer subscribes"""
+        import time
+
+        fb, compositor, result, trace = self._setup()
+        compositor.start()
+        compositor.publish(result, trace.frame_id)
+        time.sleep(0.1)
+        assert compositor.stats['rendered'] == 0
+        assert fb.get_frame() is None
+
+        viewer = compositor.add_viewer(fps=30)
+        for _ in range(50):
+            if compositor.stats['rendered']:
+                break
+            time.sleep(0.01)
+        compositor.remove_viewer(viewer)
+        compositor.stop()
+
+        assert compositor.stats['rendered'] == 1  # Unchanged input is not re-rendered
+        assert fb.get_frame().startswith(b"\xff\xd8")
+
+    def test_detections_json(self):
+        """Test the client-side overlay payload"""
+        fb, compositor, result, trace = self._setup()
+        assert compositor.get_detections()['detections'] == []
+
+        compositor.publish(result, trace.frame_id)
+        payload = compositor.get_detections()
+        assert payload['frame_id'] == trace.frame_id
+        assert payload['should_stop'] is True
+        assert payload['detections'][0]['track_id'] == 3
+
+
+class TestSharedFrameRing:
+    """Tests for the shared-memory frame ring"""
+
+    def test_latest_and_wraparound(self):
+        """Test that readers see the newest frame and old slots are recycled"""
+        import pytest
+        from shm_ring import SharedFrameRing
+
+        ring = SharedFrameRing.create(slots=3, slot_bytes=16)
+        reader = SharedFrameRing.attach(ring.name)
+        try:
+            assert reader.read_latest() is None
+            for i in range(1, 6):
+                ring.write(bytes([i]) * 4, frame_id=100 + i, timestamp=float(i))
+
+            latest = reader.read_latest()
+            assert (latest.seq, latest.frame_id, latest.data) == (5, 105, b"\x05" * 4)
+            assert reader.read_latest(after=5) is None
+            assert reader.read(1) is None  # Overwritten
+            assert reader.read(3).frame_id == 103
+            with pytest.raises(ValueError):
+                ring.write(b"x" * 17)
+        finally:
+            reader.close()
+            ring.close()
+            ring.unlink()
+
+    def test_decoded_frame_roundtrip(self):
+        """Test that ndarray frames keep their shape"""
+        import numpy as np
+        from shm_ring import SharedFrameRing
+
+        ring = SharedFrameRing.create(slots=2, slot_bytes=4 * 6 * 3)
+        try:
+            img = np.arange(72, dtype=np.uint8).reshape(4, 6, 3)
+            ring.write(img, frame_id=7)
+            assert np.array_equal(ring.read_latest().to_array(), img)
+        finally:
+            ring.close()
+            ring.unlink()
+
+    def test_view_read_detects_overwrite(self):
+        """Test that a zero-copy read sees the slot and reports when it was reused"""
+        from shm_ring import SharedFrameRing
+
+        ring = SharedFrameRing.create(slots=2, slot_bytes=8)
+        try:
+            ring.write(b"first", frame_id=1)
+            frame = ring.read_latest(copy=False)
+            assert isinstance(frame.data, memoryview) and bytes(frame.data) == b"first"
+            assert ring.intact(frame)
+            ring.write(b"second", frame_id=2)
+            ring.write(b"third", frame_id=3)  # Reuses the first slot
+            assert not ring.intact(frame)
+            del frame  # Views must be released before close()
+        finally:
+            ring.close()
+            ring.unlink()
+
+
+    def test_attach_rejects_other_layout_version(self):
+        """Test that readers built for another slot layout refuse to attach"""
+        import struct
+        import pytest
+        from shm_ring import SharedFrameRing
+
+        ring = SharedFrameRing.create(slots=2, slot_bytes=8)
+        try:
+            struct.pack_into('<H', ring._shm.buf, 4, 1)  # Version field of a flags-less producer
+            with pytest.raises(ValueError, match="version 1"):
+                SharedFrameRing.attach(ring.name)
+        finally:
+            ring.close()
+            ring.unlink()
+
+class TestProcessPipeline:
+    """Tests for process mode"""
+
+    def test_result_serialization(self):
+        """Test that tactical results survive the JSON result ring format"""
+        from process_pipeline import result_to_bytes, result_from_bytes
+        from ai.tactical_detector import Detection, TacticalResult
+
+        result = TacticalResult([Detection("person", 0.9, (0.1, 0.2, 0.3, 0.4), 0.04, track_id=2)],
+                                True, "person", 4.0, frame_id=9, range_cm=35)
+        decoded, detect_time = result_from_bytes(result_to_bytes(result, 12.5))
+        assert decoded == result
+        assert detect_time == 12.5
+
+    def test_frames_relayed_from_ingest_process(self, tmp_path):
+        """Test that the ingest process feeds the API-side buffer through shared memory"""
+        import time
+        import cv2
+        import numpy as np
+        from ai import AIConfig
+        from process_pipeline import ProcessPipeline
+
+        for i in range(5):
+            _, jpeg = cv2.imencode('.jpg', np.full((48, 64, 3), i * 40, np.uint8))
+            (tmp_path / f"{i:03d}.jpg").write_bytes(jpeg.tobytes())
+
+        pipeline = ProcessPipeline(
+            source={'mode': 'replay', 'replay_path': str(tmp_path), 'replay_fps': 20},
+            config=AIConfig(), max_frame_shape=(48, 64, 3)
+        )
+        pipeline.start()
+        try:
+            for _ in range(300):
+                trace = pipeline.frame_buffer.get_frame_trace()
+                if trace is not None and trace.frame_id == 5:
+                    break
+                time.sleep(0.02)
+            assert pipeline.frame_buffer.get_frame_trace().frame_id == 5
+            assert pipeline.frame_buffer.trace_for(5) is not None
+            assert pipeline.rings['decoded'].read_latest().to_array().shape == (48, 64, 3)
+            assert pipeline.get_status()['ingest']['alive']
+        finally:
+            pipeline.stop()
+
+
+    def test_static_mark_relayed_from_ingest(self):
+        """Test that the ingest change-gate mark survives the JPEG ring"""
+        import time
+        import cv2
+        import numpy as np
+        from process_pipeline import RingFrameBuffer
+        from shm_ring import FLAG_STATIC, SharedFrameRing
+
+        jpeg_ring = SharedFrameRing.create(slots=4, slot_bytes=64 * 1024)
+        status_ring = SharedFrameRing.create(slots=2, slot_bytes=1024)
+        relay = RingFrameBuffer(jpeg_ring, status_ring)
+        try:
+            _, jpeg = cv2.imencode('.jpg', np.zeros((48, 64, 3), np.uint8))
+            for frame_id, flags in ((1, 0), (2, FLAG_STATIC)):
+                jpeg_ring.write(jpeg.tobytes(), frame_id=frame_id, flags=flags)
+                for _ in range(100):  # The follower only reads the newest frame
+                    if relay.trace_for(frame_id) is not None:
+                        break
+                    time.sleep(0.01)
+            assert not relay.trace_for(1).static
+            assert relay.trace_for(2).static
+        finally:
+            relay.stop()
+            for ring in (jpeg_ring, status_ring):
+                ring.close()
+                ring.unlink()
+
+class TestFleet:
+    """Tests for multi-rover hosting"""
+
+    def test_shared_detector_batches_concurrent_requests(self):
+        """Test that requests from several rovers share one model call"""
+        import threading
+        import numpy as np
+        from ai import SharedDetector
+        from ai.tactical_detector import TacticalResult
+
+        class _BatchModel:
+            calls = []
+
+            def is_ready(self):
+                return True
+
+            def detect_batch(self, frames, confidence=None, imgsz=None):
+                self.calls.append(len(frames))
+                return [TacticalResult([], False, None, 1.0, frame_id=int(f[0, 0, 0])) for f in frames]
+
+        shared = SharedDetector(max_batch=4, batch_window_ms=200)
+        shared._detector = _BatchModel()
+        threading.Thread(target=shared._batch_loop, daemon=True).start()
+
+        results = {}
+        def rover(i):
+            results[i] = shared.detect(np.full((4, 4, 3), i, np.uint8))
+        threads = [threading.Thread(target=rover, args=(i,)) for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=2)
+
+        assert {i: r.frame_id for i, r in results.items()} == {0: 0, 1: 1, 2: 2}
+        assert _BatchModel.calls == [3]
+
+    def test_fair_share_serves_least_served_rover_first(self):
+        """Test that a waiting rover served less often goes ahead of a busy one"""
+        from ai import AIConfig, FairShareVLM
+
+        config = AIConfig()
+        vlm = FairShareVLM(navigator=None, max_concurrent=1)
+        vlm.client("alpha", config)
+        vlm.client("bravo", config)
+        vlm._served["alpha"] = 5
+
+        vlm._waiting = {"alpha": 1, "bravo": 2}
+        assert vlm._next() == "bravo"
+        vlm._served["bravo"] = 5
+        assert vlm._next() == "alpha"  # Tie goes to the earlier arrival
+
+        vlm._waiting = {}
+        assert vlm.client("charlie", config) is not None
+        assert vlm.get_status()['served']["charlie"] == 5
+
+    def test_load_fleet_rejects_duplicate_ids(self, tmp_path):
+        """Test fleet config parsing"""
+        import json
+        import pytest
+        from fleet import load_fleet
+
+        path = tmp_path / "fleet.json"
+        path.write_text(json.dumps({'rovers': [
+            {'id': 'alpha', 'ip': '10.0.0.2', 'serial_port': '/dev/ttyUSB0'},
+            {'id': 'bravo', 'camera': {'mode': 'udp', 'port': 9998}, 'serial_port': '/dev/ttyUSB1'},
+        ]}))
+        alpha, bravo = load_fleet(str(path))
+        assert alpha.frame_source() == {'mode': 'http', 'http_url': 'http://10.0.0.2/stream',
+                                        'control_url': 'http://10.0.0.2:81/control'}
+        assert bravo.frame_source() == {'mode': 'udp', 'port': 9998}
+
+        path.write_text(json.dumps({'rovers': [{'id': 'alpha', 'serial_port': '/dev/ttyUSB0'},
+                                               {'id': 'alpha', 'serial_port': '/dev/ttyUSB1'}]}))
+        with pytest.raises(ValueError):
+            load_fleet(str(path))
+
+        path.write_text(json.dumps({'rovers': [{'id': 'alpha', 'ip': '10.0.0.2'}]}))
+        with pytest.raises(ValueError):
+            load_fleet(str(path))  # No auto-detect for fleet rovers
+
+    def test_registry_rejects_taken_serial_ports(self):
+        """Test that a fleet rover cannot share a serial port with another rover"""
+        import pytest
+        from fleet import RoverRegistry, RoverSpec
+
+        registry = RoverRegistry(reserved_ports=['/dev/ttyUSB0'])
+        for spec in (RoverSpec('alpha', ip='10.0.0.2', serial_port='/dev/ttyUSB0'),
+                     RoverSpec('bravo', ip='10.0.0.3')):
+            with pytest.raises(ValueError):
+                registry.add(spec)
+        assert len(registry) == 0
+
+    def test_shared_navigator_warms_up_once(self):
+        """Test that rovers warming up together open one session and warm up once"""
+        import threading
+        from ai import AIConfig, FairShareVLM, StrategicNavigator
+
+        config = AIConfig()
+        navigator = StrategicNavigator(config)
+        calls = []
+        original = navigator.warmup
+        navigator.warmup = lambda: calls.append(1) or original()
+        vlm = FairShareVLM(navigator)
+        clients = [vlm.client(f"rover{i}", config) for i in range(4)]
+
+        sessions = []
+        threads = [threading.Thread(target=lambda c=c: (c.warmup(), sessions.append(navigator._get_session())))
+                   for c in clients]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert calls == [1]
+        assert len(sessions) == 4 and all(s is sessions[0] for s in sessions)
+
+
+class TestStartup:
+    """Tests for deferred imports and concurrent model loading"""
+
+    def test_heavy_modules_not_imported(self):
+        """Test that importing the AI worker leaves cv2, PIL and requests unloaded"""
+        import subprocess
+
+        code = ("import sys, llm_worker; "
+                "print(sorted(m for m in ('cv2', 'PIL', 'requests', 'ultralytics') if m in sys.modules))")
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        assert out.stdout.strip() == "[]"
+
+    def test_models_load_concurrently_and_report_readiness(self):
+        """Test that both models load in parallel and warm up before they are used"""
+        import time
+        from ai import AIConfig, CommandArbiter
+        from camera_reassembler import FrameBuffer
+        from mission_log import MissionLog
+        from llm_worker import AIWorker
+
+        class _SlowModel:
+            def __init__(self):
+                self.warm = False
+
+            def load(self):
+                time.sleep(0.2)
+
+            def is_ready(self):
+                return True
+
+            def warmup(self):
+                time.sleep(0.05)
+                self.warm = True
+                return 50.0
+
+        detector, strategic = _SlowModel(), _SlowModel()
+        strategic.is_ready = lambda: time.sleep(0.2) or True  # Navigators have no load()
+
+        worker = AIWorker(FrameBuffer(mode='relay'), MissionLog(capacity=10), CommandArbiter(),
+                          config=AIConfig(fusion_enabled=False, tracker_enabled=False),
+                          detector=detector, strategic=strategic)
+        assert worker.get_readiness()['ready'] is False
+
+        started = time.perf_counter()
+        worker._load_models()
+        elapsed = time.perf_counter() - started
+
+        readiness = worker.get_readiness()
+        assert readiness['ready']
+        assert {c['state'] for c in readiness['components'].values()} == {'ready'}
+        assert readiness['components']['tactical']['warmup_ms'] == 50.0
+        assert worker.tactical is detector and detector.warm
+        assert elapsed < 0.5  # Sequential loading would take ~0.7s
+
+    def test_warmup_covers_corridor_and_escalated_shapes(self):
+        """Test that warm-up uses the shapes the tactical loop will feed"""
+        from ai import AIConfig
+        from ai.tactical_detector import warmup_shapes
+
+        config = AIConfig(input_width=320, input_height=240, drive_corridor_roi=(0.25, 0.5, 0.75, 1.0),
+                          yolo_imgsz=320, escalated_imgsz=640, governor_imgsz_steps=(256,))
+        assert warmup_shapes(config) == [((240, 320, 3), None), ((120, 160, 3), None),
+                                         ((240, 320, 3), 640), ((240, 320, 3), 256)]
+        assert warmup_shapes(AIConfig(fusion_enabled=False, governor_enabled=False)) == [((240, 320, 3), None)]
+
+
+class TestModelArtifactCache:
+    """Tests for the exported-model cache"""
+
+    def test_export_reused_across_restarts(self, tmp_path):
+        """Test that a key is exported once and a new cache instance finds it"""
+        from ai import ModelArtifactCache
+
+        weights = tmp_path / "yolov8n.pt"
+        weights.write_bytes(b"weights-v1")
+        exports = []
+
+        def export():
+            out = tmp_path / f"export-{len(exports)}.onnx"
+            out.write_bytes(b"onnx")
+            exports.append(out)
+            return str(out)
+
+        first = ModelArtifactCache(str(tmp_path / "cache")).get(str(weights), 640, "onnx", export)
+        second = ModelArtifactCache(str(tmp_path / "cache")).get(str(weights), 640, "onnx", export)
+        assert first == second
+        assert open(first, 'rb').read() == b"onnx"
+        assert len(exports) == 1
+
+        ModelArtifactCache(str(tmp_path / "cache")).get(str(weights), 320, "onnx", export)
+        assert len(exports) == 2  # Input size is part of the key
+
+    def test_changed_weights_change_key(self, tmp_path):
+        """Test that retrained weights do not reuse the old artifact"""
+        import os
+        from ai import ModelArtifactCache
+
+        weights = tmp_path / "yolov8n.pt"
+        weights.write_bytes(b"weights-v1")
+        cache = ModelArtifactCache(str(tmp_path / "cache"))
+        old = cache.entry_dir(str(weights), 640, "onnx")
+
+        weights.write_bytes(b"weights-v2-longer")
+        os.utime(weights, ns=(1, 1))
+        assert cache.entry_dir(str(weights), 640, "onnx") != old
+        assert cache.lookup(str(weights), 640, "onnx") is None
+
+
+class TestRateGovernor:
+    """Tests for the tactical rate governor"""
+
+    def test_sleep_subtracts_processing_time(self):
+        """Test that the loop sleeps only what is left of the deadline"""
+        from ai import AIConfig
+        from ai.rate_governor import RateGovernor
+
+        governor = RateGovernor(AIConfig(yolo_target_latency=40))
+        assert abs(governor.sleep_time(10.0, now=10.015) - 0.025) < 1e-9
+        assert governor.sleep_time(10.0, now=10.050) == 0.0
+        assert governor.get_status()['deadline_misses'] == 1
+
+    def test_degrades_when_behind_and_recovers(self):
+        """Test stepping down the quality ladder under load and back up with headroom"""
+        from ai import AIConfig
+        from ai.rate_governor import RateGovernor
+
+        config = AIConfig(yolo_target_latency=40, yolo_imgsz=640, governor_imgsz_steps=(480, 320),
+                          detect_every_n_frames=3, governor_patience=5)
+        governor = RateGovernor(config)
+        assert [(q.imgsz, q.detect_every) for q in governor.levels] == [(640, 3), (480, 3), (320, 3), (320, 6)]
+
+        for _ in range(5):
+            governor.sleep_time(0.0, now=0.060)  # 1.5x the period
+        assert governor.quality.imgsz == 480
+
+        for _ in range(15):
+            governor.sleep_time(0.0, now=0.010)
+        assert governor.level == 0
+        assert governor.get_status()['level_changes'] == 2
+
+    def test_disabled_keeps_full_quality(self):
+        """Test that a disabled governor only paces"""
+        from ai import AIConfig
+        from ai.rate_governor import RateGovernor
+
+        governor = RateGovernor(AIConfig(governor_enabled=False, governor_patience=1))
+        for _ in range(10):
+            governor.sleep_time(0.0, now=1.0)
+        assert governor.level == 0
+
+    def test_static_frames_do_not_mask_overload(self):
+        """Test that paced idle iterations leave the load estimate to detection frames"""
+        from ai import AIConfig
+        from ai.rate_governor import RateGovernor
+
+        governor = RateGovernor(AIConfig(yolo_target_latency=40, governor_patience=5))
+        for _ in range(5):
+            governor.sleep_time(0.0, now=0.060)
+            assert abs(governor.pace(0.0, now=0.001) - 0.039) < 1e-9
+        assert governor.level == 1
+        assert governor.get_status()['deadline_misses'] == 5  # Of 5 charged iterations
+
+    def test_quality_reaches_tracker(self):
+        """Test that run_tactical applies the governor level except when escalated"""
+        import numpy as np
+        from ai import AIConfig, TrackedDetector, CorridorDetector
+        from ai.rate_governor import QualityLevel
+        from llm_worker import run_tactical
+
+        config = AIConfig(yolo_imgsz=640, detect_every_n_frames=1)
+        inner = TestSensorFusion._CenterDetector()
+        corridor = CorridorDetector(inner, config)
+        tracked = TrackedDetector(corridor, config)
+        frame = np.zeros((240, 320, 3), np.uint8)
+
+        run_tactical(inner, corridor, tracked, frame, None, config, QualityLevel(320, 2))
+        run_tactical(inner, corridor, tracked, frame, None, config, QualityLevel(320, 2))
+        assert [imgsz for _, imgsz in inner.calls] == [320]  # Second frame extrapolated
+
+        run_tactical(inner, corridor, tracked, frame, 50, config, QualityLevel(320, 2))
+        assert inner.calls[-1][1] == config.escalated_imgsz
+
+
+class TestLinkQuality:
+    """Tests for camera link scoring and profile negotiation"""
+
+    def test_score_reflects_jitter_loss_and_stalls(self):
+        """Test that steady frames score high and jitter, loss and stalls lower it"""
+        from link_quality import LinkMonitor
+
+        steady = LinkMonitor(window=2.0, stall_after=1.0)
+        for i in range(40):
+            steady.on_frame(5000, now=i * 0.05)
+        assert steady.score(now=1.96) > 0.95
+
+        lossy = LinkMonitor(window=2.0, stall_after=1.0)
+        for i in range(40):
+            lossy.on_frame(5000, now=i * 0.05 + (0.04 if i % 2 else 0.0))
+            if i % 4 == 0:
+                lossy.on_loss(now=i * 0.05)
+        assert lossy.score(now=2.0) < 0.6
+        assert lossy.get_status(now=2.0)['loss_ratio'] > 0.15
+
+        assert steady.score(now=3.5) == 0.0  # Stalled
+
+    def test_negotiator_degrades_and_recovers(self):
+        """Test that a low score steps the profile down and a healthy one back up"""
+        from link_quality import LinkMonitor, QualityNegotiator, DEFAULT_PROFILES
+
+        class _Control:
+            def __init__(self):
+                self.applied = []
+                self.fail = False
+
+            def apply(self, profile):
+                if self.fail:
+                    return False
+                self.applied.append(profile)
+                return True
+
+        class _Scored(LinkMonitor):
+            value = 0.2
+
+            def score(self, now=None):
+                return self.value
+
+        monitor, control = _Scored(), _Control()
+        monitor.on_frame(5000, now=0.0)  # Stream is up; the scripted score applies
+        negotiator = QualityNegotiator(monitor, control, hold=1.0)
+        for t in range(4):
+            negotiator.evaluate(now=float(t))
+        assert control.applied == [DEFAULT_PROFILES[1], DEFAULT_PROFILES[2]]
+
+        monitor.value = 0.95
+        control.fail = True
+        for t in range(4, 8):
+            negotiator.evaluate(now=float(t))
+        assert negotiator.level == 1
+        assert not negotiator.get_status()['acknowledged']
+
+        control.fail = False
+        negotiator.evaluate(now=8.0)
+        assert control.applied[-1] == DEFAULT_PROFILES[1]  # Retried until acknowledged
+
+
+    def test_negotiator_waits_for_first_frame(self):
+        """Test that connecting (nothing received yet) does not count as a degraded link"""
+        from link_quality import LinkMonitor, QualityNegotiator
+
+        class _Control:
+            applied = []
+
+            def apply(self, profile):
+                self.applied.append(profile)
+                return True
+
+        monitor, control = LinkMonitor(stall_after=1.0), _Control()
+        negotiator = QualityNegotiator(monitor, control, hold=1.0)
+        for t in range(10):
+            negotiator.evaluate(now=float(t))
+        assert negotiator.level == 0 and control.applied == []
+
+        monitor.on_frame(5000, now=10.0)  # Then the stream stalls
+        for t in range(10, 14):
+            negotiator.evaluate(now=float(t))
+        assert negotiator.level > 0
+
+        monitor.on_connect()  # Reconnect: waiting for frames again
+        level = negotiator.level
+        for t in range(14, 20):
+            negotiator.evaluate(now=float(t))
+        assert negotiator.level == level
+
+class TestJitterBuffer:
+    """Tests for display frame pacing"""
+
+    def test_bursts_are_spread_to_cadence(self):
+        """Test that bursty arrivals get evenly spaced playout times within the delay bound"""
+        from jitter_buffer import JitterBuffer
+
+        buffer = JitterBuffer(lambda item: None, max_delay=0.1)
+        try:
+            # 30 FPS on average, but frames land in pairs 2 ms apart
+            arrivals = []
+            for i in range(30):
+                arrivals += [i * 0.066, i * 0.066 + 0.002]
+            playouts = [buffer.schedule(t) for t in arrivals]
+
+            gaps = [b - a for a, b in zip(playouts[-20:], playouts[-19:])]
+            assert min(gaps) > 0.02  # No more 2 ms double frames
+            assert all(p >= t for p, t in zip(playouts, arrivals))
+            assert all(p - t <= 0.1 + 1e-9 for p, t in zip(playouts, arrivals))
+        finally:
+            buffer.stop()
+
+    def test_overtaken_frame_dropped(self):
+        """Test that an item is skipped when a newer one is already due"""
+        import time
+        from jitter_buffer import JitterBuffer
+
+        played = []
+        buffer = JitterBuffer(played.append, max_delay=0.0)
+        try:
+            now = time.perf_counter()
+            with buffer._cond:  # Queue both before the playout thread looks
+                buffer._queue.extend([(now - 0.2, "old"), (now - 0.1, "new")])
+                buffer._cond.notify()
+            time.sleep(0.1)
+            assert played == ["new"]
+            assert buffer.stats['dropped_late'] == 1
+        finally:
+            buffer.stop()
+
+    def test_raw_frames_bypass_buffer(self):
+        """Test that AI sees frames at once while the display follows the playout"""
+        import time
+        from camera_reassembler import FrameBuffer
+
+        fb = FrameBuffer(mode='none', jitter_buffer=True)
+        try:
+            fb._jitter._max_delay = fb._jitter._min_delay = 0.05
+            for i in range(3):
+                fb.feed_frame(b"frame%d" % i)
+            assert fb.get_raw_frame() == b"frame2"
+            assert fb.get_frame() is None  # Display still waiting for playout
+
+            time.sleep(0.3)
+            assert fb.get_frame() == b"frame2"
+            assert fb.get_paced_frame_with_trace()[1].frame_id == 3
+        finally:
+            fb.stop()
+
+
+class TestUdpFec:
+    """Tests for chunked UDP frames with parity"""
+
+    def test_lost_chunks_recovered(self):
+        """Test that up to `parity` lost chunks per group are rebuilt without retransmission"""
+        import os
+        from udp_fec import encode_frame, FecReassembler
+
+        jpeg = os.urandom(9000)  # 9 chunks: a full group of 8 and a short tail group
+        # Datagram order is D0..D7, P(, Q), D8, P(, Q): {9} = the tail, {7, 8} = D7 + P
+        for parity, dropped in [(1, {3}), (1, {9}), (2, {0, 5}), (2, {7, 8})]:
+            reassembler = FecReassembler()
+            datagrams = encode_frame(jpeg, frame_id=1, parity=parity)
+            out = [reassembler.add(d, now=0.0) for i, d in enumerate(datagrams) if i not in dropped]
+            assert [f for f in out if f is not None] == [jpeg]
+            assert reassembler.get_status()['frames_recovered'] == 1
+
+    def test_unrecoverable_frame_counted_lost(self):
+        """Test that too many lost chunks expire the frame and show in the recovery rate"""
+        import os
+        from udp_fec import encode_frame, FecReassembler
+
+        reassembler = FecReassembler(timeout=0.1)
+        datagrams = encode_frame(os.urandom(5000), frame_id=1, parity=1)
+        for d in datagrams[2:]:  # Two data chunks of one XOR group
+            assert reassembler.add(d, now=0.0) is None
+        jpeg = os.urandom(3000)
+        frames = [reassembler.add(d, now=0.2) for d in encode_frame(jpeg, frame_id=2, parity=1)[1:]]
+
+        assert frames[-1] == jpeg
+        status = reassembler.get_status()
+        assert status['frames_lost'] == 1
+        assert status['recovery_rate'] == 0.5
+        assert status['overhead_ratio'] > 0
+
+    def test_headerless_datagram_passes_through(self):
+        """Test that a legacy whole-JPEG datagram is returned unchanged"""
+        from udp_fec import FecReassembler
+
+        reassembler = FecReassembler()
+        jpeg = b'\xff\xd8' + b'\x00' * 200 + b'\xff\xd9'
+        assert reassembler.add(jpeg) == jpeg
+        assert reassembler.stats['legacy_packets'] == 1
+
+
+class TestPartialJpeg:
+    """Tests for restart-interval concealment of incomplete frames"""
+
+    def _encode(self, shift):
+        import cv2
+        import numpy as np
+        rng = np.random.default_rng(0)
+        img = cv2.GaussianBlur((rng.random((240, 320, 3)) * 255).astype(np.uint8), (15, 15), 0)
+        img = np.roll(img, shift, axis=1)
+        return img, cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_RST_INTERVAL, 20])[1].tobytes()
+
+    def test_lost_intervals_filled_from_previous_frame(self):
+        """Test that intact intervals keep fresh pixels and lost ones come from the reference"""
+        import cv2
+        import numpy as np
+        from jpeg_repair import RestartRepairer, parse_layout
+
+        _, previous = self._encode(0)
+        current_img, current = self._encode(5)
+        assert parse_layout(current).intervals == 15  # One interval per MCU row
+
+        repairer = RestartRepairer()
+        repairer.remember(previous)
+        missing = [(2000, 3024), (len(current) - 500, len(current))]
+        damaged = bytearray(current)
+        for start, end in missing:
+            damaged[start:end] = bytes(end - start)
+
+        repaired = cv2.imdecode(np.frombuffer(repairer.repair(bytes(damaged), missing), np.uint8), 1)
+        assert repaired.shape == current_img.shape
+        exact = cv2.imdecode(np.frombuffer(current, np.uint8), 1)
+        fresh_rows = (np.abs(repaired.astype(int) - exact).mean(axis=(1, 2)) < 1).mean()
+        assert 0.7 < fresh_rows < 1.0
+        assert repairer.stats['repaired'] == 1
+
+    def test_without_restart_markers_unrepairable(self):
+        """Test that a JPEG without DRI is not patched"""
+        import cv2
+        import numpy as np
+        from jpeg_repair import RestartRepairer
+
+        jpeg = cv2.imencode('.jpg', np.zeros((64, 64, 3), np.uint8))[1].tobytes()
+        repairer = RestartRepairer()
+        repairer.remember(jpeg)
+        assert repairer.repair(jpeg, [(len(jpeg) - 10, len(jpeg))]) is None
+        assert repairer.stats['unrepairable'] == 1
+
+    def test_reassembler_hands_over_partial_frame(self):
+        """Test that a frame FEC can't rebuild comes out with its lost byte ranges"""
+        from udp_fec import encode_frame, FecReassembler
+
+        _, jpeg = self._encode(0)
+        reassembler = FecReassembler(keep_partial=True, timeout=0.1)
+        datagrams = encode_frame(jpeg, frame_id=1, parity=1)
+        for d in datagrams[:2] + datagrams[4:]:  # Data chunks 2 and 3 lost
+            reassembler.add(d, now=0.0)
+        reassembler.add(encode_frame(b'next', frame_id=2)[0], now=0.2)
+
+        [(data, missing)] = reassembler.take_partials()
+        assert missing == [(2048, 4096)]
+        assert data[:2048] == jpeg[:2048] and data[4096:] == jpeg[4096:]
+        assert reassembler.take_partials() == []
+
+
+class TestChangeDetector:
+    """Tests for static-frame marking at ingest"""
+
+    def _jpeg(self, img):
+        import cv2
+        return cv2.imencode('.jpg', img)[1].tobytes()
+
+    def _scene(self, seed=0):
+        import cv2
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        return cv2.GaussianBlur((rng.random((240, 320, 3)) * 255).astype(np.uint8), (9, 9), 0)
+
+    def test_noise_is_static_and_motion_is_not(self):
+        """Test that sensor noise stays static while a small moving object does not"""
+        import numpy as np
+        from change_detector import ChangeDetector
+
+        detector = ChangeDetector(refresh_interval=10.0)
+        scene = self._scene()
+        assert not detector.is_static(self._jpeg(scene), now=0.0)  # First frame is the reference
+
+        noisy = np.clip(scene.astype(int) + np.random.default_rng(1).integers(-3, 4, scene.shape), 0, 255)
+        assert detector.is_static(self._jpeg(noisy.astype(np.uint8)), now=0.1)
+
+        moved = scene.copy()
+        moved[100:140, 150:190] = 255  # ~40x40 px object
+        assert not detector.is_static(self._jpeg(moved), now=0.2)
+
+    def test_forced_refresh(self):
+        """Test that an unchanged scene is still passed on once per refresh interval"""
+        from change_detector import ChangeDetector
+
+        detector = ChangeDetector(refresh_interval=0.25)
+        jpeg = self._jpeg(self._scene())
+        marks = [detector.is_static(jpeg, now=i * 0.05) for i in range(12)]
+        assert marks.count(False) == 3  # t = 0, 0.25, 0.50
+        assert detector.stats['refreshes'] == 2
+
+    def test_frame_buffer_marks_trace(self):
+        """Test that FrameBuffer flags static frames in their trace but still displays them"""
+        from camera_reassembler import FrameBuffer
+
+        fb = FrameBuffer(mode='none', change_gate=True)
+        jpeg = self._jpeg(self._scene())
+        first = fb.feed_frame(jpeg)
+        second = fb.feed_frame(jpeg)
+        assert not first.static and second.static
+        assert fb.get_frame() == jpeg
+        assert fb.get_link_status()['change_gate']['static'] == 1
+        fb.stop()
+
+
+class TestFrameExport:
+    """Tests for the shared-memory frame export"""
+
+    def test_reader_gets_jpeg_and_decoded_frame(self):
+        """Test that frames fed to FrameBuffer reach an attached reader with id and shape"""
+        import uuid
+        import cv2
+        import numpy as np
+        from camera_reassembler import FrameBuffer
+        from frame_export import FrameExporter, FrameReader
+
+        name = f"rr-test-{uuid.uuid4().hex[:8]}"
+        exporter = FrameExporter(name, max_frame_shape=(64, 64, 3))
+        exporter.start()
+        fb = FrameBuffer(mode='none')
+        fb.add_frame_listener(exporter.frame_listener)
+        reader = FrameReader(name)
+        try:
+            img = np.full((48, 64, 3), 120, np.uint8)
+            jpeg = cv2.imencode('.jpg', img)[1].tobytes()
+            trace = fb.feed_frame(jpeg)
+
+            encoded = reader.latest_jpeg()
+            assert bytes(encoded.data) == jpeg and encoded.frame_id == trace.frame_id
+            decoded = reader.wait_frame(timeout=2.0)
+            assert decoded.shape == (48, 64, 3) and decoded.frame_id == trace.frame_id
+            assert abs(int(decoded.to_array().mean()) - 120) <= 2
+            assert reader.intact(decoded)
+            del encoded, decoded
+        finally:
+            reader.close()
+            fb.stop()
+            exporter.stop()
+
+    def test_oversize_frame_dropped(self):
+        """Test that a frame larger than a slot is counted, not raised to the receiver"""
+        import uuid
+        from tracer import FrameTrace
+        from frame_export import FrameExporter
+
+        exporter = FrameExporter(f"rr-test-{uuid.uuid4().hex[:8]}", jpeg_slot_bytes=16, decoded=False)
+        try:
+            exporter.frame_listener(b"x" * 32, FrameTrace(1, 0.0, 0.0))
+            assert exporter.get_status()['dropped'] == 1
+            assert exporter.get_status()['decoded_ring'] is None
+        finally:
+            exporter.stop()
+
+
 class TestRoverCommand:
     """Tests for RoverCommand creation"""
     
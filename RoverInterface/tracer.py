@@ -0,0 +1,133 @@
+# tracer.py
+"""
+Glass-to-Wheel Latency Tracer for Rescue Rover
+
+Every frame published by FrameBuffer gets a FrameTrace: a frame id, the
+capture time (best estimate: when the receiver got the frame, unless the
+source supplies one) and the time it was published. The trace travels
+with the frame through the AI layers (TacticalResult / StrategicResult
+carry its frame_id, RoverCommand carries the trace itself) and each
+stage adds a timestamp mark. When the command that frame caused is
+written to the serial gateway, the chain is closed:
+
+    capture -> receive -> decode -> detect/vlm -> decision -> serial_write
+
+End-to-end latency of every completed chain goes into the stage
+histograms (`glass_to_wheel` and per source); the full per-hop chain is
+kept for a sampled subset and exposed via `/api/trace`.
+
+All times are time.perf_counter() seconds.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from metrics import record, METRICS
+
+
+@dataclass
+class FrameTrace:
+    """Provenance of a single camera frame"""
+    frame_id: int
+    capture_time: float
+    receive_time: float
+    marks: Dict[str, float] = field(default_factory=dict)
+    completed: bool = False
+    static: bool = False  # Near-identical to the last changed frame (change_detector.py)
+
+    def mark(self, stage: str, t: Optional[float] = None):
+        """Record when a stage finished with this frame (first mark wins)."""
+        self.marks.setdefault(stage, t if t is not None else time.perf_counter())
+
+
+class GlassToWheelTracer:
+    """
+    Closes frame traces at the serial write and aggregates the results.
+    """
+
+    def __init__(self, sample_every: int = 10, history: int = 100):
+        """
+        Initialize tracer.
+
+        Args:
+            sample_every: Keep the detailed chain for every Nth completed trace
+            history: Number of detailed chains kept for /api/trace
+        """
+        self._sample_every = max(1, sample_every)
+        self._history: deque = deque(maxlen=history)
+        self._completed = 0
+        self._lock = threading.Lock()
+
+    def complete(self, trace: Optional[FrameTrace], source: str = '',
+                 decision_time: Optional[float] = None,
+                 write_time: Optional[float] = None) -> Optional[float]:
+        """
+        Close a trace when its command reaches the wire.
+
+        Args:
+            trace: FrameTrace carried by the command (None = untraced command)
+            source: Command source, e.g. 'YOLO' or 'VLM'
+            decision_time: When the arbiter picked the command
+            write_time: When bytes were written (default: now)
+
+        Returns:
+            End-to-end latency in seconds, or None if nothing was recorded
+        """
+        if trace is None or trace.completed:
+            return None
+        trace.completed = True
+
+        write_time = write_time if write_time is not None else time.perf_counter()
+        if decision_time is not None:
+            trace.mark('decision', decision_time)
+        trace.mark('serial_write', write_time)
+
+        latency = write_time - trace.capture_time
+        record('glass_to_wheel', latency)
+        if source:
+            record(f'glass_to_wheel_{source.lower()}', latency)
+
+        with self._lock:
+            self._completed += 1
+            if (self._completed - 1) % self._sample_every == 0:
+                self._history.append(self._chain(trace, source, latency))
+        return latency
+
+    def _chain(self, trace: FrameTrace, source: str, latency: float) -> dict:
+        """Per-hop breakdown (ms since capture, in stage order)."""
+        hops = [('receive', trace.receive_time)] + sorted(trace.marks.items(), key=lambda kv: kv[1])
+        return {
+            'frame_id': trace.frame_id,
+            'source': source,
+            'total_ms': round(latency * 1000, 3),
+            'stages': [
+                {'stage': stage, 'at_ms': round((t - trace.capture_time) * 1000, 3)}
+                for stage, t in hops
+            ]
+        }
+
+    def recent(self, count: int = 20) -> List[dict]:
+        """Most recent sampled chains, newest last."""
+        with self._lock:
+            return list(self._history)[-count:]
+
+    def get_status(self) -> dict:
+        """End-to-end distributions plus recent sampled chains."""
+        distributions = {
+            name: summary for name, summary in METRICS.snapshot().items()
+            if name.startswith('glass_to_wheel')
+        }
+        with self._lock:
+            completed = self._completed
+        return {
+            'completed': completed,
+            'distributions': distributions,
+            'recent': self.recent()
+        }
+
+
+# Process-wide tracer used by FrameBuffer consumers and SerialManager
+TRACER = GlassToWheelTracer()
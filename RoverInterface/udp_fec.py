@@ -0,0 +1,342 @@
+# udp_fec.py
+"""
+Chunked UDP Frames with Forward Error Correction for Rescue Rover
+
+Each JPEG is split into fixed-size data chunks; every group of
+`group_size` chunks is followed by 1 or 2 parity chunks:
+
+    P = D0 ^ D1 ^ ... ^ Dn-1                    (XOR, repairs 1 lost chunk)
+    Q = D0 ^ g*D1 ^ g^2*D2 ^ ... in GF(2^8)     (Reed-Solomon, with P repairs 2)
+
+so a frame missing up to `parity` chunks per group is rebuilt without a
+retransmission. Overhead is parity / group_size (1/8 = 12.5% by default).
+
+Datagram layout (little endian, 16-byte header, then payload):
+
+    magic 'RF' | version u8 | flags u8 (1 = parity) | frame_id u16 |
+    index u16 (data chunk, or group for parity) | data_chunks u16 |
+    group_size u8 | parity u8 | frame_len u32
+
+Datagrams without the magic are treated as whole JPEGs (legacy sender).
+With keep_partial, frames that could not be completed are kept with
+their lost byte ranges for concealment (jpeg_repair.py).
+Run `python udp_fec.py <host> <port> <jpeg dir> [--parity 2] [--loss 0.05]`
+for a reference sender.
+"""
+
+import struct
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b'RF'
+VERSION = 1
+FLAG_PARITY = 1
+HEADER = struct.Struct('<2sBBHHHBBI')
+
+# GF(2^8) with the RAID-6 polynomial x^8 + x^4 + x^3 + x^2 + 1, generator 2
+_EXP = np.zeros(512, dtype=np.uint8)
+_LOG = np.zeros(256, dtype=np.int32)
+_x = 1
+for _i in range(255):
+    _EXP[_i] = _x
+    _LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100:
+        _x ^= 0x11d
+_EXP[255:510] = _EXP[:255]
+
+
+def _gf_mul(data: np.ndarray, log_c: int) -> np.ndarray:
+    """Multiply every byte by g^log_c."""
+    out = np.zeros_like(data)
+    nz = data != 0
+    out[nz] = _EXP[(_LOG[data[nz]] + log_c) % 255]
+    return out
+
+
+def _gf_div_log(a: int, b: int) -> int:
+    """log(a / b) for nonzero field elements a, b."""
+    return (_LOG[a] - _LOG[b]) % 255
+
+
+def _parity(chunks: List[np.ndarray], count: int) -> List[np.ndarray]:
+    """P (and Q) over one group; Q weights the group's i-th chunk by g^i."""
+    p = np.bitwise_xor.reduce(chunks)
+    if count == 1:
+        return [p]
+    q = np.zeros_like(p)
+    for i, chunk in enumerate(chunks):
+        q ^= _gf_mul(chunk, i)
+    return [p, q]
+
+
+def encode_frame(jpeg: bytes, frame_id: int, chunk_size: int = 1024,
+                 group_size: int = 8, parity: int = 1) -> List[bytes]:
+    """
+    Split a JPEG into data + parity datagrams.
+
+    Args:
+        jpeg: Encoded frame
+        frame_id: Sequence number (wraps at 65536)
+        chunk_size: Payload bytes per datagram
+        group_size: Data chunks per parity group
+        parity: Parity chunks per group (0 = none, 1 = XOR, 2 = XOR + RS)
+
+    Returns:
+        Datagrams in send order (each group's data, then its parity)
+    """
+    if parity not in (0, 1, 2):
+        raise ValueError("parity must be 0, 1 or 2")
+    frame_id &= 0xFFFF
+    count = max(1, -(-len(jpeg) // chunk_size))
+    padded = np.zeros(count * chunk_size, dtype=np.uint8)
+    padded[:len(jpeg)] = np.frombuffer(jpeg, dtype=np.uint8)
+    chunks = padded.reshape(count, chunk_size)
+
+    datagrams = []
+    for group, start in enumerate(range(0, count, group_size)):
+        members = range(start, min(start + group_size, count))
+        for i in members:
+            header = HEADER.pack(MAGIC, VERSION, 0, frame_id, i, count, group_size, parity, len(jpeg))
+            size = chunk_size if i < count - 1 else len(jpeg) - i * chunk_size
+            datagrams.append(header + chunks[i, :size].tobytes())
+        if parity:
+            for k, block in enumerate(_parity([chunks[i] for i in members], parity)):
+                header = HEADER.pack(MAGIC, VERSION, FLAG_PARITY, frame_id, group * 2 + k,
+                                     count, group_size, parity, len(jpeg))
+                datagrams.append(header + block.tobytes())
+    return datagrams
+
+
+class _Frame:
+    __slots__ = ('count', 'group_size', 'parity', 'frame_len', 'chunk_size',
+                 'data', 'parity_blocks', 'first_seen', 'recovered')
+
+    def __init__(self, count, group_size, parity, frame_len, now):
+        self.count = count
+        self.group_size = group_size
+        self.parity = parity
+        self.frame_len = frame_len
+        self.chunk_size: Optional[int] = None
+        self.data: Dict[int, np.ndarray] = {}
+        self.parity_blocks: Dict[int, np.ndarray] = {}  # group * 2 + k -> block
+        self.first_seen = now
+        self.recovered = 0
+
+
+class FecReassembler:
+    """
+    Rebuilds frames from FEC datagrams (possibly out of order, some lost).
+    """
+
+    def __init__(self, timeout: float = 0.25, max_pending: int = 8, keep_partial: bool = False):
+        """
+        Initialize reassembler.
+
+        Args:
+            timeout: Seconds a partial frame waits for more chunks
+            max_pending: Partial frames kept at once (oldest given up first)
+            keep_partial: Keep frames given up on for take_partials()
+        """
+        self._timeout = timeout
+        self._max_pending = max_pending
+        self._keep_partial = keep_partial
+        self._partials: List[Tuple[bytes, List[Tuple[int, int]]]] = []
+        self._frames: "OrderedDict[int, _Frame]" = OrderedDict()
+        self._done: "OrderedDict[int, None]" = OrderedDict()  # Recently emitted ids
+        self.stats = {
+            'data_packets': 0, 'parity_packets': 0, 'legacy_packets': 0,
+            'frames': 0, 'frames_recovered': 0, 'chunks_recovered': 0, 'frames_lost': 0,
+        }
+
+    def add(self, datagram: bytes, now: float = None) -> Optional[bytes]:
+        """
+        Feed one datagram.
+
+        Returns:
+            The completed JPEG when this datagram finishes a frame, else None
+        """
+        now = time.perf_counter() if now is None else now
+        self._expire(now)
+        if len(datagram) < HEADER.size or datagram[:2] != MAGIC:
+            self.stats['legacy_packets'] += 1
+            return datagram
+
+        _, version, flags, frame_id, index, count, group_size, parity, frame_len = \
+            HEADER.unpack_from(datagram)
+        if version != VERSION or frame_id in self._done:
+            return None
+        payload = np.frombuffer(datagram, dtype=np.uint8, offset=HEADER.size)
+
+        frame = self._frames.get(frame_id)
+        if frame is None:
+            frame = self._frames[frame_id] = _Frame(count, group_size, parity, frame_len, now)
+            while len(self._frames) > self._max_pending:
+                self._give_up(next(iter(self._frames)))
+
+        if flags & FLAG_PARITY:
+            self.stats['parity_packets'] += 1
+            frame.chunk_size = len(payload)
+            frame.parity_blocks[index] = payload
+            group = index // 2
+        else:
+            self.stats['data_packets'] += 1
+            if index < count - 1:
+                frame.chunk_size = len(payload)
+            frame.data[index] = payload
+            group = index // group_size
+
+        if len(frame.data) < frame.count and frame.chunk_size:
+            self._recover(frame, group)
+        if len(frame.data) == frame.count:
+            return self._complete(frame_id, frame)
+        return None
+
+    def _recover(self, frame: _Frame, group: int):
+        """Rebuild the group's lost data chunks if enough parity arrived."""
+        start = group * frame.group_size
+        members = list(range(start, min(start + frame.group_size, frame.count)))
+        missing = [i for i in members if i not in frame.data]
+        p = frame.parity_blocks.get(group * 2)
+        q = frame.parity_blocks.get(group * 2 + 1)
+        if not missing or len(missing) > (p is not None) + (q is not None):
+            return
+
+        size = frame.chunk_size
+
+        def padded(i):
+            chunk = frame.data[i]
+            if len(chunk) == size:
+                return chunk
+            out = np.zeros(size, dtype=np.uint8)
+            out[:len(chunk)] = chunk
+            return out
+
+        present = [i for i in members if i in frame.data]
+        if len(missing) == 1 and p is not None:
+            rebuilt = {missing[0]: np.bitwise_xor.reduce([p] + [padded(i) for i in present])}
+        elif len(missing) == 1:
+            # Q only: D_x = (Q ^ sum g^i D_i) / g^x
+            x = missing[0]
+            qx = q.copy()
+            for i in present:
+                qx ^= _gf_mul(padded(i), i - start)
+            rebuilt = {x: _gf_mul(qx, -(x - start) % 255)}
+        else:
+            # P and Q, two erasures x < y (RAID-6 recovery)
+            x, y = missing
+            pxy = np.bitwise_xor.reduce([p] + [padded(i) for i in present])
+            qxy = q.copy()
+            for i in present:
+                qxy ^= _gf_mul(padded(i), i - start)
+            gyx = _EXP[(y - x) % 255]
+            denom = int(gyx ^ 1)
+            a_log = _gf_div_log(int(gyx), denom)  # g^(y-x) / (g^(y-x) + 1)
+            b_log = (-(x - start) - _LOG[denom]) % 255  # g^-x / (g^(y-x) + 1)
+            dx = _gf_mul(pxy, a_log) ^ _gf_mul(qxy, b_log)
+            rebuilt = {x: dx, y: pxy ^ dx}
+
+        for i, chunk in rebuilt.items():
+            if i == frame.count - 1:
+                chunk = chunk[:frame.frame_len - i * size]
+            frame.data[i] = chunk
+        frame.recovered += len(rebuilt)
+
+    def _complete(self, frame_id: int, frame: _Frame) -> bytes:
+        del self._frames[frame_id]
+        # Frames are sent one after another: older incomplete ones won't finish now
+        for older in [f for f, fr in self._frames.items() if fr.first_seen < frame.first_seen]:
+            self._give_up(older)
+        self._done[frame_id] = None
+        while len(self._done) > 64:
+            self._done.popitem(last=False)
+        self.stats['frames'] += 1
+        if frame.recovered:
+            self.stats['frames_recovered'] += 1
+            self.stats['chunks_recovered'] += frame.recovered
+        return b''.join(frame.data[i].tobytes() for i in range(frame.count))[:frame.frame_len]
+
+    def _give_up(self, frame_id: int):
+        frame = self._frames.pop(frame_id)
+        self._done[frame_id] = None
+        self.stats['frames_lost'] += 1
+        if self._keep_partial and frame.data and frame.chunk_size:
+            self._partials.append(self._partial(frame))
+            del self._partials[:-self._max_pending]
+
+    @staticmethod
+    def _partial(frame: _Frame) -> Tuple[bytes, List[Tuple[int, int]]]:
+        """Frame bytes with lost chunks zero-filled, plus the lost (start, end) ranges."""
+        size = frame.chunk_size
+        data = bytearray(frame.frame_len)
+        missing = []
+        for i in range(frame.count):
+            start, end = i * size, min((i + 1) * size, frame.frame_len)
+            if i in frame.data:
+                data[start:end] = frame.data[i][:end - start].tobytes()
+            elif missing and missing[-1][1] == start:
+                missing[-1] = (missing[-1][0], end)
+            else:
+                missing.append((start, end))
+        return bytes(data), missing
+
+    def take_partials(self) -> List[Tuple[bytes, List[Tuple[int, int]]]]:
+        """Frames given up on since the last call (oldest first), see keep_partial."""
+        partials, self._partials = self._partials, []
+        return partials
+
+    def _expire(self, now: float):
+        for frame_id in [f for f, fr in self._frames.items() if now - fr.first_seen > self._timeout]:
+            self._give_up(frame_id)
+
+    def get_status(self) -> dict:
+        damaged = self.stats['frames_recovered'] + self.stats['frames_lost']
+        data = self.stats['data_packets']
+        return {
+            **self.stats,
+            'pending': len(self._frames),
+            'overhead_ratio': round(self.stats['parity_packets'] / data, 3) if data else 0.0,
+            'recovery_rate': round(self.stats['frames_recovered'] / damaged, 3) if damaged else None,
+        }
+
+
+def main():
+    """Reference sender: stream a JPEG directory as FEC datagrams."""
+    import argparse
+    import os
+    import random
+    import socket
+
+    parser = argparse.ArgumentParser(description="Send JPEG frames as chunked FEC UDP datagrams")
+    parser.add_argument('host')
+    parser.add_argument('port', type=int)
+    parser.add_argument('frames', help='Directory of .jpg files, sent in name order')
+    parser.add_argument('--fps', type=float, default=20.0)
+    parser.add_argument('--chunk-size', type=int, default=1024)
+    parser.add_argument('--group-size', type=int, default=8)
+    parser.add_argument('--parity', type=int, default=1, choices=[0, 1, 2])
+    parser.add_argument('--loss', type=float, default=0.0, help='Drop this fraction of datagrams (testing)')
+    parser.add_argument('--loop', action='store_true')
+    args = parser.parse_args()
+
+    names = sorted(n for n in os.listdir(args.frames) if n.lower().endswith(('.jpg', '.jpeg')))
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    frame_id = 0
+    while True:
+        for name in names:
+            with open(os.path.join(args.frames, name), 'rb') as f:
+                jpeg = f.read()
+            for datagram in encode_frame(jpeg, frame_id, args.chunk_size, args.group_size, args.parity):
+                if random.random() >= args.loss:
+                    sock.sendto(datagram, (args.host, args.port))
+            frame_id += 1
+            time.sleep(1 / args.fps)
+        if not args.loop:
+            break
+
+
+if __name__ == '__main__':
+    main()